@@ -4,11 +4,20 @@ Interface para visualização e compartilhamento de clipping automático do Diá
 """
 
 import os
-import json
+import sys
+import html
 import streamlit as st
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+import artifact_store  # noqa: E402
+import data_loader  # noqa: E402
+import exports  # noqa: E402
+import history_index  # noqa: E402
+import thumbnails  # noqa: E402
+import views  # noqa: E402
+
 
 # ==================== CONFIGURAÇÃO STREAMLIT ====================
 st.set_page_config(
@@ -115,6 +124,40 @@ CSS_STYLE = """
         color: #1e40af;
     }
     
+    /* Lista de cards: o navegador só desenha os cards visíveis */
+    .cards-list .card {
+        content-visibility: auto;
+        contain-intrinsic-size: auto 160px;
+    }
+    
+    /* Filtro por relevância no cliente (sem rerun) */
+    .cards-filter > input {
+        display: none;
+    }
+    
+    .cards-filter > label {
+        display: inline-block;
+        padding: 0.3rem 0.8rem;
+        margin: 0 0.4rem 0.5rem 0;
+        border: 1px solid #e0e0e0;
+        border-radius: 20px;
+        font-size: 0.85rem;
+        cursor: pointer;
+    }
+    
+    .cards-filter > input:checked + label {
+        background-color: #f0f2f6;
+        border-color: #999999;
+        font-weight: 600;
+    }
+    
+    #rel-alta:checked ~ .cards-list .card:not(.rel-alta),
+    #rel-media:checked ~ .cards-list .card:not(.rel-media),
+    #rel-baixa:checked ~ .cards-list .card:not(.rel-baixa),
+    #rel-outra:checked ~ .cards-list .card:not(.rel-outra) {
+        display: none;
+    }
+    
     .header-date {
         text-align: center;
         color: #666666;
@@ -165,68 +208,179 @@ st.markdown(CSS_STYLE, unsafe_allow_html=True)
 
 
 # ==================== CONFIGURAÇÕES DE CAMINHOS ====================
+CARDS_PAGE_SIZE = 25
+RELEVANCIA_FILTROS = [
+    ("alta", "🔴 Alta"),
+    ("media", "🟡 Média"),
+    ("baixa", "🔵 Baixa"),
+    ("outra", "ℹ️ Outras"),
+]
+
 BASE_DIR = Path(__file__).parent
 JSON_PATH = BASE_DIR / "data" / "clipagem_hoje.json"
 PDF_PATH = BASE_DIR / "data" / "diario_sm_atual.pdf"
+HISTORY_PATH = BASE_DIR / "data" / "historico_clipagem.ndjson"
 
 
 # ==================== FUNÇÕES AUXILIARES ====================
 def load_clipagem_data():
-    """Carrega dados da clipagem do arquivo JSON"""
-    if not JSON_PATH.exists():
-        return None
-    
+    """Carrega dados da clipagem (parse único por versão do arquivo, compartilhado entre sessões)"""
     try:
-        with open(JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data
+        return data_loader.load_json(JSON_PATH)
     except Exception as e:
         st.error(f"Erro ao carregar dados: {e}")
         return None
 
 
 def load_pdf_for_download():
-    """Carrega arquivo PDF para download"""
-    if not PDF_PATH.exists():
-        return None
-    
+    """Carrega arquivo PDF para download (lido via mmap uma vez por versão do arquivo)"""
     try:
-        with open(PDF_PATH, "rb") as f:
-            return f.read()
+        return data_loader.load_pdf_bytes(PDF_PATH)
     except Exception as e:
         st.error(f"Erro ao carregar PDF: {e}")
         return None
 
 
-def get_relevancia_badge(relevancia):
-    """Retorna badge HTML baseado na relevância"""
-    relevancia_lower = str(relevancia).lower().strip()
-    
-    if "alta" in relevancia_lower:
-        return '<span class="badge badge-alta">🔴 Alta</span>'
-    elif "média" in relevancia_lower or "media" in relevancia_lower:
-        return '<span class="badge badge-media">🟡 Média</span>'
-    elif "baixa" in relevancia_lower:
-        return '<span class="badge badge-baixa">🔵 Baixa</span>'
-    else:
-        return f'<span class="badge badge-media">ℹ️ {relevancia}</span>'
+def load_clipagem_views():
+    """Visões pré-calculadas pelo analisador (badges, contagens, texto do WhatsApp)"""
+    try:
+        return views.load_views(JSON_PATH)
+    except Exception as e:
+        st.error(f"Erro ao carregar visões: {e}")
+        return None
 
 
-def format_for_whatsapp(noticias, data_clipping):
-    """Formata notícias para compartilhar no WhatsApp"""
-    mensagem = f"📰 CLIPAGEM DIÁRIO DE SM - {data_clipping}\n\n"
-    
-    for noticia in noticias:
-        pagina = noticia.get("pagina", "?")
-        titulo = noticia.get("titulo", "Sem título")
-        resumo = noticia.get("resumo_120_chars", "Sem resumo")
-        relevancia = noticia.get("relevância", "N/A")
-        
-        mensagem += f"📄 Pág. {pagina} | {titulo}\n"
-        mensagem += f"└ {resumo}\n"
-        mensagem += f"└ Relevância: {relevancia}\n\n"
+def load_clipagem_exports():
+    """Exportações prontas (WhatsApp em partes, CSV, Markdown, HTML) da versão atual"""
+    try:
+        return exports.load_exports(JSON_PATH)
+    except Exception as e:
+        st.error(f"Erro ao carregar exportações: {e}")
+        return None
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def render_cards_html(json_path, data_version, page, page_size):
+    """Gera a página de cards em um único fragmento HTML (cache por versão dos dados)"""
+    clipagem_data = data_loader.load_json(json_path)
+    clipagem_views = views.load_views(json_path)
+    noticias = clipagem_data.get("noticias", [])
+    
+    relevancia_por_idx = {
+        idx: key
+        for key, indices in clipagem_views["por_relevancia"].items()
+        for idx in indices
+    }
     
-    return mensagem
+    start = (page - 1) * page_size
+    cards = []
+    contagens = {}
+    for idx in range(start, min(start + page_size, len(noticias))):
+        noticia = noticias[idx]
+        relevancia = relevancia_por_idx.get(idx, "outra")
+        contagens[relevancia] = contagens.get(relevancia, 0) + 1
+        pagina = html.escape(str(noticia.get("pagina", "?")))
+        titulo = html.escape(str(noticia.get("titulo", "Sem título")))
+        resumo = html.escape(str(noticia.get("resumo_120_chars", "Sem resumo")))
+        cards.append(
+            f"<div class='card rel-{relevancia}'>"
+            "<div style='display: flex; justify-content: space-between; align-items: baseline;'>"
+            f"<span class='card-title'>{titulo}</span>"
+            f"<span class='card-page'>Pág. {pagina}</span>"
+            "</div>"
+            f"<div class='card-summary'>{resumo}</div>"
+            f"<div>{clipagem_views['badges'][idx]}</div>"
+            "</div>"
+        )
+    
+    # O filtro age só nos cards desta página: rótulos com as contagens da página, e não da edição
+    todas = "Todas desta página" if len(noticias) > page_size else "Todas"
+    filtros = [f"<input type='radio' name='rel-filter' id='rel-todas' checked><label for='rel-todas'>{todas}</label>"]
+    for key, label in RELEVANCIA_FILTROS:
+        if contagens.get(key):
+            filtros.append(
+                f"<input type='radio' name='rel-filter' id='rel-{key}'>"
+                f"<label for='rel-{key}'>{label} ({contagens[key]})</label>"
+            )
+    
+    return (
+        "<div class='cards-filter'>"
+        + "".join(filtros)
+        + "<div class='cards-list'>" + "".join(cards) + "</div>"
+        + "</div>"
+    )
+
+
+def render_page_thumbnails(noticias):
+    """Miniaturas das páginas citadas, geradas só quando o leitor pede"""
+    pages = thumbnails.cited_pages(noticias)
+    if not pages or not PDF_PATH.exists():
+        return
+    
+    st.markdown("### 🖼️ Páginas Citadas")
+    if not st.toggle("Mostrar miniaturas", key="show_thumbnails"):
+        return
+    
+    columns = st.columns(4)
+    for position, page in enumerate(pages):
+        image_path = thumbnails.page_image(str(PDF_PATH), page)
+        if image_path:
+            columns[position % 4].image(image_path, caption=f"Pág. {page}", use_container_width=True)
+    
+    zoom_page = st.selectbox(
+        "🔍 Ampliar página",
+        pages,
+        index=None,
+        placeholder="Escolha uma página",
+        key="zoom_page"
+    )
+    if zoom_page:
+        zoom_path = thumbnails.page_image(str(PDF_PATH), zoom_page, thumbnails.ZOOM_DPI)
+        if zoom_path:
+            st.image(zoom_path, caption=f"Página {zoom_page}", use_container_width=True)
+
+
+def render_history():
+    """Navegador do histórico: data + paginação sobre o índice pré-calculado"""
+    st.markdown("### 🗂️ Histórico de Clipagens")
+    
+    index = history_index.load_index(str(HISTORY_PATH))
+    days = history_index.available_days(index)
+    if not days:
+        st.info("ℹ️ Histórico ainda vazio.")
+        return
+    
+    latest = datetime.strptime(days[0], "%Y-%m-%d").date()
+    oldest = datetime.strptime(days[-1], "%Y-%m-%d").date()
+    selected = st.date_input(
+        "Data da clipagem",
+        value=latest,
+        min_value=oldest,
+        max_value=latest,
+        format="DD/MM/YYYY",
+        key="history_date"
+    )
+    
+    day = selected.isoformat()
+    summary = history_index.day_summary(index, day)
+    if not summary:
+        st.info("ℹ️ Nenhuma clipagem registrada nesta data.")
+        return
+    
+    total_pages = history_index.page_count(index, day)
+    page = st.number_input("Página", min_value=1, max_value=total_pages, value=1, key="history_page")
+    
+    relevancia = summary["por_relevancia"]
+    st.caption(
+        f"📅 {summary['data_clipping'] or day} | {summary['total']} notícias | "
+        f"🔴 {relevancia['alta']} · 🟡 {relevancia['media']} · 🔵 {relevancia['baixa']}"
+    )
+    
+    for noticia in history_index.read_page(index, day, int(page), history_path=str(HISTORY_PATH)):
+        st.markdown(
+            f"**Pág. {noticia.get('pagina', '?')} | {noticia.get('titulo', 'Sem título')}**  \n"
+            f"{noticia.get('resumo_120_chars', '')}"
+        )
 
 
 # ==================== INTERFACE PRINCIPAL ====================
@@ -239,6 +393,9 @@ def main():
             unsafe_allow_html=True
         )
     
+    # Cópias locais alinhadas ao ponteiro data/artifacts.json (baixa só quando mudou)
+    artifact_store.sync_local(JSON_PATH, views.views_path_for(JSON_PATH), PDF_PATH)
+    
     # Carrega dados
     clipagem_data = load_clipagem_data()
     
@@ -253,6 +410,10 @@ def main():
         )
         return
     
+    clipagem_views = load_clipagem_views()
+    if clipagem_views is None:
+        return
+    
     # Exibe data da clipagem
     data_clipping = clipagem_data.get("data_clipping", "Data indisponível")
     st.markdown(
@@ -281,45 +442,60 @@ def main():
     if not noticias:
         st.info("ℹ️ Nenhuma notícia relevante encontrada nesta edição.")
     else:
-        st.markdown(f"### 📋 Notícias Identificadas ({len(noticias)})")
+        total = clipagem_views["contagens"]["total"]
+        st.markdown(f"### 📋 Notícias Identificadas ({total})")
         
-        for idx, noticia in enumerate(noticias, 1):
-            pagina = noticia.get("pagina", "?")
-            titulo = noticia.get("titulo", "Sem título")
-            resumo = noticia.get("resumo_120_chars", "Sem resumo")
-            relevancia = noticia.get("relevância", "N/A")
-            
-            # Card da notícia
-            st.markdown(
-                f"""
-                <div class='card'>
-                    <div style='display: flex; justify-content: space-between; align-items: baseline;'>
-                        <span class='card-title'>{titulo}</span>
-                        <span class='card-page'>Pág. {pagina}</span>
-                    </div>
-                    <div class='card-summary'>{resumo}</div>
-                    <div>{get_relevancia_badge(relevancia)}</div>
-                </div>
-                """,
-                unsafe_allow_html=True
+        # Edições longas são paginadas; cada página é um único st.markdown
+        page = 1
+        total_pages = -(-total // CARDS_PAGE_SIZE)
+        if total_pages > 1:
+            page = st.number_input(
+                f"Página de notícias (de {total_pages})",
+                min_value=1,
+                max_value=total_pages,
+                value=1,
+                key="cards_page"
             )
+        
+        st.markdown(
+            render_cards_html(str(JSON_PATH), clipagem_views["data_sha256"], int(page), CARDS_PAGE_SIZE),
+            unsafe_allow_html=True
+        )
+    
+    render_page_thumbnails(noticias)
     
     st.markdown("---")
     
     # Funcionalidade WhatsApp
     st.markdown("### 📱 Compartilhar no WhatsApp")
     
-    whatsapp_text = format_for_whatsapp(noticias, data_clipping)
+    clipagem_exports = load_clipagem_exports()
+    if clipagem_exports:
+        mensagens = clipagem_exports["whatsapp"]
+        if len(mensagens) > 1:
+            st.caption(f"Texto dividido em {len(mensagens)} mensagens (entre notícias). Use o ícone de cópia de cada bloco.")
+        for mensagem in mensagens:
+            st.code(mensagem, language="text")
+        
+        # Downloads instantâneos: bytes já gerados para esta versão dos dados
+        st.markdown("### 📤 Exportar")
+        labels = {"csv": "📊 CSV", "markdown": "📝 Markdown", "html": "🌐 Resumo HTML"}
+        for col, (key, label) in zip(st.columns(len(labels)), labels.items()):
+            arquivo = clipagem_exports["files"][key]
+            with col:
+                st.download_button(
+                    label=label,
+                    data=arquivo["data"],
+                    file_name=arquivo["file_name"],
+                    mime=arquivo["mime"],
+                    key=f"export_{key}"
+                )
     
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        st.code(whatsapp_text, language="text")
+    st.markdown("---")
     
-    with col2:
-        st.write("")
-        st.write("")
-        if st.button("📋 Copiar Texto"):
-            st.success("✓ Clique para copiar o texto acima")
+    # Histórico de edições anteriores
+    with st.expander("🗂️ Ver clipagens anteriores"):
+        render_history()
     
     st.markdown("---")
     
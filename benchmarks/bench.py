@@ -0,0 +1,278 @@
+"""
+Benchmarks - Tempo das etapas do analisador e dos helpers do dashboard
+Mede extract_pdf_text, clean_gemini_response, validate_json, save_json_output,
+find_licitacoes e format_for_whatsapp em edições sintéticas de vários tamanhos e
+compara com um baseline JSON, sinalizando regressões acima da tolerância
+"""
+
+import argparse
+import contextlib
+import itertools
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Logs da aplicação só a partir de WARNING: o relatório do benchmark fica legível
+os.environ.setdefault("CLIPAGEM_LOG_LEVEL", "WARNING")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+sys.path.insert(0, BENCH_DIR)
+
+import synthetic  # noqa: E402
+from io_utils import dumps_json, loads_json, write_atomic  # noqa: E402
+
+
+# ==================== CONFIGURAÇÕES ====================
+DEFAULT_SIZES = (10, 50, 100, 250, 500)
+QUICK_SIZES = (10, 50)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.25
+BASELINE_SCHEMA = 2
+BASELINES_FOLDER = os.path.join(BENCH_DIR, "baselines")
+PDF_CACHE_FOLDER = os.path.join(tempfile.gettempdir(), "clipagem-bench-pdfs")
+# Layout das edições sintéticas (ajustável pela linha de comando)
+PDF_LAYOUT = {"columns": 4, "images_per_page": 1, "ad_every": 5}
+
+# Cada amostra repete a chamada até durar ao menos isto (casos de microssegundos)
+MIN_SAMPLE_SECONDS = 0.05
+MAX_LOOPS = 100_000
+
+
+# ==================== MEDIÇÃO ====================
+def _autorange(fn, setup):
+    """Laços por amostra para cada uma durar ao menos MIN_SAMPLE_SECONDS (como timeit.autorange)"""
+    number = 1
+    while True:
+        args = [setup() if setup else None for _ in range(number)]
+        start = time.perf_counter()
+        for arg in args:
+            fn(arg)
+        if time.perf_counter() - start >= MIN_SAMPLE_SECONDS or number >= MAX_LOOPS:
+            return number
+        number *= 10
+
+
+def measure(fn, setup=None, repeat=DEFAULT_REPEAT):
+    """
+    Roda repeat amostras de fn(setup()) com a saída dos prints descartada; cada amostra
+    repete a chamada o bastante para sair do ruído do relógio (setup fica fora da medição).
+    Retorna mínimo, mediana e média por chamada, em segundos.
+    """
+    samples = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # O autorange também serve de aquecimento
+        number = _autorange(fn, setup)
+        for _ in range(repeat):
+            args = [setup() if setup else None for _ in range(number)]
+            start = time.perf_counter()
+            for arg in args:
+                fn(arg)
+            samples.append((time.perf_counter() - start) / number)
+    return {
+        "min": round(min(samples), 9),
+        "median": round(statistics.median(samples), 9),
+        "mean": round(statistics.fmean(samples), 9),
+        "runs": len(samples),
+        "loops": number,
+    }
+
+
+def _fmt(seconds):
+    """Tempo por chamada na unidade legível (µs abaixo de 1 ms)"""
+    return f"{seconds * 1000:>9.2f} ms" if seconds >= 0.001 else f"{seconds * 1e6:>9.2f} µs"
+
+
+# ==================== CASOS ====================
+def _pdf_for(pages):
+    """PDF sintético em cache por tamanho (gerar é mais lento que extrair)"""
+    layout = "_".join(f"{key}{value}" for key, value in sorted(PDF_LAYOUT.items()))
+    path = os.path.join(PDF_CACHE_FOLDER, f"edicao_{pages}p_{layout}_seed{synthetic.SEED}.pdf")
+    if not os.path.exists(path):
+        synthetic.build_pdf(path, pages=pages, **PDF_LAYOUT)
+    return path
+
+
+def bench_extract_pdf_text(size, repeat, workdir):
+    import analyzer
+
+    pdf_path = _pdf_for(size)
+    return measure(lambda _: analyzer.extract_pdf_text(pdf_path), repeat=repeat)
+
+
+def bench_clean_gemini_response(size, repeat, workdir):
+    import analyzer
+
+    response = synthetic.build_response(size)
+    return measure(lambda _: analyzer.clean_gemini_response(response), repeat=repeat)
+
+
+def bench_validate_json(size, repeat, workdir):
+    import analyzer
+
+    cleaned = synthetic.build_response(size, fenced=False)
+    return measure(lambda _: analyzer.validate_json(cleaned), repeat=repeat)
+
+
+def bench_save_json_output(size, repeat, workdir):
+    import analyzer
+
+    json_obj = synthetic.build_clipping(size)
+    counter = itertools.count()
+
+    def fresh_paths():
+        # Histórico novo a cada rodada: o append não acumula entre as medições
+        folder = os.path.join(workdir, f"save_{size}_{next(counter)}")
+        return (
+            os.path.join(folder, "clipagem_hoje.json"),
+            os.path.join(folder, "historico_clipagem.ndjson"),
+            os.path.join(folder, "sem_pdf.pdf"),
+        )
+
+    return measure(lambda paths: analyzer.save_json_output(json_obj, *paths), setup=fresh_paths, repeat=repeat)
+
+
+def bench_find_licitacoes(size, repeat, workdir):
+    import views
+
+    noticias = synthetic.build_noticias(size)
+    return measure(lambda _: views.find_licitacoes(noticias), repeat=repeat)
+
+
+def bench_format_for_whatsapp(size, repeat, workdir):
+    import views
+
+    noticias = synthetic.build_noticias(size)
+    return measure(lambda _: views.format_for_whatsapp(noticias, "01/06/2024"), repeat=repeat)
+
+
+# Unidade do tamanho de cada caso: páginas do PDF ou notícias na resposta
+BENCHMARKS = {
+    "extract_pdf_text": ("pages", bench_extract_pdf_text),
+    "clean_gemini_response": ("stories", bench_clean_gemini_response),
+    "validate_json": ("stories", bench_validate_json),
+    "save_json_output": ("stories", bench_save_json_output),
+    "find_licitacoes": ("stories", bench_find_licitacoes),
+    "format_for_whatsapp": ("stories", bench_format_for_whatsapp),
+}
+
+
+def run_benchmarks(names, sizes, repeat):
+    """Executa os casos pedidos; os que dependem de pacote ausente são pulados"""
+    workdir = tempfile.mkdtemp(prefix="clipagem-bench-")
+    import artifact_store
+    import exports
+
+    # save_json_output grava exportações na pasta temporária e nunca envia ao backend
+    exports.EXPORTS_FOLDER = os.path.join(workdir, "exports")
+    artifact_store.STORE_BACKEND = "none"
+
+    results = {}
+    try:
+        for name in names:
+            unit, bench = BENCHMARKS[name]
+            for size in sizes:
+                key = f"{name}[{unit}={size}]"
+                try:
+                    results[key] = bench(size, repeat, workdir)
+                except ImportError as e:
+                    print(f"[BENCH] {key}: pulado ({e})")
+                    break
+                print(
+                    f"[BENCH] {key:<36} mediana {_fmt(results[key]['median'])}"
+                    f"  (mín {_fmt(results[key]['min']).strip()}, {results[key]['loops']} laço(s))"
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# ==================== BASELINE ====================
+def baseline_path(name):
+    """Nome simples ("ci", "notebook") vira benchmarks/baselines/<nome>.json"""
+    if os.sep in name or name.endswith(".json"):
+        return name
+    return os.path.join(BASELINES_FOLDER, f"{name}.json")
+
+
+def save_baseline(path, results):
+    baseline = {
+        "schema": BASELINE_SCHEMA,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pdf_layout": dict(PDF_LAYOUT),
+        "results": results,
+    }
+    write_atomic(path, dumps_json(baseline, pretty=True))
+    print(f"[BENCH] Baseline salvo em: {path}")
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Casos cuja mediana passou de baseline * (1 + tolerância) e cujo mínimo também ficou
+    acima da mediana do baseline (a piora não é só ruído); retorna a lista de regressões
+    """
+    if baseline.get("schema") != BASELINE_SCHEMA:
+        print(f"[BENCH] AVISO: baseline no formato {baseline.get('schema')} (atual {BASELINE_SCHEMA}), regrave com --save")
+    if baseline.get("pdf_layout", PDF_LAYOUT) != PDF_LAYOUT:
+        print(f"[BENCH] AVISO: baseline com outro layout de PDF ({baseline['pdf_layout']})")
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        ratio = current["median"] / previous["median"] if previous["median"] else float("inf")
+        flag = ratio > 1 + tolerance and current["min"] > previous["median"]
+        print(f"[BENCH] {key:<36} {ratio:>6.2f}x do baseline{'  ✗ REGRESSÃO' if flag else ''}")
+        if flag:
+            regressions.append({"case": key, "ratio": round(ratio, 3), **current})
+    return regressions
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks da clipagem com edições sintéticas")
+    parser.add_argument("--only", default="", help=f"Casos separados por vírgula ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--sizes", default="", help="Tamanhos separados por vírgula (padrão: 10,50,100,250,500)")
+    parser.add_argument("--quick", action="store_true", help="Apenas os tamanhos 10 e 50")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Medições por caso")
+    parser.add_argument("--columns", type=int, default=PDF_LAYOUT["columns"], help="Colunas por página do PDF")
+    parser.add_argument("--images", type=int, default=PDF_LAYOUT["images_per_page"], help="Imagens por página do PDF")
+    parser.add_argument("--ad-every", type=int, default=PDF_LAYOUT["ad_every"], help="Uma página de anúncio a cada N (0 = nenhuma)")
+    parser.add_argument("--save", metavar="BASELINE", help="Grava os resultados como baseline (nome ou caminho .json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compara com um baseline (nome ou caminho .json)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Folga antes de sinalizar (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"casos desconhecidos: {', '.join(unknown)}")
+    if args.sizes:
+        sizes = tuple(int(size) for size in args.sizes.split(","))
+    else:
+        sizes = QUICK_SIZES if args.quick else DEFAULT_SIZES
+
+    PDF_LAYOUT.update(columns=args.columns, images_per_page=args.images, ad_every=args.ad_every)
+    results = run_benchmarks(names, sizes, args.repeat)
+    if args.save:
+        save_baseline(baseline_path(args.save), results)
+    if args.compare:
+        with open(baseline_path(args.compare), "rb") as handle:
+            baseline = loads_json(handle.read())
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regressão(ões) acima de {args.tolerance:.0%}")
+            return 1
+        print("[BENCH] Sem regressões")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Edições Sintéticas - PDFs de jornal e respostas do modelo para os benchmarks
+Gera PDFs com PyMuPDF (colunas de texto, imagens e páginas de anúncio) e listas de
+notícias no formato devolvido pelo Gemini, de forma determinística (semente fixa)
+"""
+
+import json
+import os
+import random
+
+
+# ==================== CONFIGURAÇÕES ====================
+SEED = 20240601
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 em pontos
+MARGIN = 36
+GUTTER = 12
+
+WORDS = (
+    "prefeitura câmara vereadores secretaria saúde educação obras licitação contrato "
+    "município santa maria bairro escola hospital orçamento projeto lei audiência "
+    "pública trânsito segurança cultura esporte universidade comunidade moradores "
+    "investimento recursos federal estadual programa serviço atendimento população"
+).split()
+RELEVANCIAS = ("Alta", "Média", "Baixa")
+
+
+def _sentence(rng, min_words=8, max_words=18):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng, sentences=5):
+    return " ".join(_sentence(rng) for _ in range(sentences))
+
+
+# ==================== PDF ====================
+def build_pdf(path, pages=10, columns=4, images_per_page=1, ad_every=5, seed=SEED):
+    """
+    Grava um PDF de jornal sintético e retorna o caminho.
+    ad_every=N: uma a cada N páginas é de anúncio (imagem grande e pouco texto); 0 desliga.
+    """
+    import fitz  # pymupdf (dependência da geração e da extração)
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+
+    column_width = (PAGE_WIDTH - 2 * MARGIN - (columns - 1) * GUTTER) / columns
+    for number in range(1, pages + 1):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((MARGIN, MARGIN), f"DIÁRIO SINTÉTICO  |  Página {number}", fontsize=9)
+
+        if ad_every and number % ad_every == 0:
+            pixmap.clear_with(rng.randint(0, 255))
+            page.insert_image(fitz.Rect(MARGIN, 80, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - 120), pixmap=pixmap)
+            page.insert_text((MARGIN, PAGE_HEIGHT - 80), "ANÚNCIO - " + _sentence(rng, 4, 8), fontsize=14)
+            continue
+
+        page.insert_text((MARGIN, MARGIN + 30), _sentence(rng, 5, 9).upper(), fontsize=16)
+        top = MARGIN + 50
+        for column in range(columns):
+            x0 = MARGIN + column * (column_width + GUTTER)
+            y0 = top
+            if column < images_per_page:
+                pixmap.clear_with(rng.randint(0, 255))
+                page.insert_image(fitz.Rect(x0, y0, x0 + column_width, y0 + 120), pixmap=pixmap)
+                y0 += 130
+            text = "\n\n".join(_paragraph(rng) for _ in range(6))
+            page.insert_textbox(fitz.Rect(x0, y0, x0 + column_width, PAGE_HEIGHT - MARGIN), text, fontsize=7)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+# ==================== RESPOSTA DO MODELO ====================
+def build_noticias(count, seed=SEED):
+    """Lista de notícias no formato do prompt (mistura as duas grafias da relevância)"""
+    rng = random.Random(seed + count)
+    noticias = []
+    for index in range(count):
+        titulo = _sentence(rng, 5, 10)[:-1]
+        if index % 7 == 0:
+            titulo = "Licitação: " + titulo
+        noticias.append({
+            "pagina": rng.randint(1, max(count // 3, 1)),
+            "titulo": titulo,
+            "resumo_120_chars": _sentence(rng, 12, 20)[:120],
+            "relevância" if index % 2 else "relevancia": rng.choice(RELEVANCIAS),
+        })
+    return noticias
+
+
+def build_clipping(count, seed=SEED):
+    return {
+        "data_clipping": "01/06/2024",
+        "resumo_gemini": _paragraph(random.Random(seed), 3),
+        "noticias": build_noticias(count, seed),
+    }
+
+
+def build_response(count, seed=SEED, fenced=True):
+    """Texto como o Gemini devolve: JSON indentado dentro de um bloco ```json"""
+    body = json.dumps(build_clipping(count, seed), ensure_ascii=False, indent=2)
+    return f"```json\n{body}\n```\n" if fenced else body
@@ -0,0 +1,4 @@
+"""
+Clipagem - Ponto de entrada único da linha de comando (python -m clipagem)
+Os módulos da aplicação continuam em src/; este pacote apenas os localiza e despacha
+"""
@@ -0,0 +1,171 @@
+"""
+CLI da Clipagem - python -m clipagem scrape|analyze|run|diagnose
+Cada subcomando importa só o que usa: Selenium, PyMuPDF e Gemini são carregados apenas
+quando uma etapa roda de fato, e --dry-run mostra o plano sem carregá-los.
+O .env é lido uma única vez (src/config.py), antes de qualquer outro módulo.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+import time
+
+_START = time.perf_counter()
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+# ==================== CONFIGURAÇÕES ====================
+# Dependências que dominam o tempo de inicialização (relatório de imports)
+HEAVY_MODULES = ("selenium", "webdriver_manager", "fitz", "google.generativeai", "streamlit")
+IMPORT_REPORT = os.getenv("CLIPAGEM_IMPORT_REPORT", "false").lower() == "true"
+
+STAGES_BY_COMMAND = {
+    "scrape": "SCRAPE_STAGES",
+    "analyze": "ANALYZE_STAGES",
+    "run": "STAGES",
+}
+
+_IMPORT_TIMES = []
+
+
+def _load(name):
+    """Importa um módulo da aplicação registrando o tempo gasto (só na primeira vez)"""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _IMPORT_TIMES.append((name, time.perf_counter() - start))
+    return module
+
+
+# ==================== RELATÓRIO DE IMPORTS ====================
+def import_report():
+    print("[IMPORTS] Módulos carregados pelo CLI:")
+    for name, seconds in _IMPORT_TIMES:
+        print(f"  {name:<22} {seconds * 1000:>8.1f} ms")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"[IMPORTS] Dependências pesadas carregadas: {', '.join(loaded) or 'nenhuma'}")
+    print(f"[IMPORTS] Tempo desde o início do CLI: {(time.perf_counter() - _START) * 1000:.0f} ms")
+    print("[IMPORTS] Detalhamento completo: python -X importtime -m clipagem ...")
+
+
+# ==================== SUBCOMANDOS ====================
+def _select_sources(args):
+    sources = _load("sources").load_sources(args.sources_file)
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",") if name.strip()}
+        sources = [source for source in sources if source.name in wanted]
+    return sources
+
+
+def cmd_pipeline(args):
+    """scrape / analyze / run: etapas correspondentes do pipeline para as fontes escolhidas"""
+    pipeline = _load("pipeline")
+    stages = getattr(pipeline, STAGES_BY_COMMAND[args.command])
+    if args.force_from and args.force_from not in pipeline.STAGES:
+        print(f"[CLI] Etapa desconhecida: {args.force_from} (opções: {', '.join(pipeline.STAGES)})")
+        return 2
+    sources = _select_sources(args)
+    if not sources:
+        print("[CLI] Nenhuma fonte habilitada para processar")
+        return 1
+
+    if args.dry_run:
+        for source in sources:
+            print(f"[CLI] Plano para '{source.name}':")
+            for stage, action in pipeline.plan_pipeline(source, stages, args.force_from):
+                print(f"  {stage:<9} {action}")
+        return 0
+
+    if args.overlap:
+        pipeline.OVERLAP = True
+    if args.force_from:
+        # Reexecução forçada é por fonte, em série (mesmo comportamento do pipeline.py)
+        failed = 0
+        for source in sources:
+            try:
+                pipeline.run_pipeline(source, stages, args.force_from)
+            except Exception:
+                failed += 1
+        return 1 if failed else 0
+
+    multi_runner = _load("multi_runner")
+    manifest = multi_runner.run_all(
+        sources,
+        skip_scrape=args.command == "analyze",
+        skip_analyze=args.command == "scrape",
+    )
+    return 0 if manifest["summary"]["ok"] else 1
+
+
+def cmd_diagnose(args):
+    """Ambiente, dependências (sem importá-las) e credenciais de cada fonte"""
+    _load("daily_scraper").diagnose_system()
+
+    print("[CLI] Dependências instaladas:")
+    for name in HEAVY_MODULES + ("dotenv", "orjson", "boto3"):
+        try:
+            found = importlib.util.find_spec(name) is not None
+        except ModuleNotFoundError:
+            found = False
+        print(f"  {name:<22} {'✓' if found else '✗'}")
+
+    print("[CLI] Credenciais por fonte:")
+    for source in _select_sources(args):
+        missing = source.missing_credentials()
+        status = "✓ completas" if not missing else f"✗ faltando: {', '.join(missing)}"
+        print(f"  {source.name:<22} {status}")
+    return 0
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m clipagem", description="Clipagem diária de jornais")
+    parser.add_argument(
+        "--import-report",
+        action="store_true",
+        default=IMPORT_REPORT,
+        help="Mostra o tempo de import de cada módulo e quais dependências pesadas foram carregadas",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    helps = {
+        "scrape": "Baixa os PDFs do dia",
+        "analyze": "Extrai, analisa e publica a partir dos PDFs já baixados",
+        "run": "Pipeline completo (download → publicação)",
+    }
+    for command, help_text in helps.items():
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument("--only", default="", help="Nomes das fontes separados por vírgula")
+        sub.add_argument("--sources-file", default=None, help="Registro de fontes (JSON)")
+        sub.add_argument("--from", dest="force_from", default=None, help="Reexecuta a partir desta etapa")
+        sub.add_argument("--overlap", action="store_true", help="Sobrepõe etapas independentes")
+        sub.add_argument("--dry-run", action="store_true", help="Mostra as etapas a executar, sem rodar")
+        sub.set_defaults(handler=cmd_pipeline)
+
+    sub = subparsers.add_parser("diagnose", help="Verifica ambiente, dependências e credenciais")
+    sub.add_argument("--only", default="", help="Nomes das fontes separados por vírgula")
+    sub.add_argument("--sources-file", default=None, help="Registro de fontes (JSON)")
+    sub.set_defaults(handler=cmd_diagnose)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    _load("config")
+    if args.sources_file is None:
+        args.sources_file = _load("sources").SOURCES_FILE
+    try:
+        return args.handler(args)
+    finally:
+        if args.import_report:
+            import_report()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
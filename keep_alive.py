@@ -1,81 +1,276 @@
-"""Keep Streamlit app alive with headless Selenium."""
+"""Keep Streamlit apps alive without a browser (health probe + websocket handshake).
+
+Several dashboards are probed concurrently; every probe is appended to a rolling
+history used to report latency percentiles and how often the apps were asleep.
+"""
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import json
 import os
+import sys
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
 
 import requests
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import websocket
 
 
 TARGET_URL = os.getenv("KEEP_ALIVE_URL", "https://clipagem-secom.streamlit.app/")
-WAIT_SECONDS = int(os.getenv("KEEP_ALIVE_WAIT_SECONDS", "10"))
-SCREENSHOT_PATH = os.getenv("KEEP_ALIVE_SCREENSHOT", "keep_alive_screenshot.png")
+TARGET_URLS = [
+    url.strip() for url in os.getenv("KEEP_ALIVE_URLS", TARGET_URL).split(",") if url.strip()
+]
 REQUEST_TIMEOUT = int(os.getenv("KEEP_ALIVE_HTTP_TIMEOUT", "20"))
-USE_SELENIUM_FALLBACK = os.getenv("KEEP_ALIVE_USE_SELENIUM", "true").lower() == "true"
+WAKE_TIMEOUT = int(os.getenv("KEEP_ALIVE_WAKE_TIMEOUT", "180"))
+HEALTH_POLL_SECONDS = 5
+
+HISTORY_PATH = os.getenv("KEEP_ALIVE_HISTORY", "keep_alive_history.jsonl")
+HISTORY_MAX_RECORDS = int(os.getenv("KEEP_ALIVE_HISTORY_MAX", "5000"))
+# A warm app answers in about a second; anything slower is treated as a cold start
+COLD_START_SECONDS = float(os.getenv("KEEP_ALIVE_COLD_START_SECONDS", "8"))
+SLEEP_PAGE_SIGNATURES = (
+    "gone to sleep",
+    "get this app back up",
+    "waking up",
+    "your app is in the oven",
+)
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/122.0 Safari/537.36"
+)
+
+# Streamlit Community Cloud serves the app itself under "/~/+/"; self-hosted apps at "/"
+APP_PREFIXES = ("/~/+", "")
+
+# BackMsg{rerun_script: ClientState{}} — protobuf field 11, length-delimited, empty.
+# This is the first message a browser sends after opening the websocket.
+RERUN_SCRIPT_BACKMSG = b"\x5a\x00"
 
 
-def build_driver() -> webdriver.Chrome:
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--window-size=1280,720")
+def _base_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path.rstrip("/"), "", ""))
 
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
 
+def probe_health(session: requests.Session, target_url: str) -> str | None:
+    """Return the app prefix whose /_stcore/health answers "ok", or None."""
+    for prefix in APP_PREFIXES:
+        url = f"{_base_url(target_url)}{prefix}/_stcore/health"
+        try:
+            response = session.get(url, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as exc:
+            print(f"Health probe failed ({url}): {exc}")
+            continue
+        if response.status_code == 200 and response.text.strip() == "ok":
+            return prefix
+    return None
 
-def ping_http() -> bool:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/122.0 Safari/537.36",
+
+def open_session(target_url: str, prefix: str) -> float:
+    """Open the app websocket like a browser does and wait for the first ForwardMsg.
+
+    Returns the handshake latency in seconds. Starting a session makes Streamlit
+    Cloud count the app as visited, which is what keeps it from sleeping.
+    """
+    parts = urlsplit(_base_url(target_url))
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    ws_url = urlunsplit((scheme, parts.netloc, f"{parts.path}{prefix}/_stcore/stream", "", ""))
+
+    start = time.perf_counter()
+    ws = websocket.create_connection(
+        ws_url,
+        timeout=REQUEST_TIMEOUT,
+        subprotocols=["streamlit"],
+        origin=f"{parts.scheme}://{parts.netloc}",
+        header=[f"User-Agent: {USER_AGENT}"],
+    )
+    try:
+        ws.send_binary(RERUN_SCRIPT_BACKMSG)
+        ws.recv()
+        return time.perf_counter() - start
+    finally:
+        ws.close()
+
+
+def wake(target_url: str = TARGET_URL) -> dict:
+    """Poll the health endpoint until the app answers, then start a session."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+
+    result = {
+        "url": target_url,
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "ok": False,
+        "status": None,
+        "page_seconds": None,
+        "sleep_page": False,
+        "was_sleeping": False,
+        "health_seconds": None,
+        "handshake_seconds": None,
     }
+
+    start = time.perf_counter()
     try:
-        response = requests.get(TARGET_URL, headers=headers, timeout=REQUEST_TIMEOUT)
+        # Plain page load first: on a sleeping app this is what triggers the wake-up
+        response = session.get(target_url, timeout=REQUEST_TIMEOUT)
+        result["status"] = response.status_code
+        result["page_seconds"] = round(time.perf_counter() - start, 2)
+        page = response.text.lower()
+        result["sleep_page"] = any(signature in page for signature in SLEEP_PAGE_SIGNATURES)
     except requests.RequestException as exc:
-        print(f"HTTP keep-alive failed: {exc}")
-        return False
+        print(f"Page request failed ({target_url}): {exc}")
+
+    prefix = probe_health(session, target_url)
+    result["was_sleeping"] = prefix is None
+    while prefix is None and time.perf_counter() - start < WAKE_TIMEOUT:
+        time.sleep(HEALTH_POLL_SECONDS)
+        prefix = probe_health(session, target_url)
+
+    result["health_seconds"] = round(time.perf_counter() - start, 2)
+    if prefix is None:
+        print(f"{target_url} did not become healthy within {WAKE_TIMEOUT}s")
+        return result
+
+    try:
+        result["handshake_seconds"] = round(open_session(target_url, prefix), 2)
+        result["ok"] = True
+    except (websocket.WebSocketException, OSError) as exc:
+        print(f"Websocket handshake failed ({target_url}): {exc}")
+    return result
+
 
-    ok = 200 <= response.status_code < 400
-    print(f"HTTP keep-alive status: {response.status_code}")
-    return ok
+def is_cold_start(result: dict) -> bool:
+    """Sleep page signature, health not ready on first probe, or a slow first response."""
+    latency = result.get("page_seconds")
+    return bool(
+        result.get("sleep_page")
+        or result.get("was_sleeping")
+        or (latency is not None and latency >= COLD_START_SECONDS)
+    )
 
 
-def run() -> None:
-    if ping_http():
-        return
+async def probe_all(urls: list[str]) -> list[dict]:
+    """Probe every target concurrently (each wake runs in its own worker thread)."""
+    results = await asyncio.gather(*(asyncio.to_thread(wake, url) for url in urls))
+    for result in results:
+        result["cold_start"] = is_cold_start(result)
+    return list(results)
 
-    if not USE_SELENIUM_FALLBACK:
-        print("Selenium fallback disabled. Exiting.")
-        return
 
-    driver: webdriver.Chrome | None = None
+# ==================== HISTORY ====================
+def load_history(path: str = HISTORY_PATH) -> list[dict]:
     try:
-        driver = build_driver()
-        driver.set_page_load_timeout(60)
-        driver.get(TARGET_URL)
-        time.sleep(WAIT_SECONDS)
-
-        timestamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
-        screenshot_file = SCREENSHOT_PATH.replace(".png", f"-{timestamp}.png")
-        driver.save_screenshot(screenshot_file)
-        print(f"Screenshot saved: {screenshot_file}")
-    except Exception as exc:
-        print(f"Keep-alive failed: {exc}")
-    finally:
-        if driver is not None:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+        with open(path, "r", encoding="utf-8") as handle:
+            lines = handle.readlines()
+    except FileNotFoundError:
+        return []
+
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return records
+
+
+def append_history(results: list[dict], path: str = HISTORY_PATH,
+                   max_records: int = HISTORY_MAX_RECORDS) -> list[dict]:
+    """Append the new probes and keep only the most recent max_records entries."""
+    records = (load_history(path) + results)[-max_records:]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    os.replace(tmp_path, path)
+    return records
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(records: list[dict]) -> dict:
+    """Per-target p50/p95 page latency, cold-start rate and shortest idle gap before a cold start."""
+    summary = {}
+    for url in sorted({record["url"] for record in records}):
+        probes = sorted((r for r in records if r["url"] == url), key=lambda r: r["ts"])
+        latencies = [r["page_seconds"] for r in probes if r.get("page_seconds") is not None]
+        cold = [r for r in probes if r.get("cold_start")]
+
+        # Idle time between a probe and the next one that found the app asleep
+        gaps = []
+        for previous, current in zip(probes, probes[1:]):
+            if current.get("cold_start"):
+                elapsed = datetime.fromisoformat(current["ts"]) - datetime.fromisoformat(previous["ts"])
+                gaps.append(elapsed.total_seconds() / 60)
+
+        summary[url] = {
+            "probes": len(probes),
+            "p50_seconds": _percentile(latencies, 50),
+            "p95_seconds": _percentile(latencies, 95),
+            "cold_starts": len(cold),
+            "cold_start_rate": round(len(cold) / len(probes), 3) if probes else 0.0,
+            "min_gap_before_cold_start_minutes": round(min(gaps), 1) if gaps else None,
+            "failures": sum(1 for r in probes if not r.get("ok")),
+        }
+    return summary
+
+
+# ==================== REPORT ====================
+def report(results: list[dict], summary: dict) -> None:
+    lines = []
+    for result in results:
+        lines.append(
+            f"{result['url']} | {'ok' if result['ok'] else 'FAILED'} | "
+            f"status: {result['status']} | page: {result['page_seconds']}s | "
+            f"healthy after: {result['health_seconds']}s | "
+            f"session handshake: {result['handshake_seconds']}s | "
+            f"cold start: {result['cold_start']}"
+        )
+    for url, stats in summary.items():
+        lines.append(
+            f"{url} history | probes: {stats['probes']} | p50: {stats['p50_seconds']}s | "
+            f"p95: {stats['p95_seconds']}s | cold starts: {stats['cold_starts']} "
+            f"({stats['cold_start_rate']:.0%}) | shortest idle before sleep: "
+            f"{stats['min_gap_before_cold_start_minutes']} min"
+        )
+
+    for line in lines:
+        print(line)
+
+    summary_path = os.getenv("GITHUB_STEP_SUMMARY")
+    if summary_path:
+        with open(summary_path, "a", encoding="utf-8") as handle:
+            handle.writelines(f"- {line}\n" for line in lines)
+
+
+def run(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Wake Streamlit dashboards and track their latency")
+    parser.add_argument("urls", nargs="*", default=TARGET_URLS, help="Dashboard URLs (default: KEEP_ALIVE_URLS)")
+    parser.add_argument("--history", default=HISTORY_PATH, help="Rolling JSONL history file")
+    parser.add_argument("--report-only", action="store_true", help="Only summarize the existing history")
+    args = parser.parse_args(argv)
+
+    if args.report_only:
+        report([], summarize(load_history(args.history)))
+        return 0
+
+    results = asyncio.run(probe_all(args.urls))
+    records = append_history(results, args.history)
+    report(results, summarize(records))
+    return 0 if all(result["ok"] for result in results) else 1
 
 
 if __name__ == "__main__":
-    run()
+    sys.exit(run())
@@ -6,28 +6,48 @@ Extrai texto de PDF do Diário Oficial e realiza análise inteligente de conteú
 import os
 import json
 import re
+import time
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
-import fitz  # pymupdf
-import google.generativeai as genai
 
-
-# ==================== CARREGAMENTO DE VARIÁVEIS DE AMBIENTE ====================
-# Carregar variáveis do arquivo .env
-env_file = os.path.join(os.path.dirname(__file__), "..", ".env")
-if os.path.exists(env_file):
-    print(f"[ENV] Carregando variáveis de {env_file}")
-    load_dotenv(env_file, override=True)
-else:
-    print(f"[ENV] Arquivo .env não encontrado em {env_file}, usando variáveis do sistema")
-    load_dotenv(override=True)  # Tenta carregar do .env na raiz do projeto
+import config  # .env carregado uma única vez, antes dos módulos que leem o ambiente
+from io_utils import JSON_BACKEND, dumps_json, file_sha256, open_atomic, write_atomic
+import logs
+import memory_profile
+import metrics
+import artifact_store
+from pdf_integrity import open_pdf
+import exports
+import history_index
+import views
+import thumbnails
 
 
 # ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("analyzer")
+# Uma linha por página: DEBUG (CLIPAGEM_LOG_LEVELS=analyzer.pages=DEBUG para ver)
+page_log = logs.get_logger("analyzer.pages")
 PDF_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "diario_sm_atual.pdf")
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "clipagem_hoje.json")
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "historico_clipagem.ndjson")
 GEMINI_MODEL = "gemini-2.0-flash"
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_RETRY_BASE_SECONDS = 2
+# Transitórios: exceções do google.api_core por tipo, ou status HTTP do erro
+RETRYABLE_API_ERRORS = ("ResourceExhausted", "ServiceUnavailable", "InternalServerError", "DeadlineExceeded")
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+PREWARM_THUMBNAILS = os.getenv("CLIPAGEM_PREWARM_THUMBS", "false").lower() == "true"
+
+# Caminho econômico (orçamento de memória): texto extraído direto para arquivo e
+# análise em blocos de páginas de até CHUNK_CHARS caracteres, uma chamada por bloco
+CHUNK_CHARS = int(os.getenv("CLIPAGEM_CHUNK_CHARS", "200000"))
+PAGE_MARKER_RE = re.compile(r"--- Página \d+ ---\n?")
+# Memória prevista por etapa: documento aberto ~2x o PDF; prompt + resposta ~3x o texto
+EXTRACT_MEMORY_FACTOR = 2
+ANALYZE_MEMORY_FACTOR = 3
 
 # Prompt de análise de clipping - O cérebro da automação
 CLIPAGEM_PROMPT = """Você é um analista de mídia da Prefeitura de Santa Maria. Analise o texto do jornal Diário de Santa Maria.
@@ -47,193 +67,429 @@ Texto do Jornal:
 
 
 # ==================== EXTRAÇÃO DE PDF ====================
-def extract_pdf_text():
-    """Extrai texto do PDF com marcadores de página"""
-    print(f"[PDF] Abrindo arquivo: {PDF_PATH}")
-    
-    if not os.path.exists(PDF_PATH):
-        raise FileNotFoundError(f"Arquivo PDF não encontrado: {PDF_PATH}")
+def extract_pdf_text(pdf_path=PDF_PATH):
+    """Extrai texto do PDF com marcadores de página (mapeado em memória, após a pré-checagem)"""
+    log.info(f"[PDF] Abrindo arquivo: {pdf_path}")
     
     try:
-        # Abrir documento PDF
-        doc = fitz.open(PDF_PATH)
-        total_pages = doc.page_count
-        print(f"[PDF] Total de páginas: {total_pages}")
-        
-        extracted_text = ""
-        
-        # Iterar por todas as páginas
-        for page_num in range(total_pages):
-            page = doc[page_num]
-            text = page.get_text()
+        # Abrir documento PDF (recusa downloads truncados antes de extrair)
+        with open_pdf(pdf_path) as doc:
+            total_pages = doc.page_count
+            log.info(f"[PDF] Total de páginas: {total_pages}")
             
-            # Adicionar marcador de página
-            page_marker = f"\n--- Página {page_num + 1} ---\n"
-            extracted_text += page_marker + text
+            extracted_text = ""
             
-            print(f"[PDF] Página {page_num + 1}/{total_pages} extraída ({len(text)} caracteres)")
-        
-        doc.close()
+            # Iterar por todas as páginas
+            for page_num in range(total_pages):
+                page = doc[page_num]
+                text = page.get_text()
+                
+                # Adicionar marcador de página
+                page_marker = f"\n--- Página {page_num + 1} ---\n"
+                extracted_text += page_marker + text
+                
+                page_log.debug("[PDF] Página %d/%d extraída (%d caracteres)", page_num + 1, total_pages, len(text))
         
         total_chars = len(extracted_text)
-        print(f"[PDF] Extração concluída. Total: {total_chars} caracteres")
+        log.info(f"[PDF] Extração concluída. Total: {total_chars} caracteres")
         
         return extracted_text
         
     except Exception as e:
-        print(f"[PDF] ERRO ao extrair texto: {e}")
+        log.error(f"[PDF] ERRO ao extrair texto: {e}")
         raise
 
 
+def extract_pdf_text_to_file(pdf_path, text_path):
+    """Extrai o texto página a página direto para um arquivo (sem montar o texto inteiro em memória)"""
+    log.info(f"[PDF] Abrindo arquivo (streaming para {text_path}): {pdf_path}")
+    
+    total_chars = 0
+    with open_pdf(pdf_path) as doc, open_atomic(text_path, "w", encoding="utf-8") as out:
+        log.info(f"[PDF] Total de páginas: {doc.page_count}")
+        for page_num in range(doc.page_count):
+            text = doc[page_num].get_text()
+            out.write(f"\n--- Página {page_num + 1} ---\n")
+            out.write(text)
+            total_chars += len(text)
+    
+    log.info(f"[PDF] Extração concluída. Total: {total_chars} caracteres")
+    return text_path
+
+
 # ==================== CONFIGURAÇÃO GEMINI ====================
 def configure_gemini():
     """Configura cliente do Google Gemini"""
-    print(f"[GEMINI] Configurando API do Gemini 2.0 Flash...")
+    import google.generativeai as genai  # import pesado (~1s), só quando o modelo é usado
+
+    log.info(f"[GEMINI] Configurando API do Gemini 2.0 Flash...")
     
     if not GEMINI_API_KEY:
         raise ValueError("Variável de ambiente GEMINI_API_KEY não configurada")
     
     genai.configure(api_key=GEMINI_API_KEY)
-    print(f"[GEMINI] API configurada com sucesso")
+    log.info(f"[GEMINI] API configurada com sucesso")
 
 
 # ==================== ANÁLISE COM GEMINI ====================
-def analyze_with_gemini(extracted_text):
-    """Envia texto ao Gemini para análise de clipping"""
-    print(f"[GEMINI] Iniciando análise com modelo {GEMINI_MODEL}...")
-    
+def _error_status(error):
+    """Status HTTP do erro, se houver (google.api_core usa .code; clientes HTTP, .status_code)"""
+    for candidate in (error, getattr(error, "response", None)):
+        for attribute in ("code", "status_code"):
+            status = getattr(candidate, attribute, None)
+            # Em erros gRPC, .code é um método: só vale um número
+            if isinstance(status, int):
+                return int(status)
+    return None
+
+
+def is_retryable_error(error):
+    """Erros transitórios da API (cota 429, 5xx, timeout) que justificam nova tentativa"""
     try:
-        # Preparar prompt com o texto extraído
-        prompt = CLIPAGEM_PROMPT.format(texto_extraido=extracted_text)
-        
-        # Inicializar modelo
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        print(f"[GEMINI] Modelo {GEMINI_MODEL} carregado")
-        
-        # Enviar para análise
-        print(f"[GEMINI] Enviando texto para análise ({len(extracted_text)} caracteres)...")
-        response = model.generate_content(prompt)
-        
-        result_text = response.text
-        print(f"[GEMINI] Resposta recebida ({len(result_text)} caracteres)")
-        
-        return result_text
-        
-    except Exception as e:
-        print(f"[GEMINI] ERRO durante análise: {e}")
-        raise
+        from google.api_core import exceptions as api_exceptions
+    except ImportError:
+        api_exceptions = None
+    if api_exceptions is not None:
+        retryable = tuple(getattr(api_exceptions, name) for name in RETRYABLE_API_ERRORS)
+        if isinstance(error, retryable):
+            return True
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return _error_status(error) in RETRYABLE_STATUS_CODES
+
+
+def _stream_generate(model, prompt):
+    """Gera a resposta em streaming, medindo o tempo até o primeiro token"""
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    
+    response = model.generate_content(prompt, stream=True)
+    for chunk in response:
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        parts.append(chunk.text)
+    
+    return "".join(parts), ttft, getattr(response, "usage_metadata", None)
+
+
+def analyze_with_gemini(extracted_text, prompt_template=None):
+    """Envia texto ao Gemini para análise de clipping, registrando tokens, latência e custo"""
+    log.info(f"[GEMINI] Iniciando análise com modelo {GEMINI_MODEL}...")
+    
+    # Preparar prompt com o texto extraído (prompt da fonte ou o padrão)
+    prompt = (prompt_template or CLIPAGEM_PROMPT).format(texto_extraido=extracted_text)
+    estimated_prompt_tokens = metrics.estimate_tokens(prompt)
+    
+    # Bloqueia (ou avisa) antes de gastar cota além do orçamento
+    metrics.check_budget(estimated_prompt_tokens)
+    
+    # Inicializar modelo
+    import google.generativeai as genai
+
+    model = genai.GenerativeModel(GEMINI_MODEL)
+    log.info(f"[GEMINI] Modelo {GEMINI_MODEL} carregado")
+    
+    start = time.perf_counter()
+    retries = 0
+    while True:
+        try:
+            # Enviar para análise
+            log.info(f"[GEMINI] Enviando texto para análise ({len(extracted_text)} caracteres, ~{estimated_prompt_tokens} tokens)...")
+            result_text, ttft, usage = _stream_generate(model, prompt)
+            break
+        except Exception as e:
+            if retries < GEMINI_MAX_RETRIES and is_retryable_error(e):
+                wait = GEMINI_RETRY_BASE_SECONDS ** (retries + 1)
+                retries += 1
+                log.warning(f"[GEMINI] Erro transitório ({e}). Nova tentativa {retries}/{GEMINI_MAX_RETRIES} em {wait}s...")
+                time.sleep(wait)
+                continue
+            
+            log.error(f"[GEMINI] ERRO durante análise: {e}")
+            metrics.record_model_call(
+                GEMINI_MODEL,
+                prompt_tokens=estimated_prompt_tokens,
+                output_tokens=0,
+                latency_seconds=time.perf_counter() - start,
+                retries=retries,
+                status="error",
+                tokens_estimated=True,
+                error=f"{type(e).__name__}: {e}",
+                prompt_chars=len(prompt),
+            )
+            raise
+    
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    output_tokens = getattr(usage, "candidates_token_count", None)
+    tokens_estimated = prompt_tokens is None or output_tokens is None
+    if tokens_estimated:
+        prompt_tokens = estimated_prompt_tokens
+        output_tokens = metrics.estimate_tokens(result_text)
+    
+    log.info(f"[GEMINI] Resposta recebida ({len(result_text)} caracteres)")
+    metrics.record_model_call(
+        GEMINI_MODEL,
+        prompt_tokens=prompt_tokens,
+        output_tokens=output_tokens,
+        latency_seconds=time.perf_counter() - start,
+        ttft_seconds=ttft,
+        retries=retries,
+        tokens_estimated=tokens_estimated,
+        prompt_chars=len(prompt),
+        response_chars=len(result_text),
+    )
+    
+    return result_text
+
+
+def iter_page_chunks(lines, max_chars=CHUNK_CHARS):
+    """
+    Agrupa páginas inteiras em blocos de até max_chars caracteres (uma página maior
+    que o limite vai sozinha). Aceita o texto extraído ou um arquivo aberto (linha a linha).
+    """
+    if isinstance(lines, str):
+        lines = lines.splitlines(keepends=True)
+    chunk, chunk_chars = [], 0
+    page, page_chars = [], 0
+    for line in lines:
+        if PAGE_MARKER_RE.fullmatch(line) and page:
+            if chunk and chunk_chars + page_chars > max_chars:
+                yield "".join(chunk)
+                chunk, chunk_chars = [], 0
+            chunk.extend(page)
+            chunk_chars += page_chars
+            page, page_chars = [], 0
+        page.append(line)
+        page_chars += len(line)
+    if chunk and chunk_chars + page_chars > max_chars:
+        yield "".join(chunk)
+        chunk = []
+    chunk.extend(page)
+    if "".join(chunk).strip():
+        yield "".join(chunk)
+
+
+def analyze_in_chunks(lines, prompt_template=None, max_chars=CHUNK_CHARS):
+    """Analisa a edição em blocos de páginas (uma chamada por bloco) e junta as notícias"""
+    merged = None
+    for index, chunk in enumerate(iter_page_chunks(lines, max_chars), start=1):
+        log.info(f"[GEMINI] Bloco {index} ({len(chunk)} caracteres)")
+        json_obj = validate_json(clean_gemini_response(analyze_with_gemini(chunk, prompt_template)))
+        if merged is None:
+            merged = json_obj
+        else:
+            merged.setdefault("noticias", []).extend(json_obj.get("noticias", []))
+    if merged is None:
+        raise ValueError("Texto extraído vazio: nenhum bloco para analisar")
+    log.info(f"[GEMINI] {index} bloco(s) analisado(s), {len(merged.get('noticias', []))} notícias no total")
+    return merged
 
 
 # ==================== LIMPEZA E PROCESSAMENTO ====================
 def clean_gemini_response(response_text):
     """Remove marcações de Markdown da resposta do Gemini"""
-    print(f"[CLEANUP] Limpando resposta do Gemini...")
+    log.info(f"[CLEANUP] Limpando resposta do Gemini...")
     
     # Remover blocos de código markdown ```json ... ```
     cleaned = re.sub(r"```json\s*", "", response_text)
     cleaned = re.sub(r"```\s*", "", cleaned)
     cleaned = cleaned.strip()
     
-    print(f"[CLEANUP] Resposta limpa ({len(cleaned)} caracteres)")
+    log.info(f"[CLEANUP] Resposta limpa ({len(cleaned)} caracteres)")
     
     return cleaned
 
 
 def validate_json(json_str):
     """Valida e faz parse do JSON"""
-    print(f"[JSON] Validando JSON...")
+    log.info(f"[JSON] Validando JSON...")
     
     try:
         json_obj = json.loads(json_str)
         
         # Validar estrutura esperada
         if "noticias" not in json_obj:
-            print("[JSON] AVISO: Campo 'noticias' não encontrado")
+            log.warning("[JSON] AVISO: Campo 'noticias' não encontrado")
         
         if "data_clipping" not in json_obj:
-            print("[JSON] AVISO: Campo 'data_clipping' não encontrado")
+            log.warning("[JSON] AVISO: Campo 'data_clipping' não encontrado")
         
-        print(f"[JSON] JSON válido. {len(json_obj.get('noticias', []))} notícias encontradas")
+        log.info(f"[JSON] JSON válido. {len(json_obj.get('noticias', []))} notícias encontradas")
         
         return json_obj
         
     except json.JSONDecodeError as e:
-        print(f"[JSON] ERRO ao fazer parse JSON: {e}")
+        log.error(f"[JSON] ERRO ao fazer parse JSON: {e}")
         raise
 
 
 # ==================== SALVAMENTO ====================
-def save_json_output(json_obj):
-    """Salva resultado JSON no arquivo de saída"""
-    print(f"[OUTPUT] Salvando resultado em: {OUTPUT_PATH}")
+def compute_edition_hash(json_bytes, pdf_path=PDF_PATH):
+    """Identifica a edição pelo hash do PDF analisado (ou do JSON, se o PDF não existir)"""
+    if os.path.exists(pdf_path):
+        return file_sha256(pdf_path)[:16]
+    return hashlib.sha256(json_bytes).hexdigest()[:16]
+
+
+def append_history(json_obj, edition_hash, history_path=HISTORY_PATH):
+    """
+    Acrescenta uma linha NDJSON compacta por notícia ao histórico diário.
+    Reexecuções da mesma edição no mesmo dia (refetch, --from publish) não duplicam o
+    bloco: se o último bloco do dia já tem esse edicao_hash, nada é acrescentado
+    """
+    noticias = json_obj.get("noticias", [])
+    if not isinstance(noticias, list) or not noticias:
+        log.info("[HISTORY] Nenhuma notícia para registrar no histórico")
+        return 0
+    
+    now = datetime.now()
+    day = now.strftime("%Y-%m-%d")
+    latest = history_index.day_summary(history_index.update_index(history_path), day)
+    if latest and latest["edicao_hash"] == edition_hash:
+        log.info(f"[HISTORY] Edição {edition_hash} já registrada em {day}, histórico mantido")
+        return 0
+    
+    base_record = {
+        "data": day,
+        "data_clipping": json_obj.get("data_clipping", ""),
+        "edicao_hash": edition_hash,
+        "gerado_em": now.isoformat(timespec="seconds"),
+    }
+    lines = [
+        dumps_json({**base_record, "indice": idx, "noticia": noticia})
+        for idx, noticia in enumerate(noticias)
+    ]
+    
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    # Uma única escrita em modo append: o bloco do dia entra inteiro no final do arquivo
+    with open(history_path, "ab") as f:
+        f.write(b"\n".join(lines) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    
+    log.info(f"[HISTORY] {len(lines)} registros acrescentados em: {history_path}")
+    return len(lines)
+
+
+def save_json_output(json_obj, output_path=OUTPUT_PATH, history_path=HISTORY_PATH, pdf_path=PDF_PATH):
+    """Salva resultado JSON de forma atômica e registra as notícias no histórico NDJSON"""
+    log.info(f"[OUTPUT] Salvando resultado em: {output_path}")
+    log.info(f"[OUTPUT] Backend JSON: {JSON_BACKEND}")
     
     try:
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+        json_bytes = dumps_json(json_obj, pretty=True)
+        
+        # Leitores (dashboard) nunca enxergam um arquivo pela metade
+        write_atomic(output_path, json_bytes)
+        
+        file_size = os.path.getsize(output_path)
+        log.info(f"[OUTPUT] Arquivo salvo com sucesso ({file_size} bytes)")
+        log.info(f"[OUTPUT] Caminho: {output_path}")
+        
+        # Com backend de artefatos configurado, o JSON sai do git (fica só o ponteiro)
+        artifact_store.publish(output_path)
+        
+        # Visões derivadas (licitações, agrupamentos, texto de compartilhamento) para os dashboards
+        views_path = views.save_views(json_obj, json_bytes, output_path)
+        artifact_store.publish(views_path)
         
-        # Salvar com formatação
-        with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-            json.dump(json_obj, f, ensure_ascii=False, indent=2)
+        # Exportações (WhatsApp em partes, CSV, Markdown, HTML) prontas para download
+        try:
+            exports.save_exports(json_obj, hashlib.sha256(json_bytes).hexdigest(), views.pick_summary(json_obj))
+        except OSError as e:
+            log.warning(f"[EXPORTS] AVISO: exportações não geradas ({e}); o dashboard gera sob demanda")
         
-        file_size = os.path.getsize(OUTPUT_PATH)
-        print(f"[OUTPUT] Arquivo salvo com sucesso ({file_size} bytes)")
-        print(f"[OUTPUT] Caminho: {OUTPUT_PATH}")
+        append_history(json_obj, compute_edition_hash(json_bytes, pdf_path), history_path)
         
-        return OUTPUT_PATH
+        # Resumos por dia pré-calculados para o navegador de histórico do dashboard
+        history_index.update_index(history_path)
+        
+        return output_path
         
     except Exception as e:
-        print(f"[OUTPUT] ERRO ao salvar arquivo: {e}")
+        log.error(f"[OUTPUT] ERRO ao salvar arquivo: {e}")
         raise
 
 
 # ==================== EXECUÇÃO PRINCIPAL ====================
-def main():
-    """Função principal do analisador"""
-    print("=" * 70)
-    print("INICIANDO ANALISADOR DE CLIPPING - GEMINI 2.0 FLASH")
-    print("=" * 70)
+@contextmanager
+def _step(name):
+    """Etapa do analisador: duração nos logs e, se ligado, perfil de memória"""
+    with logs.stage(name, log), memory_profile.stage(name):
+        yield
+
+
+def main(source=None):
+    """Função principal do analisador (fonte padrão ou fonte do registro)"""
+    pdf_path, output_path, history_path, prompt_template = PDF_PATH, OUTPUT_PATH, HISTORY_PATH, None
+    if source is not None:
+        pdf_path, output_path, history_path = source.pdf_path, source.output_path, source.history_path
+        prompt_template = source.prompt
+    
+    log.info("INICIANDO ANALISADOR DE CLIPPING - GEMINI 2.0 FLASH")
     
+    text_path = None
+    json_obj = None
     try:
-        # Etapa 1: Extrair PDF
-        print("\n[ETAPA 1] Extração de PDF")
-        print("-" * 70)
-        extracted_text = extract_pdf_text()
+        # Etapa 1: Extrair PDF (direto para arquivo se o orçamento de memória não comporta)
+        log.info("[ETAPA 1] Extração de PDF")
+        with _step("analyzer.extract"):
+            pdf_size = os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0
+            if memory_profile.over_budget(pdf_size * EXTRACT_MEMORY_FACTOR, "extração do PDF"):
+                text_path = extract_pdf_text_to_file(pdf_path, os.path.splitext(output_path)[0] + "_texto.txt")
+            else:
+                extracted_text = extract_pdf_text(pdf_path)
         
         # Etapa 2: Configurar Gemini
-        print("\n[ETAPA 2] Configuração do Gemini")
-        print("-" * 70)
-        configure_gemini()
+        log.info("[ETAPA 2] Configuração do Gemini")
+        with _step("analyzer.configure"):
+            configure_gemini()
         
-        # Etapa 3: Análise com Gemini
-        print("\n[ETAPA 3] Análise com Gemini")
-        print("-" * 70)
-        gemini_response = analyze_with_gemini(extracted_text)
+        # Etapa 3: Análise com Gemini (em blocos de páginas no caminho econômico)
+        log.info("[ETAPA 3] Análise com Gemini")
+        with _step("analyzer.analyze"):
+            if text_path is not None:
+                with open(text_path, "r", encoding="utf-8") as f:
+                    json_obj = analyze_in_chunks(f, prompt_template)
+                os.remove(text_path)
+            elif memory_profile.over_budget(len(extracted_text) * ANALYZE_MEMORY_FACTOR, "análise"):
+                json_obj = analyze_in_chunks(extracted_text, prompt_template)
+            else:
+                gemini_response = analyze_with_gemini(extracted_text, prompt_template)
+            extracted_text = None  # intermediários liberados assim que deixam de ser usados
         
-        # Etapa 4: Limpeza da resposta
-        print("\n[ETAPA 4] Limpeza de Markdown")
-        print("-" * 70)
-        cleaned_response = clean_gemini_response(gemini_response)
-        
-        # Etapa 5: Validação JSON
-        print("\n[ETAPA 5] Validação JSON")
-        print("-" * 70)
-        json_obj = validate_json(cleaned_response)
+        if json_obj is None:
+            # Etapa 4: Limpeza da resposta
+            log.info("[ETAPA 4] Limpeza de Markdown")
+            with _step("analyzer.clean"):
+                cleaned_response = clean_gemini_response(gemini_response)
+                del gemini_response
+            
+            # Etapa 5: Validação JSON
+            log.info("[ETAPA 5] Validação JSON")
+            with _step("analyzer.validate"):
+                json_obj = validate_json(cleaned_response)
+                del cleaned_response
         
         # Etapa 6: Salvamento
-        print("\n[ETAPA 6] Salvamento de Resultado")
-        print("-" * 70)
-        output_file = save_json_output(json_obj)
+        log.info("[ETAPA 6] Salvamento de Resultado")
+        with _step("analyzer.save"):
+            output_file = save_json_output(json_obj, output_path, history_path, pdf_path)
+        
+        # Opcional: miniaturas das páginas citadas já prontas para o dashboard
+        if PREWARM_THUMBNAILS:
+            try:
+                thumbnails.prewarm(pdf_path, json_obj.get("noticias", []))
+            except Exception as e:
+                log.warning(f"[THUMBS] AVISO: falha ao pré-gerar miniaturas: {e}")
         
-        print("\n" + "=" * 70)
-        print(f"✓ SUCESSO! Análise concluída e salva em: {output_file}")
-        print("=" * 70)
+        log.info(f"✓ SUCESSO! Análise concluída e salva em: {output_file}")
         
         return output_file
         
     except Exception as e:
-        print("\n" + "=" * 70)
-        print(f"✗ ERRO DURANTE EXECUÇÃO: {e}")
-        print("=" * 70)
+        log.error(f"✗ ERRO DURANTE EXECUÇÃO: {e}")
         raise
 
 
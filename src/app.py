@@ -2,17 +2,25 @@
 Dashboard de Leitura - Clipagem Diario de Santa Maria
 """
 
-import json
 import os
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict
 
-import requests
 import streamlit as st
 
+import artifact_store
+import data_loader
+import exports
+import github_dispatch
+import history_index
+import job_runner
+import thumbnails
+import views
+
 
 DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "clipagem_hoje.json")
 PDF_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "diario_sm_atual.pdf")
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "historico_clipagem.ndjson")
 
 
 CSS_STYLE = """
@@ -179,42 +187,20 @@ CSS_STYLE = """
 """
 
 
-@st.cache_data(show_spinner=False)
 def load_clipagem() -> Dict[str, Any] | None:
-    if not os.path.exists(DATA_PATH):
-        return None
-
+    # Cache por versão do arquivo (mtime + tamanho): novos resultados aparecem sem recarregar
     try:
-        with open(DATA_PATH, "r", encoding="utf-8") as handle:
-            return json.load(handle)
-    except (OSError, json.JSONDecodeError):
+        return data_loader.load_json(DATA_PATH)
+    except (OSError, ValueError):
         return None
 
 
-def pick_summary(payload: Dict[str, Any]) -> str:
-    for key in ("resumo_gemini", "resumo", "observacao"):
-        value = payload.get(key)
-        if isinstance(value, str) and value.strip():
-            return value.strip()
-    return ""
-
-
-def find_licitacoes(noticias: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    results: List[Dict[str, Any]] = []
-    for noticia in noticias:
-        titulo = str(noticia.get("titulo", ""))
-        resumo = str(noticia.get("resumo_120_chars", ""))
-        texto = f"{titulo} {resumo}".lower()
-        if "licit" in texto:
-            results.append(
-                {
-                    "pagina": noticia.get("pagina", "-"),
-                    "titulo": titulo,
-                    "resumo": resumo,
-                    "relevancia": noticia.get("relevancia", ""),
-                }
-            )
-    return results
+def load_views() -> Dict[str, Any] | None:
+    # Visões pré-calculadas pelo analisador (licitações, resumo, contagens)
+    try:
+        return views.load_views(DATA_PATH)
+    except (OSError, ValueError):
+        return None
 
 
 def format_timestamp(path: str) -> str:
@@ -227,35 +213,145 @@ def format_timestamp(path: str) -> str:
     return timestamp.strftime("%d/%m/%Y %H:%M:%S")
 
 
-def trigger_github_action() -> tuple[bool, str]:
-    url = (
-        "https://api.github.com/repos/lenondpaula/clipagem/"
-        "actions/workflows/daily_run.yml/dispatches"
+def render_history() -> None:
+    index = history_index.load_index(HISTORY_PATH)
+    days = history_index.available_days(index)
+    if not days:
+        st.info("Histórico ainda vazio.")
+        return
+
+    latest = datetime.strptime(days[0], "%Y-%m-%d").date()
+    oldest = datetime.strptime(days[-1], "%Y-%m-%d").date()
+    col_date, col_page = st.columns([2, 1])
+    with col_date:
+        selected = st.date_input(
+            "Data da clipagem",
+            value=latest,
+            min_value=oldest,
+            max_value=latest,
+            format="DD/MM/YYYY",
+            key="history_date",
+        )
+
+    day = selected.isoformat()
+    summary = history_index.day_summary(index, day)
+    if not summary:
+        st.info("Nenhuma clipagem registrada nesta data.")
+        return
+
+    total_pages = history_index.page_count(index, day)
+    with col_page:
+        page = st.number_input("Página", min_value=1, max_value=total_pages, value=1, key="history_page")
+
+    relevancia = summary["por_relevancia"]
+    st.caption(
+        f"{summary['data_clipping'] or day} | {summary['total']} notícias | "
+        f"Alta: {relevancia['alta']} · Média: {relevancia['media']} · Baixa: {relevancia['baixa']} | "
+        f"Licitações: {summary['licitacoes']}"
     )
+    st.dataframe(
+        history_index.read_page(index, day, int(page), history_path=HISTORY_PATH),
+        use_container_width=True,
+    )
+
+
+def render_page_thumbnails(noticias: list) -> None:
+    pages = thumbnails.cited_pages(noticias)
+    if not pages or not st.toggle("Mostrar páginas citadas", key="show_thumbnails"):
+        return
+
+    # Renderização só acontece quando o leitor pede; depois vem do cache em disco
+    columns = st.columns(4)
+    for position, page in enumerate(pages):
+        image_path = thumbnails.page_image(PDF_PATH, page)
+        if image_path:
+            columns[position % 4].image(image_path, caption=f"Pág. {page}", use_container_width=True)
+
+    zoom_page = st.selectbox(
+        "Ampliar página",
+        pages,
+        index=None,
+        placeholder="Escolha uma página",
+        key="zoom_page",
+    )
+    if zoom_page:
+        zoom_path = thumbnails.page_image(PDF_PATH, zoom_page, thumbnails.ZOOM_DPI)
+        if zoom_path:
+            st.image(zoom_path, caption=f"Página {zoom_page}", use_container_width=True)
+
+
+def get_github_token() -> str:
     try:
-        token = st.secrets.get("GH_TOKEN", "")
+        return st.secrets.get("GH_TOKEN", "")
     except Exception:
-        return False, "GH_TOKEN não configurado no Streamlit Secrets."
+        return ""
+
+
+def trigger_github_action() -> tuple[bool, str]:
+    token = get_github_token()
     if not token:
         return False, "GH_TOKEN não configurado no Streamlit Secrets."
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    payload = {"ref": "main"}
+    # Coalescência: não dispara de novo se já houver execução ativa ou disparo recente
+    return github_dispatch.get_dispatcher(token).dispatch()
 
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=20)
-    except requests.RequestException as exc:
-        return False, f"Erro ao chamar GitHub API: {exc}"
 
-    if response.status_code == 204:
-        return True, "Solicitação enviada! O robô iniciou o processamento. Aguarde cerca de 2 minutos."
+def render_run_status() -> None:
+    token = get_github_token()
+    if not token:
+        return
+    dispatcher = github_dispatch.get_dispatcher(token)
+
+    @st.fragment(run_every=github_dispatch.POLL_MIN_SECONDS if dispatcher.is_tracking() else None)
+    def run_status() -> None:
+        run = dispatcher.poll()
+        if run is None:
+            if dispatcher.is_tracking():
+                st.caption("Aguardando a execução aparecer no GitHub...")
+            elif dispatcher.run_not_found:
+                st.caption("A execução disparada não apareceu no GitHub. Confira a aba Actions do repositório.")
+            return
+
+        st.caption(github_dispatch.describe_run(run))
+        # Execução concluída: recarrega a página uma única vez por sessão
+        if run.get("status") == "completed" and st.session_state.get("refreshed_run_id") != run.get("id"):
+            st.session_state["refreshed_run_id"] = run.get("id")
+            if run.get("conclusion") == "success":
+                st.rerun()
+
+    run_status()
+
+
+def trigger_local_job() -> tuple[bool, str]:
+    job, created = job_runner.get_runner().submit(requested_by="Verificar Edição Agora")
+    st.session_state["local_job_id"] = job.id
+    if created:
+        return True, "Job local enfileirado. Acompanhe o progresso abaixo."
+    return True, "Já existe um job idêntico na fila. Acompanhando..."
+
+
+def render_local_job() -> None:
+    runner = job_runner.get_runner()
+    job = runner.get(st.session_state.get("local_job_id", ""))
+    if job is None:
+        return
+
+    @st.fragment(run_every=2 if job.status in job_runner.PENDING_STATES else None)
+    def job_status() -> None:
+        position = runner.queue_position(job)
+        if job.status == "queued" and position:
+            st.caption(f"Job {job.id}: aguardando (posição {position} na fila)")
+        else:
+            st.caption(f"Job {job.id}: {job.status}")
+        for event in list(job.events)[-5:]:
+            st.caption(f"{event['ts'][11:]} · {event['message']}")
+
+        # Job concluído: recarrega a página uma única vez por sessão
+        if job.status in job_runner.FINAL_STATES and st.session_state.get("refreshed_job_id") != job.id:
+            st.session_state["refreshed_job_id"] = job.id
+            st.rerun()
 
-    message = response.text.strip() or "Resposta inesperada da API."
-    return False, f"Falha ao disparar workflow ({response.status_code}): {message}"
+    job_status()
 
 
 st.set_page_config(page_title="Clipagem - Dashboard", page_icon="🗞️", layout="wide")
@@ -275,18 +371,31 @@ with st.sidebar:
     st.markdown("<div class='sidebar-card'>", unsafe_allow_html=True)
     st.markdown("<div class='sidebar-title'>Ações rápidas</div>", unsafe_allow_html=True)
     if st.button("Recarregar Dados"):
+        data_loader.clear_cache()
         st.cache_data.clear()
         st.rerun()
 
     if st.button("🔄 Verificar Edição Agora"):
-        ok, info_message = trigger_github_action()
+        # Implantação própria: executa aqui mesmo, sem provisionar uma VM no GitHub
+        if job_runner.LOCAL_RUNNER_ENABLED:
+            ok, info_message = trigger_local_job()
+        else:
+            ok, info_message = trigger_github_action()
         if ok:
             st.sidebar.info(info_message)
         else:
             st.sidebar.error(info_message)
+    if job_runner.LOCAL_RUNNER_ENABLED:
+        render_local_job()
+    else:
+        render_run_status()
     st.markdown("</div>", unsafe_allow_html=True)
 
+# Cópias locais alinhadas ao ponteiro data/artifacts.json (baixa só quando mudou)
+artifact_store.sync_local(DATA_PATH, views.views_path_for(DATA_PATH), PDF_PATH)
+
 clipagem = load_clipagem()
+clipagem_views = load_views() if clipagem else None
 
 if not clipagem:
     st.markdown(
@@ -314,7 +423,7 @@ else:
         )
 
     st.subheader("Resumo em destaque")
-    summary = pick_summary(clipagem)
+    summary = clipagem_views["resumo"] if clipagem_views else ""
     if summary:
         st.markdown(
             f"<div class='card'>{summary}</div>",
@@ -324,23 +433,47 @@ else:
         st.info("Resumo ainda não disponível.")
 
     st.subheader("Licitações encontradas")
-    noticias = clipagem.get("noticias", [])
-    licitacoes = find_licitacoes(noticias) if isinstance(noticias, list) else []
+    licitacoes = clipagem_views["licitacoes"] if clipagem_views else []
 
     if licitacoes:
         st.dataframe(licitacoes, use_container_width=True)
     else:
         st.warning("Nenhuma licitação identificada no clipping de hoje.")
 
+    st.subheader("Exportar")
+    try:
+        clipagem_exports = exports.load_exports(DATA_PATH)
+    except (OSError, ValueError):
+        clipagem_exports = None
+    if clipagem_exports:
+        export_columns = st.columns(len(clipagem_exports["files"]))
+        for column, (key, arquivo) in zip(export_columns, clipagem_exports["files"].items()):
+            with column:
+                st.download_button(
+                    label=f"Baixar {arquivo['file_name']}",
+                    data=arquivo["data"],
+                    file_name=arquivo["file_name"],
+                    mime=arquivo["mime"],
+                    key=f"export_{key}",
+                )
+        with st.expander(f"Mensagens para WhatsApp ({len(clipagem_exports['whatsapp'])})"):
+            for mensagem in clipagem_exports["whatsapp"]:
+                st.code(mensagem, language="text")
+
+st.subheader("Histórico de clipagens")
+render_history()
+
 st.subheader("PDF original")
-if os.path.exists(PDF_PATH):
-    with open(PDF_PATH, "rb") as pdf_file:
-        st.download_button(
-            label="Baixar PDF do Diário",
-            data=pdf_file,
-            file_name="diario_sm_atual.pdf",
-            mime="application/pdf",
-        )
+pdf_bytes = data_loader.load_pdf_bytes(PDF_PATH)
+if pdf_bytes:
+    st.download_button(
+        label="Baixar PDF do Diário",
+        data=pdf_bytes,
+        file_name="diario_sm_atual.pdf",
+        mime="application/pdf",
+    )
+    if clipagem and isinstance(clipagem.get("noticias"), list):
+        render_page_thumbnails(clipagem["noticias"])
 else:
     st.info("PDF do dia ainda não disponível.")
 
@@ -0,0 +1,245 @@
+"""
+Armazenamento de Artefatos - PDFs e JSONs fora do repositório git
+Os arquivos gerados são enviados para um backend (pasta local ou bucket compatível com
+S3) com chave pelo conteúdo (SHA-256); no git fica apenas o ponteiro data/artifacts.json
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+import data_loader
+from io_utils import dumps_json, file_sha256, write_atomic
+import logs
+from sources import BASE_DIR, DATA_FOLDER
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("artifact_store")
+# "none" mantém o comportamento antigo (arquivos versionados em data/)
+STORE_BACKEND = os.getenv("CLIPAGEM_ARTIFACT_STORE", "none").lower()
+LOCAL_STORE_DIR = os.getenv("CLIPAGEM_ARTIFACT_DIR", os.path.join(BASE_DIR, "..", "clipagem-artifacts"))
+S3_BUCKET = os.getenv("CLIPAGEM_S3_BUCKET", "")
+S3_PREFIX = os.getenv("CLIPAGEM_S3_PREFIX", "clipagem/")
+# Endpoint configurável: MinIO, R2 ou um servidor local de testes
+S3_ENDPOINT_URL = os.getenv("CLIPAGEM_S3_ENDPOINT_URL", "")
+
+MANIFEST_PATH = os.path.join(DATA_FOLDER, "artifacts.json")
+MANIFEST_SCHEMA = 1
+
+_MANIFEST_LOCK = threading.Lock()
+_FETCH_LOCKS = {}
+_FETCH_LOCKS_GUARD = threading.Lock()
+
+
+# ==================== BACKENDS ====================
+class LocalDirectoryStore:
+    """Backend em pasta local (servidor próprio, volume montado ou testes)"""
+
+    name = "local"
+
+    def __init__(self, root=LOCAL_STORE_DIR):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    @staticmethod
+    def _copy_atomic(source_path, target_path):
+        """Cópia por arquivo temporário no destino; o temporário nunca fica para trás"""
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(os.path.abspath(target_path)))
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, target_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def put(self, local_path, key):
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        self._copy_atomic(local_path, target)
+
+    def get(self, key, local_path):
+        self._copy_atomic(self._path(key), local_path)
+
+
+class S3Store:
+    """Backend S3 (AWS ou compatível), credenciais pelas variáveis padrão AWS_*"""
+
+    name = "s3"
+
+    def __init__(self, bucket=S3_BUCKET, prefix=S3_PREFIX, endpoint_url=S3_ENDPOINT_URL, client=None):
+        if not bucket:
+            raise ValueError("CLIPAGEM_S3_BUCKET não configurado")
+        if client is None:
+            import boto3  # dependência opcional, só para este backend
+
+            client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except Exception as e:
+            status = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if status in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put(self, local_path, key):
+        self.client.upload_file(local_path, self.bucket, self.prefix + key)
+
+    def get(self, key, local_path):
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(os.path.abspath(local_path)))
+        os.close(fd)
+        try:
+            self.client.download_file(self.bucket, self.prefix + key, tmp_path)
+            os.replace(tmp_path, local_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+_STORE = None
+
+
+def get_store():
+    """Backend configurado em CLIPAGEM_ARTIFACT_STORE (None = desativado)"""
+    global _STORE
+    if STORE_BACKEND in ("", "none"):
+        return None
+    if _STORE is None:
+        if STORE_BACKEND == "local":
+            _STORE = LocalDirectoryStore()
+        elif STORE_BACKEND == "s3":
+            _STORE = S3Store()
+        else:
+            raise ValueError(f"Backend de artefatos desconhecido: {STORE_BACKEND}")
+    return _STORE
+
+
+# ==================== MANIFESTO ====================
+def artifact_name(local_path):
+    """Nome lógico = caminho relativo a data/ (ex.: 'diario_sm_atual.pdf', 'outro/clipagem_hoje.json')"""
+    return os.path.relpath(os.path.abspath(local_path), os.path.abspath(DATA_FOLDER)).replace(os.sep, "/")
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        manifest = data_loader.load_json(path)
+    except (OSError, ValueError):
+        manifest = None
+    if not manifest or manifest.get("schema") != MANIFEST_SCHEMA:
+        return {"schema": MANIFEST_SCHEMA, "artifacts": {}}
+    return manifest
+
+
+def _content_key(name, sha256):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}/{sha256}{ext}"
+
+
+# ==================== PUBLICAÇÃO (PIPELINE) ====================
+def publish(local_path, store=None, manifest_path=MANIFEST_PATH):
+    """
+    Envia o arquivo ao backend (se o conteúdo ainda não estiver lá) e atualiza o ponteiro.
+    Sem backend configurado, não faz nada e retorna None.
+    """
+    store = store or get_store()
+    if store is None:
+        return None
+
+    name = artifact_name(local_path)
+    sha256 = file_sha256(local_path)
+    key = _content_key(name, sha256)
+    if not store.exists(key):
+        store.put(local_path, key)
+        log.info(f"[ARTIFACTS] {name} enviado para {store.name}:{key}")
+    else:
+        log.info(f"[ARTIFACTS] {name} já existe em {store.name}:{key}")
+
+    entry = {
+        "key": key,
+        "sha256": sha256,
+        "size": os.path.getsize(local_path),
+        "backend": store.name,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    # Várias fontes podem publicar em paralelo (multi_runner)
+    with _MANIFEST_LOCK:
+        manifest = load_manifest(manifest_path)
+        manifest = {"schema": MANIFEST_SCHEMA, "artifacts": {**manifest["artifacts"], name: entry}}
+        write_atomic(manifest_path, dumps_json(manifest, pretty=True))
+    return entry
+
+
+# ==================== LEITURA (DASHBOARDS) ====================
+def _fetch_lock(path):
+    with _FETCH_LOCKS_GUARD:
+        return _FETCH_LOCKS.setdefault(os.path.abspath(path), threading.Lock())
+
+
+def ensure_local(local_path, store=None, manifest_path=MANIFEST_PATH):
+    """
+    Garante que a cópia local corresponde ao ponteiro do manifesto, baixando se preciso.
+    Caso normal = um os.stat (hash em cache por versão do arquivo). Em falha, mantém a
+    cópia local existente.
+    """
+    entry = load_manifest(manifest_path)["artifacts"].get(artifact_name(local_path))
+    if entry is None or data_loader.file_digest(local_path) == entry["sha256"]:
+        return local_path
+
+    with _fetch_lock(local_path):
+        if data_loader.file_digest(local_path) == entry["sha256"]:
+            return local_path
+        try:
+            store = store or get_store()
+            if store is None:
+                log.warning(f"[ARTIFACTS] AVISO: {artifact_name(local_path)} está no backend, mas nenhum está configurado")
+                return local_path
+            os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+            store.get(entry["key"], local_path)
+            log.info(f"[ARTIFACTS] {artifact_name(local_path)} baixado de {store.name}:{entry['key']}")
+        except Exception as e:
+            log.warning(f"[ARTIFACTS] AVISO: não foi possível baixar {entry['key']}: {e}")
+    return local_path
+
+
+def sync_local(*local_paths):
+    """ensure_local para vários arquivos (chamado no início de cada rerun dos dashboards)"""
+    for local_path in local_paths:
+        ensure_local(local_path)
+
+
+# ==================== CLI (WORKFLOW) ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Artefatos da clipagem fora do git")
+    parser.add_argument(
+        "--list-local",
+        action="store_true",
+        help="Lista (relativo à raiz do repositório) os arquivos publicados no backend",
+    )
+    args = parser.parse_args(argv)
+
+    if args.list_local:
+        for name in load_manifest()["artifacts"]:
+            path = os.path.join(DATA_FOLDER, *name.split("/"))
+            print(os.path.relpath(path, BASE_DIR).replace(os.sep, "/"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Analisador em Lote - Reprocessa um acervo de PDFs com o Gemini
+Extrai texto em um pool de processos, analisa com chamadas concorrentes limitadas,
+retoma a partir dos arquivos já concluídos e gera um resumo com a vazão da execução
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import analyzer
+import logs
+from sources import DATA_FOLDER, get_source
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("batch_analyzer")
+DEFAULT_OUTPUT_FOLDER = os.path.join(DATA_FOLDER, "lote")
+PROGRESS_FILENAME = "_progresso.ndjson"
+SUMMARY_FILENAME = "_resumo.json"
+PAGE_MARKER = "\n--- Página "
+# PDFs em andamento (extraindo ou com o texto aguardando o modelo) por processo de extração
+IN_FLIGHT_PER_WORKER = 2
+
+
+# ==================== ENTRADAS ====================
+def resolve_inputs(patterns):
+    """Expande diretórios e globs em uma lista ordenada de PDFs"""
+    pdf_files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pdf_files.update(glob.glob(os.path.join(pattern, "**", "*.pdf"), recursive=True))
+        else:
+            pdf_files.update(path for path in glob.glob(pattern, recursive=True) if path.lower().endswith(".pdf"))
+    return sorted(os.path.abspath(path) for path in pdf_files)
+
+
+def common_base_folder(patterns, pdf_files):
+    """
+    Pasta comum às entradas: os nomes dos resultados ficam relativos a ela, então PDFs
+    homônimos vindos de pastas diferentes não se sobrescrevem
+    """
+    folders = [os.path.abspath(pattern) for pattern in patterns if os.path.isdir(pattern)]
+    folders += [os.path.dirname(path) for path in pdf_files]
+    try:
+        return os.path.commonpath(folders) if folders else None
+    except ValueError:
+        # Unidades diferentes no Windows: sem pasta comum
+        return None
+
+
+def input_fingerprint(pdf_path, prompt_hash):
+    """Identifica a combinação arquivo + prompt para retomada da execução"""
+    info = os.stat(pdf_path)
+    return f"{pdf_path}|{info.st_size}|{info.st_mtime_ns}|{prompt_hash}"
+
+
+def load_completed(progress_path):
+    """Lê as impressões digitais dos arquivos já concluídos"""
+    completed = set()
+    if not os.path.exists(progress_path):
+        return completed
+
+    with open(progress_path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Linha truncada por uma interrupção anterior
+                continue
+            if record.get("status") == "ok":
+                completed.add(record["fingerprint"])
+    return completed
+
+
+def output_name(pdf_path, base_folder):
+    """Nome do resultado: caminho relativo do PDF, achatado, com extensão .json"""
+    relative = os.path.relpath(pdf_path, base_folder) if base_folder else os.path.basename(pdf_path)
+    stem = os.path.splitext(relative)[0].replace(os.sep, "__")
+    return f"{stem}.json"
+
+
+# ==================== ETAPAS ====================
+def _extract_worker(pdf_path):
+    """Extrai o texto de um PDF (executado em processo separado)"""
+    start = time.perf_counter()
+    text = analyzer.extract_pdf_text(pdf_path)
+    return {
+        "text": text,
+        "pages": text.count(PAGE_MARKER),
+        "extract_seconds": time.perf_counter() - start,
+    }
+
+
+def _analyze_and_save(pdf_path, extraction, prompt_template, output_path):
+    """Analisa o texto com o Gemini, valida e grava o resultado individual"""
+    start = time.perf_counter()
+    response = analyzer.analyze_with_gemini(extraction["text"], prompt_template)
+    json_obj = analyzer.validate_json(analyzer.clean_gemini_response(response))
+    analyzer.write_atomic(output_path, analyzer.dumps_json(json_obj, pretty=True))
+    return {
+        "noticias": len(json_obj.get("noticias", [])),
+        "analyze_seconds": time.perf_counter() - start,
+    }
+
+
+# ==================== EXECUÇÃO DO LOTE ====================
+def run_batch(pdf_files, output_folder, prompt_template=None, workers=None, concurrency=2,
+              force=False, base_folder=None):
+    """Processa os PDFs e retorna o resumo da execução"""
+    os.makedirs(output_folder, exist_ok=True)
+    progress_path = os.path.join(output_folder, PROGRESS_FILENAME)
+    prompt_hash = hashlib.sha256((prompt_template or analyzer.CLIPAGEM_PROMPT).encode("utf-8")).hexdigest()[:12]
+
+    completed = set() if force else load_completed(progress_path)
+    pending = [path for path in pdf_files if input_fingerprint(path, prompt_hash) not in completed]
+    skipped = len(pdf_files) - len(pending)
+    log.info(f"[BATCH] {len(pdf_files)} PDF(s) encontrados, {skipped} já concluídos, {len(pending)} pendentes")
+
+    results = []
+    progress_lock = threading.Lock()
+    batch_start = time.perf_counter()
+
+    def record(entry):
+        with progress_lock:
+            results.append(entry)
+            with open(progress_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    if pending:
+        analyzer.configure_gemini()
+
+    def on_analyzed(future, entry, output_path):
+        # Registra o progresso assim que cada análise termina (retomada segura)
+        try:
+            outcome = future.result()
+        except Exception as e:
+            log.error(f"[BATCH] ✗ Falha na análise de {entry['file']}: {e}")
+            record({**entry, "status": "error", "stage": "analyze", "error": str(e)})
+            return
+
+        log.info(f"[BATCH] ✓ {entry['file']} -> {output_path}")
+        record({
+            **entry,
+            "status": "ok",
+            "output": output_path,
+            "noticias": outcome["noticias"],
+            "analyze_seconds": round(outcome["analyze_seconds"], 3),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+        })
+
+    # Janela deslizante: um PDF só entra quando outro termina a análise, então o texto
+    # extraído nunca se acumula sem limite na fila do modelo
+    max_in_flight = max(1, workers or os.cpu_count() or 1) * IN_FLIGHT_PER_WORKER
+    queue = iter(pending)
+    in_flight = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as extract_pool, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="gemini") as model_pool:
+
+        def fill_window():
+            while len(in_flight) < max_in_flight:
+                pdf_path = next(queue, None)
+                if pdf_path is None:
+                    return
+                entry = {
+                    "file": pdf_path,
+                    "fingerprint": input_fingerprint(pdf_path, prompt_hash),
+                    "prompt_hash": prompt_hash,
+                }
+                in_flight[extract_pool.submit(_extract_worker, pdf_path)] = ("extract", entry, None)
+
+        fill_window()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, entry, output_path = in_flight.pop(future)
+                if stage == "analyze":
+                    on_analyzed(future, entry, output_path)
+                    continue
+
+                # Cada extração concluída já segue para a análise, sem esperar o lote inteiro
+                try:
+                    extraction = future.result()
+                except Exception as e:
+                    log.error(f"[BATCH] ✗ Falha na extração de {entry['file']}: {e}")
+                    record({**entry, "status": "error", "stage": "extract", "error": str(e)})
+                    continue
+
+                entry.update(pages=extraction["pages"], extract_seconds=round(extraction["extract_seconds"], 3))
+                output_path = os.path.join(output_folder, output_name(entry["file"], base_folder))
+                analyze_future = model_pool.submit(
+                    _analyze_and_save, entry["file"], extraction, prompt_template, output_path
+                )
+                in_flight[analyze_future] = ("analyze", entry, output_path)
+            fill_window()
+
+    elapsed = time.perf_counter() - batch_start
+    ok = [entry for entry in results if entry["status"] == "ok"]
+    total_pages = sum(entry.get("pages", 0) for entry in results)
+    extract_seconds = sum(entry.get("extract_seconds", 0) for entry in results)
+
+    summary = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "prompt_hash": prompt_hash,
+        "inputs": len(pdf_files),
+        "skipped": skipped,
+        "processed": len(results),
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "pages": total_pages,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput": {
+            "pages_per_second": round(total_pages / elapsed, 2) if elapsed else 0.0,
+            "extract_pages_per_cpu_second": round(total_pages / extract_seconds, 2) if extract_seconds else 0.0,
+            "documents_per_minute": round(len(ok) / (elapsed / 60), 2) if elapsed else 0.0,
+        },
+        "files": sorted(results, key=lambda entry: entry["file"]),
+    }
+    summary_path = os.path.join(output_folder, SUMMARY_FILENAME)
+    analyzer.write_atomic(summary_path, analyzer.dumps_json(summary, pretty=True))
+    log.info(f"[BATCH] Resumo salvo em: {summary_path}")
+    return summary
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def main(argv=None):
+    """Função principal do analisador em lote"""
+    parser = argparse.ArgumentParser(description="Analisa um diretório (ou glob) de PDFs com o Gemini")
+    parser.add_argument("inputs", nargs="+", help="Diretórios ou padrões glob de PDFs")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_FOLDER, help="Pasta dos resultados")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de extração (padrão: nº de CPUs)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Chamadas simultâneas ao modelo")
+    parser.add_argument("--source", default="", help="Usa o prompt de uma fonte do registro")
+    parser.add_argument("--force", action="store_true", help="Ignora o progresso salvo e reprocessa tudo")
+    args = parser.parse_args(argv)
+
+    pdf_files = resolve_inputs(args.inputs)
+    if not pdf_files:
+        log.info("[BATCH] Nenhum PDF encontrado nas entradas informadas")
+        return 1
+
+    prompt_template = get_source(args.source).prompt if args.source else None
+    base_folder = common_base_folder(args.inputs, pdf_files)
+
+    log.info("INICIANDO ANALISADOR EM LOTE")
+
+    summary = run_batch(
+        pdf_files,
+        args.output,
+        prompt_template=prompt_template,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        force=args.force,
+        base_folder=base_folder,
+    )
+    throughput = summary["throughput"]
+
+    log.info(f"Concluídos: {summary['ok']} | Erros: {summary['errors']} | Pulados: {summary['skipped']}")
+    log.info(f"Vazão: {throughput['pages_per_second']} páginas/s | {throughput['documents_per_minute']} documentos/min")
+
+    return 0 if summary["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Configuração - Carregamento único do .env para todo o processo
+Importado antes dos módulos que leem variáveis de ambiente no import (analisador,
+scraper, pipeline, executores); chamadas repetidas de load_env() não fazem nada
+"""
+
+import os
+import threading
+
+
+# ==================== CONFIGURAÇÕES ====================
+ENV_FILE = os.path.join(os.path.dirname(__file__), "..", ".env")
+
+_LOCK = threading.Lock()
+_loaded = False
+
+
+# ==================== CARREGAMENTO DE VARIÁVEIS DE AMBIENTE ====================
+def load_env(env_file=ENV_FILE):
+    """Carrega o .env da raiz (ou o encontrado pelo python-dotenv) uma única vez"""
+    global _loaded
+    with _LOCK:
+        if _loaded:
+            return False
+        _loaded = True
+        try:
+            from dotenv import load_dotenv
+        except ImportError:
+            message, loaded = "[ENV] python-dotenv não instalado, usando variáveis do sistema", False
+        else:
+            if os.path.exists(env_file):
+                load_dotenv(env_file, override=True)
+                message = f"[ENV] Variáveis carregadas de {env_file}"
+            else:
+                load_dotenv(override=True)  # Tenta carregar do .env na raiz do projeto
+                message = f"[ENV] Arquivo .env não encontrado em {env_file}, usando variáveis do sistema"
+            loaded = True
+
+    # Logs só depois do .env: o formato e os níveis de log também podem vir dele
+    import logs
+
+    logs.get_logger("config").info(message)
+    return loaded
+
+
+load_env()
@@ -8,69 +8,89 @@ import sys
 import time
 import glob
 import stat
+import threading
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-
-
-# ==================== CARREGAMENTO DE VARIÁVEIS DE AMBIENTE ====================
-# Carregar variáveis do arquivo .env
-env_file = os.path.join(os.path.dirname(__file__), "..", ".env")
-if os.path.exists(env_file):
-    print(f"[ENV] Carregando variáveis de {env_file}")
-    load_dotenv(env_file, override=True)
-else:
-    print(f"[ENV] Arquivo .env não encontrado em {env_file}, usando variáveis do sistema")
-    load_dotenv(override=True)  # Tenta carregar do .env na raiz do projeto
+
+import config  # .env carregado uma única vez, antes dos módulos que leem o ambiente
+import logs
+import artifact_store
+import memory_profile
+from sources import default_source
 
 
 # ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("daily_scraper")
+# Detalhes da tela de filtro (combobox encontrados): DEBUG
+filter_log = logs.get_logger("daily_scraper.filter")
 DATA_FOLDER = os.path.join(os.path.dirname(__file__), "..", "data")
 DOWNLOAD_TIMEOUT = 30
 LOGIN_TIMEOUT = 15
 PDF_WAIT_TIMEOUT = 20
+# Filtro de publicações: espera máxima pelo combobox/opção, intervalo de sondagem no
+# navegador e pausa para a lista recarregar depois da seleção
+FILTER_TIMEOUT = 15
+FILTER_POLL_MS = 100
+FILTER_SETTLE_SECONDS = 3
+# Até aqui só o rótulo/contêiner "Public. Legal" identifica o combobox; depois, o único
+# ou o primeiro visível (o fluxo antigo só tentava os palpites após ~8 s de espera)
+FILTER_LABEL_GRACE_SECONDS = 8
+FILTER_DEBUG_SCREENSHOT = "/tmp/filtro_debug.png"
+FILTER_DEBUG_HTML = "/tmp/filtro_debug.html"
 PDF_FILENAME = "diario_sm_atual.pdf"
+# "auto" tenta o spec HTTP gravado e volta ao Selenium se ele não corresponder;
+# "http" falha em vez de voltar; "selenium" ignora o spec
+SCRAPER_MODE = os.getenv("CLIPAGEM_SCRAPER_MODE", "auto").lower()
+
+# Evita que execuções concorrentes (várias fontes) baixem o ChromeDriver ao mesmo tempo
+_DRIVER_INSTALL_LOCK = threading.Lock()
+
 
-DIARIO_LOGIN_URL = os.getenv("DIARIO_LOGIN_URL", "")
-DIARIO_ACCESS_URL = os.getenv("DIARIO_ACCESS_URL", "")
-DIARIO_USER = os.getenv("DIARIO_USER", "")
-DIARIO_PASSWORD = os.getenv("DIARIO_PASS", "")
+def _selenium_wait():
+    """WebDriverWait, expected_conditions e By (Selenium só é importado quando o navegador é usado)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return WebDriverWait, EC, By
 
 
 # ==================== LIMPEZA INICIAL ====================
-def cleanup_old_pdfs():
-    """Remove arquivos PDF antigos da pasta data/"""
-    print("[CLEANUP] Iniciando limpeza de PDFs antigos...")
+def cleanup_old_pdfs(data_folder=DATA_FOLDER):
+    """Remove arquivos PDF antigos da pasta data/ (ou da pasta da fonte)"""
+    log.info("[CLEANUP] Iniciando limpeza de PDFs antigos...")
     
-    if not os.path.exists(DATA_FOLDER):
-        os.makedirs(DATA_FOLDER)
-        print(f"[CLEANUP] Pasta {DATA_FOLDER} não existia. Criada.")
+    if not os.path.exists(data_folder):
+        os.makedirs(data_folder)
+        log.info(f"[CLEANUP] Pasta {data_folder} não existia. Criada.")
         return
     
-    pdf_files = glob.glob(os.path.join(DATA_FOLDER, "*.pdf"))
+    pdf_files = glob.glob(os.path.join(data_folder, "*.pdf"))
     
     if not pdf_files:
-        print("[CLEANUP] Nenhum PDF encontrado para deletar.")
+        log.info("[CLEANUP] Nenhum PDF encontrado para deletar.")
         return
     
     for pdf_file in pdf_files:
         try:
             os.remove(pdf_file)
-            print(f"[CLEANUP] Deletado: {pdf_file}")
+            log.info(f"[CLEANUP] Deletado: {pdf_file}")
         except Exception as e:
-            print(f"[CLEANUP] Erro ao deletar {pdf_file}: {e}")
+            log.warning(f"[CLEANUP] Erro ao deletar {pdf_file}: {e}")
 
 
 # ==================== CONFIGURAÇÃO DO CHROME ====================
-def setup_chrome_driver():
-    """Configura e retorna instância do ChromeDriver com opções customizadas"""
-    print("[CHROME] Configurando ChromeDriver...")
+def setup_chrome_driver(download_folder=DATA_FOLDER, capture_network=False):
+    """
+    Configura e retorna instância do ChromeDriver com opções customizadas.
+    capture_network=True liga o log de desempenho (requisições da SPA) para gravar o spec HTTP.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    log.info("[CHROME] Configurando ChromeDriver...")
     
     # Encontrar binário do Chrome no sistema
     chrome_binary = None
@@ -85,19 +105,19 @@ def setup_chrome_driver():
     for path in possible_paths:
         if os.path.exists(path):
             chrome_binary = path
-            print(f"[CHROME] Binário do Chrome encontrado: {chrome_binary}")
+            log.info(f"[CHROME] Binário do Chrome encontrado: {chrome_binary}")
             break
     
     if not chrome_binary:
-        print("[CHROME] AVISO: Binário do Chrome não encontrado em locais conhecidos")
-        print("[CHROME] Tentando usar caminho padrão do sistema...")
+        log.warning("[CHROME] AVISO: Binário do Chrome não encontrado em locais conhecidos")
+        log.info("[CHROME] Tentando usar caminho padrão do sistema...")
     
     options = Options()
     
     # Definir caminho do binário se encontrado
     if chrome_binary:
         options.binary_location = chrome_binary
-        print(f"[CHROME] Usando binário: {chrome_binary}")
+        log.info(f"[CHROME] Usando binário: {chrome_binary}")
     
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
@@ -110,7 +130,7 @@ def setup_chrome_driver():
     
     # Configurar pasta de download automático
     prefs = {
-        "download.default_directory": os.path.abspath(DATA_FOLDER),
+        "download.default_directory": os.path.abspath(download_folder),
         "download.prompt_for_download": False,
         "profile.default_content_settings.popups": 0,
         "safebrowsing.enabled": False,
@@ -118,9 +138,12 @@ def setup_chrome_driver():
     options.add_experimental_option("prefs", prefs)
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     
     try:
-        driver_path = Path(ChromeDriverManager().install())
+        with _DRIVER_INSTALL_LOCK:
+            driver_path = Path(ChromeDriverManager().install())
         if driver_path.name.startswith("THIRD_PARTY_NOTICES"):
             candidate = driver_path.with_name("chromedriver")
             if candidate.exists():
@@ -128,22 +151,27 @@ def setup_chrome_driver():
         
         # Garantir permissões de execução (fix para GitHub Actions)
         os.chmod(driver_path, os.stat(driver_path).st_mode | stat.S_IEXEC)
-        print(f"[CHROME] Permissões de execução aplicadas")
+        log.info(f"[CHROME] Permissões de execução aplicadas")
         
         service = Service(str(driver_path))
-        print(f"[CHROME] ChromeDriver instalado: {service.path}")
+        log.info(f"[CHROME] ChromeDriver instalado: {service.path}")
         
         driver = webdriver.Chrome(service=service, options=options)
-        print("[CHROME] ChromeDriver configurado com sucesso")
+        # Scripts assíncronos (filtro de publicações) esperam no navegador, não no Python
+        driver.set_script_timeout(FILTER_TIMEOUT + 5)
+        log.info("[CHROME] ChromeDriver configurado com sucesso")
         
         return driver
     
     except Exception as e:
-        print(f"[CHROME] ERRO ao configurar ChromeDriver: {e}")
-        print("[CHROME] Informações de debug:")
-        print(f"  - Plataforma: {os.sys.platform}")
-        print(f"  - Chrome encontrado: {chrome_binary}")
-        print(f"  - Caminho absoluto data: {os.path.abspath(DATA_FOLDER)}")
+        log.error(
+            f"[CHROME] ERRO ao configurar ChromeDriver: {e}",
+            extra={"fields": {
+                "platform": sys.platform,
+                "chrome_binary": chrome_binary,
+                "download_folder": os.path.abspath(download_folder),
+            }},
+        )
         raise
 
 
@@ -161,6 +189,7 @@ def find_element_with_fallback(driver, selectors, timeout=LOGIN_TIMEOUT):
     Returns:
         WebElement ou None
     """
+    WebDriverWait, EC, By = _selenium_wait()
     for selector in selectors:
         try:
             element = WebDriverWait(driver, timeout).until(
@@ -176,6 +205,7 @@ def find_clickable_element_with_fallback(driver, selectors, timeout=LOGIN_TIMEOU
     """
     Tenta encontrar e clicar em um elemento usando múltiplos seletores XPATH.
     """
+    WebDriverWait, EC, By = _selenium_wait()
     for selector in selectors:
         try:
             element = WebDriverWait(driver, timeout).until(
@@ -187,21 +217,25 @@ def find_clickable_element_with_fallback(driver, selectors, timeout=LOGIN_TIMEOU
     return None
 
 
-def perform_login(driver):
+def perform_login(driver, source=None):
     """
     Realiza login na plataforma do diário oficial com seletores robustos.
     Usa múltiplas estratégias para encontrar campos mesmo com IDs dinâmicos.
+    Seletores definidos na fonte (registro) têm prioridade sobre os padrões.
     """
-    print(f"[LOGIN] Navegando para {DIARIO_LOGIN_URL}...")
-    driver.get(DIARIO_LOGIN_URL)
+    source = source or default_source()
+    custom_selectors = source.selectors
+    
+    log.info(f"[LOGIN] Navegando para {source.login_url}...")
+    driver.get(source.login_url)
     
     try:
         # Aguardar página carregar
         time.sleep(3)
-        print("[LOGIN] Página de login carregada")
+        log.info("[LOGIN] Página de login carregada")
         
         # ==================== CAMPO DE USUÁRIO ====================
-        print("[LOGIN] Procurando campo de E-mail/Usuário...")
+        log.info("[LOGIN] Procurando campo de E-mail/Usuário...")
         
         # Seletores para campo de usuário (em ordem de preferência)
         username_selectors = [
@@ -232,23 +266,23 @@ def perform_login(driver):
             "//input[@type='text'][1]",
             "//input[1]",
         ]
+        username_selectors = custom_selectors.get("username", username_selectors)
         
         username_field = find_element_with_fallback(driver, username_selectors, LOGIN_TIMEOUT)
         
         if not username_field:
-            print("[LOGIN] Nenhum campo de usuário encontrado!")
-            print("[LOGIN] Tentando screenshot para debug...")
+            log.error("[LOGIN] Nenhum campo de usuário encontrado! Screenshot em /tmp/login_error.png")
             driver.save_screenshot("/tmp/login_error.png")
             raise Exception("Campo de usuário não encontrado com nenhum seletor")
         
-        print(f"[LOGIN] Campo de Usuário encontrado")
+        log.info(f"[LOGIN] Campo de Usuário encontrado")
         username_field.clear()
-        username_field.send_keys(DIARIO_USER)
+        username_field.send_keys(source.user)
         time.sleep(0.5)
-        print(f"[LOGIN] Usuário preenchido: {DIARIO_USER[:3]}***")
+        log.info(f"[LOGIN] Usuário preenchido: {source.user[:3]}***")
         
         # ==================== CAMPO DE SENHA ====================
-        print("[LOGIN] Procurando campo de Senha...")
+        log.info("[LOGIN] Procurando campo de Senha...")
         
         # Seletores para campo de senha (em ordem de preferência)
         password_selectors = [
@@ -276,21 +310,22 @@ def perform_login(driver):
             "//input[@type='text'][2]",
             "//input[2]",
         ]
+        password_selectors = custom_selectors.get("password", password_selectors)
         
         password_field = find_element_with_fallback(driver, password_selectors, LOGIN_TIMEOUT)
         
         if not password_field:
-            print("[LOGIN] Nenhum campo de senha encontrado!")
+            log.error("[LOGIN] Nenhum campo de senha encontrado!")
             raise Exception("Campo de senha não encontrado com nenhum seletor")
         
-        print(f"[LOGIN] Campo de Senha encontrado")
+        log.info(f"[LOGIN] Campo de Senha encontrado")
         password_field.clear()
-        password_field.send_keys(DIARIO_PASSWORD)
+        password_field.send_keys(source.password)
         time.sleep(0.5)
-        print(f"[LOGIN] Senha preenchida")
+        log.info(f"[LOGIN] Senha preenchida")
         
         # ==================== BOTÃO DE ENTRAR ====================
-        print("[LOGIN] Procurando botão de Entrar...")
+        log.info("[LOGIN] Procurando botão de Entrar...")
         
         # Seletores para botão de login (em ordem de preferência)
         button_selectors = [
@@ -315,208 +350,211 @@ def perform_login(driver):
             # Fallback - primeiro button
             "//button[1]",
         ]
+        button_selectors = custom_selectors.get("login_button", button_selectors)
         
         login_button = find_clickable_element_with_fallback(driver, button_selectors, LOGIN_TIMEOUT)
         
         if not login_button:
-            print("[LOGIN] Nenhum botão de entrar encontrado!")
+            log.error("[LOGIN] Nenhum botão de entrar encontrado!")
             raise Exception("Botão 'Entrar' não encontrado com nenhum seletor")
         
-        print(f"[LOGIN] Botão 'Entrar' encontrado")
+        log.info(f"[LOGIN] Botão 'Entrar' encontrado")
         driver.execute_script("arguments[0].click();", login_button)
-        print(f"[LOGIN] Botão clicado. Aguardando redirecionamento...")
+        log.info(f"[LOGIN] Botão clicado. Aguardando redirecionamento...")
         
         # Aguardar login ser completado
         time.sleep(5)
-        print("[LOGIN] Login realizado com sucesso")
+        log.info("[LOGIN] Login realizado com sucesso")
         
     except Exception as e:
-        print(f"[LOGIN] ERRO durante login: {e}")
-        print(f"[LOGIN] Tipo de erro: {type(e).__name__}")
+        log.error(f"[LOGIN] ERRO durante login ({type(e).__name__}): {e}")
         raise
 
 
 # ==================== FILTRO DE PUBLICAÇÕES ====================
-def set_publication_filter(driver):
+# Localiza o combobox, abre, espera e clica a opção dentro do navegador, em uma única
+# chamada ao WebDriver (execute_async_script). Tenta as mesmas estratégias de antes, na
+# mesma ordem: label -> input[aria-labelledby], container .v-input, único/primeiro visível
+_FILTER_SCRIPT = r"""
+const [labelXPaths, containerXPath, optionXPaths, timeoutMs, graceMs, pollMs, done] = arguments;
+const started = Date.now();
+const summary = {found_by: null, option_selector: null, selected: false, combos: [], elapsed_ms: 0, failed_at: null};
+const first = (xpath, context) => document.evaluate(
+    xpath, context || document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const visible = el => !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+const finish = failedAt => {
+    summary.failed_at = failedAt;
+    summary.elapsed_ms = Date.now() - started;
+    done(summary);
+};
+
+function findCombo() {
+    for (const xpath of labelXPaths) {
+        const label = first(xpath);
+        if (label && label.id) {
+            const input = document.querySelector(`input[aria-labelledby="${CSS.escape(label.id)}"]`);
+            if (input) { summary.found_by = "label"; return input; }
+        }
+    }
+    const container = first(containerXPath);
+    const inContainer = container && container.querySelector("input[role='combobox']");
+    if (inContainer) { summary.found_by = "container"; return inContainer; }
+    // Sem o rótulo renderizado, qualquer outro filtro da página passaria por este: os
+    // palpites (único / primeiro visível) só valem depois do período de espera
+    if (Date.now() - started < graceMs) return null;
+    const combos = Array.from(document.querySelectorAll("input[role='combobox']"));
+    if (combos.length === 1) { summary.found_by = "unico"; return combos[0]; }
+    const shown = combos.find(visible);
+    if (shown) { summary.found_by = "primeiro visivel"; return shown; }
+    return null;
+}
+
+function findOption() {
+    for (const xpath of optionXPaths) {
+        const option = first(xpath);
+        if (visible(option) && !option.closest("[disabled], .v-list-item--disabled")) {
+            summary.option_selector = xpath;
+            return option;
+        }
+    }
+    return null;
+}
+
+function poll(find, onFound, failedAt) {
+    const element = find();
+    if (element) return onFound(element);
+    if (Date.now() - started > timeoutMs) return finish(failedAt);
+    setTimeout(() => poll(find, onFound, failedAt), pollMs);
+}
+
+poll(findCombo, combo => {
+    summary.combos = Array.from(document.querySelectorAll("input[role='combobox']")).map(el => ({
+        labelledby: el.getAttribute("aria-labelledby"), value: el.value, visible: visible(el),
+    }));
+    combo.click();
+    poll(findOption, option => {
+        option.click();
+        summary.selected = true;
+        finish(null);
+    }, "opcao");
+}, "combobox");
+"""
+
+
+def _save_filter_debug(driver):
+    """Screenshot e HTML da página, só quando o filtro não pôde ser aplicado"""
+    try:
+        driver.save_screenshot(FILTER_DEBUG_SCREENSHOT)
+        with open(FILTER_DEBUG_HTML, "w", encoding="utf-8") as f:
+            f.write(driver.page_source)
+        log.info(f"[FILTRO] Debug salvo em {FILTER_DEBUG_SCREENSHOT} e {FILTER_DEBUG_HTML}")
+    except Exception as e:
+        log.warning(f"[FILTRO] AVISO: não foi possível salvar o debug: {e}")
+
+
+def set_publication_filter(driver, label_text="Public. Legal", option_text="Exceto"):
     """Configura o filtro 'Public. Legal' como 'Exceto' para exibir apenas edições jornalísticas"""
-    print("[FILTRO] Configurando filtro 'Public. Legal' como 'Exceto'...")
+    log.info(f"[FILTRO] Configurando filtro '{label_text}' como '{option_text}'...")
+    
+    label_xpaths = [
+        f"//label[contains(text(), '{label_text}')]",
+        f"//*[contains(text(), '{label_text}') and (self::label or self::div or self::span)]",
+    ]
+    container_xpath = f"//div[contains(., '{label_text}') and contains(@class, 'v-input')]"
+    option_xpaths = [
+        # Texto exato
+        f"//div[text()='{option_text}']",
+        f"//span[text()='{option_text}']",
+        f"//div[contains(@class, 'v-list-item') and contains(., '{option_text}')]",
+        # Por role
+        f"//div[@role='option' and contains(., '{option_text}')]",
+        f"//*[@role='listitem' and contains(., '{option_text}')]",
+    ]
     
     try:
-        # Aguardar página carregar completamente
-        time.sleep(3)
-        
-        # Debug: Salvar screenshot para análise
-        try:
-            driver.save_screenshot("/tmp/filtro_debug.png")
-            print("[FILTRO] Screenshot salvo em /tmp/filtro_debug.png")
-        except:
-            pass
-        
-        # Debug: Buscar todos os inputs combobox
-        try:
-            all_combos = driver.find_elements(By.XPATH, "//input[@role='combobox']")
-            print(f"[FILTRO] Total de combobox encontrados: {len(all_combos)}")
-            for i, combo in enumerate(all_combos):
-                label_id = combo.get_attribute("aria-labelledby")
-                value = combo.get_attribute("value")
-                print(f"[FILTRO]   Combobox {i}: labelledby='{label_id}', value='{value}'")
-        except Exception as e:
-            print(f"[FILTRO] Erro no debug: {e}")
-        
-        # Estratégia 1: Encontrar o combobox pelo label "Public. Legal"
-        # Primeiro encontrar o label
-        label_selectors = [
-            "//label[contains(text(), 'Public. Legal')]",
-            "//*[contains(text(), 'Public. Legal') and (self::label or self::div or self::span)]",
-        ]
-        
-        dropdown_input = None
-        for label_selector in label_selectors:
-            try:
-                label_element = driver.find_element(By.XPATH, label_selector)
-                label_id = label_element.get_attribute("id")
-                print(f"[FILTRO] Label encontrado com id: {label_id}")
-                
-                # Agora encontrar o input que usa esse label
-                if label_id:
-                    dropdown_input = driver.find_element(By.XPATH, 
-                        f"//input[@aria-labelledby='{label_id}']")
-                    print(f"[FILTRO] Dropdown encontrado via label")
-                    break
-            except:
-                continue
-        
-        # Estratégia 2: Encontrar pelo texto do container
-        if not dropdown_input:
-            try:
-                # Procurar pelo container que tem "Public. Legal" e depois o input dentro
-                container = driver.find_element(By.XPATH, 
-                    "//div[contains(., 'Public. Legal') and contains(@class, 'v-input')]")
-                dropdown_input = container.find_element(By.XPATH, 
-                    ".//input[@role='combobox']")
-                print(f"[FILTRO] Dropdown encontrado via container")
-            except:
-                pass
-        
-        # Estratégia 3: Se há apenas um combobox, usar ele
-        if not dropdown_input:
-            try:
-                combos = driver.find_elements(By.XPATH, "//input[@role='combobox']")
-                if len(combos) == 1:
-                    dropdown_input = combos[0]
-                    print(f"[FILTRO] Usando único combobox disponível")
-                elif len(combos) > 1:
-                    # Pegar o primeiro que está visível
-                    for combo in combos:
-                        if combo.is_displayed():
-                            dropdown_input = combo
-                            print(f"[FILTRO] Usando primeiro combobox visível")
-                            break
-            except:
-                pass
-        
-        if not dropdown_input:
-            print("[FILTRO] AVISO: Dropdown não encontrado, continuando sem filtro...")
-            return
-        
-        # Clicar no dropdown para abrir as opções
-        driver.execute_script("arguments[0].click();", dropdown_input)
-        print("[FILTRO] Dropdown clicado, aguardando opções...")
-        time.sleep(2)
-        
-        # Seletores para encontrar a opção "Exceto"
-        exceto_selectors = [
-            # Texto exato
-            "//div[text()='Exceto']",
-            "//span[text()='Exceto']",
-            "//div[contains(@class, 'v-list-item') and contains(., 'Exceto')]",
-            
-            # Por role
-            "//div[@role='option' and contains(., 'Exceto')]",
-            "//*[@role='listitem' and contains(., 'Exceto')]",
-        ]
-        
-        print("[FILTRO] Procurando opção 'Exceto'...")
-        exceto_option = None
-        for selector in exceto_selectors:
-            try:
-                exceto_option = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, selector))
-                )
-                print(f"[FILTRO] Opção 'Exceto' encontrada")
-                break
-            except:
-                continue
-        
-        if not exceto_option:
-            print("[FILTRO] AVISO: Opção 'Exceto' não encontrada, continuando sem filtro...")
-            return
-        
-        # Clicar na opção "Exceto"
-        driver.execute_script("arguments[0].click();", exceto_option)
-        print("[FILTRO] Opção 'Exceto' selecionada!")
-        
-        # Aguardar filtro ser aplicado
-        time.sleep(3)
-        print("[FILTRO] Filtro aplicado com sucesso - exibindo apenas edições jornalísticas")
-        
+        # Aguarda a página, abre o dropdown e escolhe a opção em uma única ida ao navegador
+        summary = driver.execute_async_script(
+            _FILTER_SCRIPT, label_xpaths, container_xpath, option_xpaths,
+            FILTER_TIMEOUT * 1000, FILTER_LABEL_GRACE_SECONDS * 1000, FILTER_POLL_MS,
+        )
     except Exception as e:
-        print(f"[FILTRO] ERRO ao configurar filtro: {e}")
-        print("[FILTRO] Continuando sem filtro...")
+        log.error(f"[FILTRO] ERRO ao configurar filtro: {e}. Continuando sem filtro...")
+        _save_filter_debug(driver)
+        return
+    
+    filter_log.debug("[FILTRO] Combobox na página: %s", summary.get("combos"))
+    if not summary.get("selected"):
+        missing = "Dropdown" if summary.get("failed_at") == "combobox" else f"Opção '{option_text}'"
+        log.warning(
+            f"[FILTRO] AVISO: {missing} não encontrado(a) em {summary.get('elapsed_ms')} ms, continuando sem filtro...",
+            extra={"fields": {"event": "filter_failed", **summary}},
+        )
+        _save_filter_debug(driver)
+        return
+    
+    log.info(
+        f"[FILTRO] Opção '{option_text}' selecionada em {summary['elapsed_ms']} ms (dropdown via {summary['found_by']})",
+        extra={"fields": {"event": "filter_applied", "found_by": summary["found_by"], "elapsed_ms": summary["elapsed_ms"]}},
+    )
+    
+    # Aguardar a lista de edições recarregar com o filtro
+    time.sleep(FILTER_SETTLE_SECONDS)
+    log.info("[FILTRO] Filtro aplicado com sucesso - exibindo apenas edições jornalísticas")
 
 
 # ==================== ACESSO E DOWNLOAD DO PDF ====================
-def access_and_download_pdf(driver):
+def access_and_download_pdf(driver, source=None):
     """Acessa a URL de download, aplica filtro e clica no ícone PDF"""
-    print(f"[PDF] Navegando para {DIARIO_ACCESS_URL}...")
-    driver.get(DIARIO_ACCESS_URL)
+    source = source or default_source()
+    pdf_icon_xpath = source.selectors.get("pdf_icon", "//*[contains(@class, 'mdi-file-pdf-box')]")
+    WebDriverWait, EC, By = _selenium_wait()
+    
+    log.info(f"[PDF] Navegando para {source.access_url}...")
+    driver.get(source.access_url)
     
     try:
-        # Aguardar página carregar
-        time.sleep(5)
-        print("[PDF] Página de acesso carregada")
+        log.info("[PDF] Página de acesso carregada")
         
-        # Aplicar filtro "Public. Legal" = "Exceto"
-        set_publication_filter(driver)
+        # Aplicar filtro "Public. Legal" = "Exceto" (o script espera os componentes
+        # aparecerem; sem filtro, a espera pelo ícone abaixo cobre o carregamento)
+        if source.apply_publication_filter:
+            set_publication_filter(driver)
         
         # Procurar pelo ícone PDF (classe mdi-file-pdf-box)
-        print("[PDF] Procurando ícone de PDF (mdi-file-pdf-box)...")
+        log.info(f"[PDF] Procurando ícone de PDF ({pdf_icon_xpath})...")
         pdf_icon = WebDriverWait(driver, PDF_WAIT_TIMEOUT).until(
-            EC.element_to_be_clickable((
-                By.XPATH,
-                "//*[contains(@class, 'mdi-file-pdf-box')]"
-            ))
+            EC.element_to_be_clickable((By.XPATH, pdf_icon_xpath))
         )
-        print("[PDF] Ícone de PDF encontrado")
+        log.info("[PDF] Ícone de PDF encontrado")
         
         # Clicar no ícone para iniciar download
         driver.execute_script("arguments[0].click();", pdf_icon)
-        print("[PDF] Clique no ícone realizado. Aguardando download...")
+        log.info("[PDF] Clique no ícone realizado. Aguardando download...")
         
     except Exception as e:
-        print(f"[PDF] ERRO ao acessar PDF: {e}")
+        log.error(f"[PDF] ERRO ao acessar PDF: {e}")
         raise
 
 
 # ==================== PÓS-PROCESSAMENTO ====================
-def wait_for_download_completion():
+def wait_for_download_completion(data_folder=DATA_FOLDER):
     """Aguarda o download ser completado monitorando a pasta data/"""
-    print("[DOWNLOAD] Aguardando conclusão do download...")
+    log.info("[DOWNLOAD] Aguardando conclusão do download...")
     
     start_time = time.time()
     while time.time() - start_time < DOWNLOAD_TIMEOUT:
         # Procurar por arquivos .crdownload (indicam download em progresso)
-        crdownload_files = glob.glob(os.path.join(DATA_FOLDER, "*.crdownload"))
+        crdownload_files = glob.glob(os.path.join(data_folder, "*.crdownload"))
         # Procurar por arquivos .pdf
-        pdf_files = glob.glob(os.path.join(DATA_FOLDER, "*.pdf"))
+        pdf_files = glob.glob(os.path.join(data_folder, "*.pdf"))
         
         if crdownload_files:
-            print(f"[DOWNLOAD] Arquivo em download: {crdownload_files[0]}")
+            log.info(f"[DOWNLOAD] Arquivo em download: {crdownload_files[0]}")
             time.sleep(1)
             continue
         
         if pdf_files:
-            print(f"[DOWNLOAD] PDF detectado, download concluído!")
+            log.info(f"[DOWNLOAD] PDF detectado, download concluído!")
             return pdf_files[0]
         
         time.sleep(1)
@@ -524,32 +562,39 @@ def wait_for_download_completion():
     raise TimeoutError(f"Download não foi completado em {DOWNLOAD_TIMEOUT} segundos")
 
 
-def rename_pdf_file(old_path):
+def rename_pdf_file(old_path, new_path=None, publish=True):
     """Renomeia o arquivo PDF baixado para nome padronizado"""
-    new_path = os.path.join(DATA_FOLDER, PDF_FILENAME)
+    new_path = new_path or os.path.join(DATA_FOLDER, PDF_FILENAME)
     
     try:
         # Se arquivo com novo nome já existe, deletar
         if os.path.exists(new_path):
             os.remove(new_path)
-            print(f"[RENAME] Arquivo anterior deletado: {new_path}")
+            log.info(f"[RENAME] Arquivo anterior deletado: {new_path}")
         
         os.rename(old_path, new_path)
-        print(f"[RENAME] Arquivo renomeado: {old_path} -> {new_path}")
+        log.info(f"[RENAME] Arquivo renomeado: {old_path} -> {new_path}")
+        
+        # Com backend de artefatos configurado, o PDF sai do git (fica só o ponteiro)
+        if publish:
+            artifact_store.publish(new_path)
         return new_path
         
     except Exception as e:
-        print(f"[RENAME] ERRO ao renomear arquivo: {e}")
+        log.error(f"[RENAME] ERRO ao renomear arquivo: {e}")
         raise
 
 
 # ==================== DIAGNÓSTICO DO SISTEMA ====================
 def diagnose_system():
     """Diagnóstico pré-execução para verificar dependências"""
-    print("[DIAGNÓSTICO] Verificando ambiente do sistema...")
-    print(f"  Python: {sys.version.split()[0]}")
-    print(f"  Plataforma: {sys.platform}")
-    print(f"  Diretório atual: {os.getcwd()}")
+    # Registrado de uma vez no final: pode rodar em paralelo ao setup do Chrome
+    lines = []
+    report = lines.append
+    report("[DIAGNÓSTICO] Verificando ambiente do sistema...")
+    report(f"  Python: {sys.version.split()[0]}")
+    report(f"  Plataforma: {sys.platform}")
+    report(f"  Diretório atual: {os.getcwd()}")
     
     # Verificar Chrome
     chrome_paths = [
@@ -567,96 +612,156 @@ def diagnose_system():
                 import subprocess
                 version = subprocess.check_output([chrome_found, "--version"], 
                                                 stderr=subprocess.DEVNULL).decode().strip()
-                print(f"  Chrome: ✓ {path}")
-                print(f"           {version}")
+                report(f"  Chrome: ✓ {path}")
+                report(f"           {version}")
             except:
-                print(f"  Chrome: ✓ {path}")
+                report(f"  Chrome: ✓ {path}")
             break
     
     if not chrome_found:
-        print(f"  Chrome: ✗ NÃO ENCONTRADO")
-        print(f"  Locais procurados:")
+        report(f"  Chrome: ✗ NÃO ENCONTRADO")
+        report(f"  Locais procurados:")
         for path in chrome_paths:
-            print(f"    - {path}")
+            report(f"    - {path}")
     
     # Verificar pasta data
     if os.path.exists(DATA_FOLDER):
-        print(f"  Pasta data/: ✓ {os.path.abspath(DATA_FOLDER)}")
+        report(f"  Pasta data/: ✓ {os.path.abspath(DATA_FOLDER)}")
     else:
-        print(f"  Pasta data/: ✗ será criada na primeira execução")
+        report(f"  Pasta data/: ✗ será criada na primeira execução")
     
     # Verificar Selenium
     try:
         import selenium
-        print(f"  Selenium: ✓ {selenium.__version__}")
+        report(f"  Selenium: ✓ {selenium.__version__}")
     except ImportError:
-        print(f"  Selenium: ✗ NÃO INSTALADO")
+        report(f"  Selenium: ✗ NÃO INSTALADO")
     
     # Verificar webdriver-manager
     try:
         import webdriver_manager
-        print(f"  webdriver-manager: ✓ OK")
+        report(f"  webdriver-manager: ✓ OK")
     except ImportError:
-        print(f"  webdriver-manager: ✗ NÃO INSTALADO")
+        report(f"  webdriver-manager: ✗ NÃO INSTALADO")
     
-    print()
+    log.info("\n".join(lines))
+
+
+# ==================== MODO HTTP ====================
+def _http_spec_available(source):
+    import http_scraper
+
+    return http_scraper.spec_path(source) is not None
+
+
+def download_via_http(source, publish=True):
+    """
+    Baixa a edição pelo spec HTTP gravado, sem navegador. Retorna o caminho do PDF ou
+    None quando o spec não corresponde mais ao portal e o modo permite voltar ao Selenium.
+    """
+    import http_scraper
+
+    try:
+        final_path = http_scraper.download_edition(source, source.pdf_path)
+    except http_scraper.SpecMismatch as e:
+        if SCRAPER_MODE == "http":
+            log.error(f"[HTTP] ERRO: spec não corresponde ao portal: {e}")
+            raise
+        log.warning(
+            f"[HTTP] AVISO: spec não corresponde ao portal ({e}), voltando ao fluxo Selenium",
+            extra={"fields": {"event": "http_fallback", "source": source.name, "reason": str(e)}},
+        )
+        return None
+    if publish:
+        artifact_store.publish(final_path)
+    return final_path
 
 
 # ==================== EXECUÇÃO PRINCIPAL ====================
-def main():
-    """Função principal do scraper"""
-    print("=" * 60)
-    print("INICIANDO SCRAPER DE DIÁRIO OFICIAL")
-    print("=" * 60)
-    print()
+def _quit_browser(driver):
+    log.info("[CLEANUP] Fechando browser...")
+    driver.quit()
+    log.info("[CLEANUP] Browser fechado")
+
+
+def main(source=None, overlap=None):
+    """
+    Função principal do scraper (fonte padrão ou fonte do registro).
+    Com overlap (overlap.Overlap), o diagnóstico roda junto com o setup do Chrome e o
+    navegador fecha em segundo plano; o PDF não é enviado ao backend de artefatos (fica
+    com o chamador), que já pode extrair o texto assim que o arquivo estiver completo.
+    """
+    source = source or default_source()
+    overlap_span = overlap.span if overlap is not None else (lambda name: nullcontext())
+
+    @contextmanager
+    def span(name):
+        with overlap_span(name), logs.stage(f"scraper.{name}", log), memory_profile.stage(f"scraper.{name}"):
+            yield
     
-    # Diagnóstico do sistema
-    diagnose_system()
+    log.info(f"INICIANDO SCRAPER DE DIÁRIO OFICIAL - {source.label or source.name}")
     
     # Validar variáveis de ambiente
-    if not all([DIARIO_LOGIN_URL, DIARIO_ACCESS_URL, DIARIO_USER, DIARIO_PASSWORD]):
-        print("[ERROR] Variáveis de ambiente não configuradas!")
-        print(f"  DIARIO_LOGIN_URL: {bool(DIARIO_LOGIN_URL)}")
-        print(f"  DIARIO_ACCESS_URL: {bool(DIARIO_ACCESS_URL)}")
-        print(f"  DIARIO_USER: {bool(DIARIO_USER)}")
-        print(f"  DIARIO_PASSWORD: {bool(DIARIO_PASSWORD)}")
+    missing = source.missing_credentials()
+    if missing:
+        log.error(
+            f"[ERROR] Variáveis de ambiente não configuradas para a fonte '{source.name}': {', '.join(missing)}",
+            extra={"fields": {"source": source.name, "missing": list(missing)}},
+        )
         raise ValueError("Credenciais ou URLs não encontradas em variáveis de ambiente")
     
     # Etapa 1: Limpeza
-    cleanup_old_pdfs()
+    cleanup_old_pdfs(source.data_folder)
+    
+    # Modo HTTP: login, filtro e download pelo spec gravado, sem Chrome
+    if SCRAPER_MODE == "http" or (SCRAPER_MODE == "auto" and _http_spec_available(source)):
+        with span("http"):
+            final_path = download_via_http(source, publish=overlap is None)
+        if final_path:
+            log.info(f"✓ SUCESSO! PDF salvo em: {final_path}")
+            return final_path
+    
+    # Diagnóstico do sistema
+    if overlap is not None:
+        overlap.submit("diagnóstico", diagnose_system)
+    else:
+        diagnose_system()
     
     driver = None
     try:
         # Etapa 2: Setup Chrome
-        driver = setup_chrome_driver()
+        with span("chrome"):
+            driver = setup_chrome_driver(source.data_folder)
         
         # Etapa 3: Login
-        perform_login(driver)
+        with span("login"):
+            perform_login(driver, source)
         
         # Etapa 4: Acesso, Filtro e Download
-        access_and_download_pdf(driver)
+        with span("acesso e filtro"):
+            access_and_download_pdf(driver, source)
         
         # Etapa 5: Aguardar Download
-        pdf_path = wait_for_download_completion()
+        with span("download do PDF"):
+            pdf_path = wait_for_download_completion(source.data_folder)
         
         # Etapa 6: Renomear
-        final_path = rename_pdf_file(pdf_path)
+        # (no modo sobreposto, o chamador envia o PDF ao backend em segundo plano)
+        final_path = rename_pdf_file(pdf_path, source.pdf_path, publish=overlap is None)
+        
+        log.info(f"✓ SUCESSO! PDF salvo em: {final_path}")
         
-        print("=" * 60)
-        print(f"✓ SUCESSO! PDF salvo em: {final_path}")
-        print("=" * 60)
+        return final_path
         
     except Exception as e:
-        print("=" * 60)
-        print(f"✗ ERRO DURANTE EXECUÇÃO: {e}")
-        print("=" * 60)
+        log.error(f"✗ ERRO DURANTE EXECUÇÃO: {e}")
         raise
         
     finally:
-        if driver:
-            print("[CLEANUP] Fechando browser...")
-            driver.quit()
-            print("[CLEANUP] Browser fechado")
+        if driver and overlap is not None:
+            overlap.submit("fechar browser", _quit_browser, driver)
+        elif driver:
+            _quit_browser(driver)
 
 
 if __name__ == "__main__":
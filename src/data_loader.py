@@ -0,0 +1,98 @@
+"""
+Carregamento de Dados do Dashboard - Cache por versão de arquivo
+A chave é caminho + mtime + tamanho (um único os.stat por rerun): o parse acontece
+uma vez por versão do arquivo e o resultado é compartilhado entre todas as sessões
+"""
+
+import hashlib
+import mmap
+import os
+from functools import lru_cache
+
+from io_utils import loads_json
+
+
+# ==================== VERSÃO DE ARQUIVO ====================
+def file_version(path):
+    """Retorna (caminho absoluto, mtime_ns, tamanho) ou None se o arquivo não existir"""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), info.st_mtime_ns, info.st_size)
+
+
+# ==================== JSON ====================
+@lru_cache(maxsize=16)
+def _parse_json_version(path, mtime_ns, size):
+    with open(path, "rb") as handle:
+        return loads_json(handle.read())
+
+
+def load_json(path):
+    """
+    Carrega um JSON, reaproveitando o parse enquanto o arquivo não mudar.
+    O objeto retornado é compartilhado entre sessões: não deve ser alterado.
+    Erros de leitura não ficam em cache (nova tentativa no próximo rerun).
+    """
+    version = file_version(path)
+    if version is None:
+        return None
+    return _parse_json_version(*version)
+
+
+# ==================== HASH DE CONTEÚDO ====================
+@lru_cache(maxsize=16)
+def _digest_version(path, mtime_ns, size):
+    if size == 0:
+        return hashlib.sha256(b"").hexdigest()
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return hashlib.sha256(mapped).hexdigest()
+
+
+def file_digest(path):
+    """SHA-256 do conteúdo, calculado uma vez por versão do arquivo"""
+    version = file_version(path)
+    if version is None:
+        return None
+    return _digest_version(*version)
+
+
+# ==================== PDF ====================
+@lru_cache(maxsize=2)
+def _map_pdf_version(path, mtime_ns, size):
+    with open(path, "rb") as handle:
+        # O mapeamento continua válido mesmo após o arquivo ser substituído por rename
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@lru_cache(maxsize=2)
+def _pdf_bytes_version(path, mtime_ns, size):
+    return _map_pdf_version(path, mtime_ns, size)[:]
+
+
+def open_pdf_mmap(path):
+    """Mapeamento somente-leitura do PDF (um por versão do arquivo)"""
+    version = file_version(path)
+    if version is None or version[2] == 0:
+        return None
+    return _map_pdf_version(*version)
+
+
+def load_pdf_bytes(path):
+    """
+    Conteúdo do PDF para download, lido do mapeamento uma única vez por versão.
+    O st.download_button exige bytes; a mesma cópia serve a todas as sessões e reruns.
+    """
+    version = file_version(path)
+    if version is None or version[2] == 0:
+        return None
+    return _pdf_bytes_version(*version)
+
+
+def clear_cache():
+    """Descarta todas as versões em cache (botão 'Recarregar Dados')"""
+    _parse_json_version.cache_clear()
+    _digest_version.cache_clear()
+    _pdf_bytes_version.cache_clear()
+    _map_pdf_version.cache_clear()
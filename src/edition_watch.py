@@ -0,0 +1,266 @@
+"""
+Vigia de Edição - Publica a clipagem assim que o jornal sai
+Faz login uma única vez no navegador, reaproveita os cookies em requisições HTTP leves
+para sondar a disponibilidade da edição do dia (com intervalo adaptativo) e entrega ao
+pipeline no momento em que a edição aparece, registrando a latência publicação→clipagem
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from zoneinfo import ZoneInfo
+
+import requests
+
+import config  # .env carregado uma única vez, antes dos módulos que leem o ambiente
+import daily_scraper
+import pipeline
+from io_utils import dumps_json, loads_json
+import logs
+from sources import DATA_FOLDER, SOURCES_FILE, load_sources
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("edition_watch")
+TIMEZONE = ZoneInfo(os.getenv("CLIPAGEM_TIMEZONE", "America/Sao_Paulo"))
+WATCH_DEADLINE = os.getenv("CLIPAGEM_WATCH_DEADLINE", "10:00")  # horário local
+WATCH_LOG_PATH = os.path.join(DATA_FOLDER, "edition_watch.jsonl")
+
+PROBE_MIN_SECONDS = int(os.getenv("CLIPAGEM_WATCH_MIN_SECONDS", "60"))
+PROBE_MAX_SECONDS = int(os.getenv("CLIPAGEM_WATCH_MAX_SECONDS", "900"))
+PROBE_BACKOFF = 1.5
+# Perto do horário habitual de publicação, sonda no intervalo mínimo
+USUAL_TIME_WINDOW_MINUTES = 30
+USUAL_TIME_SAMPLE_DAYS = 30
+REQUEST_TIMEOUT = 20
+MAX_RELOGINS = 3
+
+
+class SessionExpired(Exception):
+    """O portal recusou os cookies da sessão (401/403)"""
+
+
+def _now():
+    return datetime.now(TIMEZONE)
+
+
+def _deadline(day, deadline=WATCH_DEADLINE):
+    hour, minute = (int(part) for part in deadline.split(":"))
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=TIMEZONE)
+
+
+# ==================== SESSÃO AUTENTICADA ====================
+def open_http_session(source):
+    """Login único no navegador; os cookies (e o token, se configurado) vão para um requests.Session"""
+    driver = daily_scraper.setup_chrome_driver(source.data_folder)
+    try:
+        daily_scraper.perform_login(driver, source)
+        driver.get(source.access_url)
+        time.sleep(3)
+
+        session = requests.Session()
+        session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent")
+        for cookie in driver.get_cookies():
+            session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+
+        # SPAs costumam guardar o token de acesso no localStorage em vez de cookie
+        storage_key = source.availability.get("token_storage_key")
+        if storage_key:
+            token = driver.execute_script("return window.localStorage.getItem(arguments[0])", storage_key)
+            if token:
+                session.headers["Authorization"] = "Bearer " + token.strip('"')
+        log.info(f"[WATCH] Sessão HTTP pronta ({len(session.cookies)} cookies)")
+        return session
+    finally:
+        driver.quit()
+
+
+def edition_marker(source, day):
+    """Texto que indica a edição do dia na resposta (padrão: data dd/mm/aaaa)"""
+    return source.availability.get("pattern", "{date:%d/%m/%Y}").format(date=day)
+
+
+def probe_edition(session, url, marker):
+    """Uma sonda: retorna (edição disponível?, Last-Modified ou None)"""
+    response = session.get(url, timeout=REQUEST_TIMEOUT)
+    if response.status_code in (401, 403):
+        raise SessionExpired(f"HTTP {response.status_code}")
+    response.raise_for_status()
+    return marker in response.text, response.headers.get("Last-Modified")
+
+
+# ==================== INTERVALO ADAPTATIVO ====================
+def load_watch_log(path=WATCH_LOG_PATH):
+    try:
+        with open(path, "rb") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return []
+    records = []
+    for line in lines:
+        try:
+            records.append(loads_json(line))
+        except ValueError:
+            continue
+    return records
+
+
+def usual_publication_minute(source_name, records):
+    """Mediana do horário de publicação (minutos desde 00:00) nos últimos dias"""
+    minutes = []
+    for record in records[::-1]:
+        if record.get("source") == source_name and record.get("published_at"):
+            published = datetime.fromisoformat(record["published_at"]).astimezone(TIMEZONE)
+            minutes.append(published.hour * 60 + published.minute)
+        if len(minutes) >= USUAL_TIME_SAMPLE_DAYS:
+            break
+    return statistics.median(minutes) if minutes else None
+
+
+def next_interval(current, now, usual_minute):
+    """Intervalo mínimo perto do horário habitual; fora dele, cresce até o máximo"""
+    if usual_minute is not None:
+        minute = now.hour * 60 + now.minute
+        if abs(minute - usual_minute) <= USUAL_TIME_WINDOW_MINUTES:
+            return PROBE_MIN_SECONDS
+    return min(current * PROBE_BACKOFF, PROBE_MAX_SECONDS)
+
+
+def append_watch_log(record, path=WATCH_LOG_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(dumps_json(record) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ==================== VIGIA DE UMA FONTE ====================
+def watch_source(source, deadline=WATCH_DEADLINE):
+    """Sonda até a edição do dia aparecer (ou o prazo acabar) e então roda o pipeline"""
+    started = _now()
+    day = started.date()
+    record = {
+        "day": day.isoformat(),
+        "source": source.name,
+        "watch_started_at": started.isoformat(timespec="seconds"),
+        "status": None,
+        "probes": 0,
+        "relogins": 0,
+    }
+
+    manifest = pipeline.load_manifest(pipeline.build_context(source, day.isoformat())["manifest_path"])
+    if manifest and manifest.get("status") == "ok":
+        log.info(f"[WATCH] '{source.name}': clipagem de hoje já publicada")
+        record["status"] = "already_done"
+        return record
+
+    url = os.getenv(source.availability.get("url_env", ""), "") if source.availability else ""
+    if not url:
+        # Sem endpoint de sonda, rodar agora (mais cedo) pegaria a edição de ontem e o
+        # checkpoint faria a execução das 06:00 pular tudo: ela continua sendo a de verdade
+        log.info(f"[WATCH] '{source.name}': sem URL de disponibilidade, nada a vigiar (a execução das 06:00 faz a clipagem)")
+        record["status"] = "no_probe"
+        return record
+
+    marker = edition_marker(source, day)
+    usual_minute = usual_publication_minute(source.name, load_watch_log())
+    limit = _deadline(day, deadline)
+    interval = PROBE_MIN_SECONDS
+    session = open_http_session(source)
+    found, last_modified = False, None
+    log.info(f"[WATCH] '{source.name}': procurando '{marker}' até {limit:%H:%M}")
+
+    while _now() < limit:
+        record["probes"] += 1
+        try:
+            found, last_modified = probe_edition(session, url, marker)
+        except SessionExpired as e:
+            if record["relogins"] >= MAX_RELOGINS:
+                raise
+            log.warning(f"[WATCH] Sessão expirada ({e}), refazendo login...")
+            record["relogins"] += 1
+            session = open_http_session(source)
+            continue
+        except requests.RequestException as e:
+            log.warning(f"[WATCH] Sonda falhou: {e}")
+
+        if found:
+            break
+        interval = next_interval(interval, _now(), usual_minute)
+        log.info(f"[WATCH] Edição ainda não disponível; nova sonda em {int(interval)}s")
+        time.sleep(max(0, min(interval, (limit - _now()).total_seconds())))
+
+    if not found:
+        record["status"] = "not_published"
+        log.warning(f"[WATCH] '{source.name}': edição não apareceu até {limit:%H:%M}")
+        append_watch_log(record)
+        return record
+
+    detected = _now()
+    # Last-Modified (quando o portal informa) aproxima melhor a hora real de publicação
+    published = detected
+    if last_modified:
+        try:
+            published = min(parsedate_to_datetime(last_modified).astimezone(TIMEZONE), detected)
+        except (TypeError, ValueError):
+            pass
+    log.info(f"[WATCH] '{source.name}': edição detectada após {record['probes']} sonda(s), iniciando pipeline")
+
+    pipeline.run_pipeline(source, day=day.isoformat())
+    clipped = _now()
+    record.update(
+        status="ok",
+        published_at=published.isoformat(timespec="seconds"),
+        published_at_from="last-modified" if published != detected else "detection",
+        detected_at=detected.isoformat(timespec="seconds"),
+        clipped_at=clipped.isoformat(timespec="seconds"),
+        detection_delay_seconds=round((detected - published).total_seconds()),
+        publication_to_clipping_seconds=round((clipped - published).total_seconds()),
+    )
+    append_watch_log(record)
+    log.info(
+        f"[WATCH] '{source.name}': publicação→clipagem em "
+        f"{timedelta(seconds=record['publication_to_clipping_seconds'])}"
+    )
+    return record
+
+
+def _watch_safely(source, deadline):
+    try:
+        return watch_source(source, deadline)
+    except Exception as e:
+        log.error(f"[WATCH] ✗ Fonte '{source.name}' falhou: {e}")
+        return {"source": source.name, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aguarda a edição do dia e executa a clipagem assim que sair")
+    parser.add_argument("--sources-file", default=SOURCES_FILE, help="Registro de fontes (JSON)")
+    parser.add_argument("--only", default="", help="Nomes das fontes separados por vírgula")
+    parser.add_argument("--deadline", default=WATCH_DEADLINE, help="Horário local limite (HH:MM)")
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.sources_file)
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",") if name.strip()}
+        sources = [source for source in sources if source.name in wanted]
+    if not sources:
+        log.info("[WATCH] Nenhuma fonte habilitada para vigiar")
+        return 1
+
+    with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="vigia") as executor:
+        results = list(executor.map(lambda source: _watch_safely(source, args.deadline), sources))
+
+    for result in results:
+        log.info(f"[WATCH] {result['source']}: {result['status']}")
+    return 0 if all(r["status"] in ("ok", "already_done", "no_probe") for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Exportações - WhatsApp em partes, CSV, Markdown e resumo HTML compacto
+Gerados uma vez por versão dos dados (hash SHA-256 do JSON) e guardados em cache em
+disco: o dashboard só lê bytes prontos para os botões de download e blocos de cópia
+"""
+
+import csv
+import html
+import io
+import os
+import shutil
+from functools import lru_cache
+
+import data_loader
+import views
+from io_utils import dumps_json, loads_json, write_atomic
+import logs
+from noticias import get_relevancia
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("exports")
+EXPORTS_FOLDER = os.getenv(
+    "CLIPAGEM_EXPORTS_CACHE",
+    os.path.join(os.path.dirname(__file__), "..", "data", "cache", "exports"),
+)
+# O WhatsApp aceita mensagens bem maiores, mas textos longos ficam truncados na prévia
+WHATSAPP_MAX_CHARS = int(os.getenv("CLIPAGEM_WHATSAPP_MAX_CHARS", "3500"))
+EXPORTS_KEEP_VERSIONS = 5
+EXPORTS_SCHEMA = 1
+
+EXPORT_FILES = {
+    "csv": ("clipagem.csv", "text/csv"),
+    "markdown": ("clipagem.md", "text/markdown"),
+    "html": ("clipagem.html", "text/html"),
+}
+CSV_COLUMNS = ("pagina", "titulo", "resumo_120_chars", "relevancia")
+
+
+# ==================== WHATSAPP ====================
+def chunk_whatsapp(noticias, data_clipping, max_chars=WHATSAPP_MAX_CHARS):
+    """
+    Divide o texto de compartilhamento em mensagens de até max_chars caracteres,
+    sempre entre uma notícia e outra. As partes seguintes recebem "(continuação)".
+    """
+    # Reserva espaço para o marcador "[x/y]" acrescentado ao final de cada parte
+    limit = max_chars - 12
+    header = views.whatsapp_header(data_clipping)
+    continuation = header.rstrip("\n") + " (continuação)\n\n"
+
+    messages = []
+    current = header
+    for noticia in noticias:
+        block = views.format_noticia_whatsapp(noticia)
+        if len(current) + len(block) > limit and current not in (header, continuation):
+            messages.append(current.rstrip("\n"))
+            current = continuation
+        # Uma notícia sozinha maior que o limite é cortada (caso extremo)
+        room = limit - len(current)
+        if len(block) > room:
+            block = block[: max(room - 2, 0)].rstrip() + "…\n\n"
+        current += block
+
+    messages.append(current.rstrip("\n"))
+
+    # Numeração "parte x/y" só quando houve divisão
+    if len(messages) > 1:
+        total = len(messages)
+        messages = [f"{message}\n\n[{position}/{total}]" for position, message in enumerate(messages, 1)]
+    return messages
+
+
+# ==================== CSV / MARKDOWN / HTML ====================
+def _row(noticia):
+    return {
+        "pagina": str(noticia.get("pagina", "")),
+        "titulo": str(noticia.get("titulo", "")),
+        "resumo_120_chars": str(noticia.get("resumo_120_chars", "")),
+        "relevancia": str(get_relevancia(noticia)),
+    }
+
+
+def to_csv(noticias):
+    """CSV com BOM UTF-8 (abre com acentos corretos no Excel)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(_row(noticia) for noticia in noticias)
+    return "\ufeff" + buffer.getvalue()
+
+
+def _md_cell(text):
+    return text.replace("|", "\\|").replace("\n", " ")
+
+
+def to_markdown(noticias, data_clipping, resumo=""):
+    lines = [f"# Clipagem Diário de SM - {data_clipping}", ""]
+    if resumo:
+        lines += [resumo, ""]
+    lines += ["| Pág. | Título | Resumo | Relevância |", "|---|---|---|---|"]
+    for noticia in noticias:
+        row = _row(noticia)
+        lines.append(
+            f"| {_md_cell(row['pagina'])} | {_md_cell(row['titulo'])} | "
+            f"{_md_cell(row['resumo_120_chars'])} | {_md_cell(row['relevancia'])} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def to_html_digest(noticias, data_clipping, resumo=""):
+    """Resumo HTML autocontido (estilo inline), pronto para e-mail"""
+    items = []
+    for noticia in noticias:
+        row = {key: html.escape(value) for key, value in _row(noticia).items()}
+        items.append(
+            "<li style='margin-bottom:8px'>"
+            f"<b>{row['titulo']}</b> <small>(pág. {row['pagina']} · {row['relevancia']})</small>"
+            f"<br>{row['resumo_120_chars']}</li>"
+        )
+    resumo_html = f"<p>{html.escape(resumo)}</p>" if resumo else ""
+    return (
+        "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>"
+        f"<title>Clipagem {html.escape(data_clipping)}</title></head>"
+        "<body style='font-family:sans-serif;max-width:720px;margin:auto'>"
+        f"<h2>📰 Clipagem Diário de SM - {html.escape(data_clipping)}</h2>"
+        f"{resumo_html}<ol>{''.join(items)}</ol></body></html>"
+    )
+
+
+def build_exports(json_obj, resumo="", max_chars=WHATSAPP_MAX_CHARS):
+    """Todas as exportações de um resultado de clipagem (texto)"""
+    noticias = json_obj.get("noticias", [])
+    if not isinstance(noticias, list):
+        noticias = []
+    data_clipping = json_obj.get("data_clipping", "Data indisponível")
+    return {
+        "whatsapp": chunk_whatsapp(noticias, data_clipping, max_chars),
+        "csv": to_csv(noticias),
+        "markdown": to_markdown(noticias, data_clipping, resumo),
+        "html": to_html_digest(noticias, data_clipping, resumo),
+    }
+
+
+# ==================== CACHE EM DISCO ====================
+def _version_folder(data_sha256, max_chars):
+    return os.path.join(EXPORTS_FOLDER, f"{data_sha256[:16]}_w{max_chars}")
+
+
+def _prune_old_versions(keep=EXPORTS_KEEP_VERSIONS):
+    """Mantém apenas as versões geradas mais recentemente"""
+    try:
+        folders = sorted(
+            (entry for entry in os.scandir(EXPORTS_FOLDER) if entry.is_dir()),
+            key=lambda entry: entry.stat().st_mtime,
+            reverse=True,
+        )
+    except FileNotFoundError:
+        return
+    for entry in folders[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def save_exports(json_obj, data_sha256, resumo="", max_chars=WHATSAPP_MAX_CHARS):
+    """Grava as exportações de uma versão dos dados e retorna a pasta"""
+    folder = _version_folder(data_sha256, max_chars)
+    exported = build_exports(json_obj, resumo, max_chars)
+
+    # Arquivos primeiro; o manifesto por último marca a versão como completa
+    for key, (filename, _) in EXPORT_FILES.items():
+        write_atomic(os.path.join(folder, filename), exported[key].encode("utf-8"))
+    manifest = {"schema": EXPORTS_SCHEMA, "data_sha256": data_sha256, "whatsapp": exported["whatsapp"]}
+    write_atomic(os.path.join(folder, "manifest.json"), dumps_json(manifest))
+
+    _prune_old_versions()
+    log.info(f"[EXPORTS] {len(exported['whatsapp'])} mensagem(ns) de WhatsApp e arquivos salvos em: {folder}")
+    return folder
+
+
+@lru_cache(maxsize=4)
+def _load_version(json_path, data_sha256, max_chars):
+    folder = _version_folder(data_sha256, max_chars)
+    manifest_path = os.path.join(folder, "manifest.json")
+    try:
+        with open(manifest_path, "rb") as handle:
+            manifest = loads_json(handle.read())
+    except (OSError, ValueError):
+        manifest = None
+
+    if not manifest or manifest.get("schema") != EXPORTS_SCHEMA:
+        json_obj = data_loader.load_json(json_path)
+        resumo = views.pick_summary(json_obj)
+        try:
+            save_exports(json_obj, data_sha256, resumo, max_chars)
+        except OSError as e:
+            # Disco somente-leitura: mantém a versão apenas em memória
+            log.warning(f"[EXPORTS] AVISO: não foi possível gravar o cache: {e}")
+            exported = build_exports(json_obj, resumo, max_chars)
+            files = {
+                key: {"file_name": filename, "mime": mime, "data": exported[key].encode("utf-8")}
+                for key, (filename, mime) in EXPORT_FILES.items()
+            }
+            return {"whatsapp": exported["whatsapp"], "files": files}
+        with open(manifest_path, "rb") as handle:
+            manifest = loads_json(handle.read())
+
+    files = {}
+    for key, (filename, mime) in EXPORT_FILES.items():
+        with open(os.path.join(folder, filename), "rb") as handle:
+            files[key] = {"file_name": filename, "mime": mime, "data": handle.read()}
+    return {"whatsapp": manifest["whatsapp"], "files": files}
+
+
+def load_exports(json_path, max_chars=WHATSAPP_MAX_CHARS):
+    """
+    Exportações da versão atual do JSON: {"whatsapp": [mensagens], "files": {...}}.
+    Lidas do cache em disco (gerado na análise); se ausente, geradas uma única vez.
+    """
+    data_sha256 = data_loader.file_digest(json_path)
+    if data_sha256 is None:
+        return None
+    return _load_version(str(json_path), data_sha256, max_chars)
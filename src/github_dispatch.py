@@ -0,0 +1,264 @@
+"""
+Disparo do Workflow - "Verificar Edição Agora" com coalescência e acompanhamento
+Evita disparos duplicados (execução já na fila/em andamento ou cooldown recente) e
+acompanha a execução com polling condicional (ETag) e backoff progressivo
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+import logs
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("github_dispatch")
+# A URL da API é configurável para apontar para um servidor local nos testes
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+REPOSITORY = os.getenv("CLIPAGEM_REPOSITORY", "lenondpaula/clipagem")
+WORKFLOW_FILE = "daily_run.yml"
+DISPATCH_REF = "main"
+DISPATCH_COOLDOWN_SECONDS = int(os.getenv("CLIPAGEM_DISPATCH_COOLDOWN", "120"))
+REQUEST_TIMEOUT = 20
+
+ACTIVE_STATUSES = {"queued", "in_progress", "waiting", "requested", "pending"}
+POLL_MIN_SECONDS = 5
+POLL_MAX_SECONDS = 60
+# Sem a execução disparada na listagem depois deste prazo, o acompanhamento desiste
+DISCOVERY_TIMEOUT_SECONDS = int(os.getenv("CLIPAGEM_DISPATCH_DISCOVERY_TIMEOUT", "300"))
+# Relógio do servidor do dashboard adiantado em relação ao created_at do GitHub
+CLOCK_SKEW_SECONDS = 120
+
+STATUS_LABELS = {
+    "queued": "na fila",
+    "in_progress": "em andamento",
+    "waiting": "aguardando",
+    "requested": "solicitada",
+    "pending": "pendente",
+    "completed": "concluída",
+}
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+# ==================== CLIENTE ====================
+class WorkflowDispatcher:
+    """Cliente do workflow diário, compartilhado por todas as sessões do dashboard"""
+
+    def __init__(self, token, api_url=GITHUB_API_URL, repository=REPOSITORY,
+                 workflow=WORKFLOW_FILE, cooldown=DISPATCH_COOLDOWN_SECONDS, session=None):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.repository = repository
+        self.workflow = workflow
+        self.cooldown = cooldown
+        self.session = session or requests.Session()
+
+        self._lock = threading.Lock()
+        self._last_dispatch_at = 0.0
+        self._dispatched_since = None
+        self._discovery_deadline = 0.0
+        self._known_run_ids = set()
+        self._etags = {}
+        self._cached = {}
+
+        # Execução acompanhada e controle de backoff do polling
+        self.run = None
+        self.run_not_found = False
+        self._poll_interval = POLL_MIN_SECONDS
+        self._next_poll_at = 0.0
+
+    # ---------- HTTP ----------
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+
+    def _get(self, path, params=None):
+        """GET condicional: respostas 304 reaproveitam o último corpo (não consomem cota)"""
+        url = f"{self.api_url}{path}"
+        cache_key = (url, tuple(sorted((params or {}).items())))
+        headers = self._headers()
+        if cache_key in self._etags:
+            headers["If-None-Match"] = self._etags[cache_key]
+
+        response = self.session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 304:
+            return self._cached[cache_key], False
+        response.raise_for_status()
+
+        body = response.json()
+        if response.headers.get("ETag"):
+            self._etags[cache_key] = response.headers["ETag"]
+            self._cached[cache_key] = body
+        return body, True
+
+    def _runs_path(self):
+        return f"/repos/{self.repository}/actions/workflows/{self.workflow}/runs"
+
+    # ---------- CONSULTAS ----------
+    def _recent_runs(self):
+        body, _ = self._get(self._runs_path(), {"per_page": 10})
+        return body.get("workflow_runs", [])
+
+    def active_run(self):
+        """Execução do workflow que ainda está na fila ou rodando (se houver)"""
+        for run in self._recent_runs():
+            if run.get("status") in ACTIVE_STATUSES:
+                return run
+        return None
+
+    def _find_dispatched_run(self):
+        """
+        Execução criada pelo disparo: nova em relação à listagem anterior ao POST e criada
+        depois dele, com folga para o relógio local adiantado
+        """
+        body, _ = self._get(self._runs_path(), {"event": "workflow_dispatch", "per_page": 5})
+        since = self._dispatched_since - timedelta(seconds=CLOCK_SKEW_SECONDS)
+        for run in body.get("workflow_runs", []):
+            created = _parse_time(run.get("created_at"))
+            if run.get("id") not in self._known_run_ids and created and created >= since:
+                return run
+        return None
+
+    # ---------- DISPARO ----------
+    def dispatch(self):
+        """
+        Dispara o workflow, a menos que já exista execução ativa ou um disparo recente.
+        Retorna (ok, mensagem).
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._last_dispatch_at
+            if self._last_dispatch_at and elapsed < self.cooldown:
+                return True, (
+                    "Uma verificação foi solicitada há poucos instantes. "
+                    "Acompanhando a execução em andamento."
+                )
+
+            try:
+                recent = self._recent_runs()
+            except requests.RequestException as exc:
+                return False, f"Erro ao consultar execuções no GitHub: {exc}"
+
+            running = next((run for run in recent if run.get("status") in ACTIVE_STATUSES), None)
+            if running:
+                self._track(running)
+                label = STATUS_LABELS.get(running.get("status"), running.get("status"))
+                return True, f"Já existe uma execução {label} (#{running.get('run_number')}). Acompanhando..."
+
+            url = f"{self.api_url}/repos/{self.repository}/actions/workflows/{self.workflow}/dispatches"
+            # Marcado antes do POST: a execução criada pelo disparo nunca fica "antes" dele
+            requested_at = datetime.now(timezone.utc).replace(microsecond=0)
+            try:
+                response = self.session.post(
+                    url, headers=self._headers(), json={"ref": DISPATCH_REF}, timeout=REQUEST_TIMEOUT
+                )
+            except requests.RequestException as exc:
+                return False, f"Erro ao chamar GitHub API: {exc}"
+
+            if response.status_code != 204:
+                message = response.text.strip() or "Resposta inesperada da API."
+                return False, f"Falha ao disparar workflow ({response.status_code}): {message}"
+
+            self._last_dispatch_at = time.monotonic()
+            self._dispatched_since = requested_at
+            self._discovery_deadline = self._last_dispatch_at + DISCOVERY_TIMEOUT_SECONDS
+            self._known_run_ids = {run.get("id") for run in recent}
+            self.run = None
+            self.run_not_found = False
+            self._reset_backoff()
+            return True, "Solicitação enviada! O robô iniciou o processamento."
+
+    # ---------- ACOMPANHAMENTO ----------
+    def _track(self, run):
+        if not self.run or self.run.get("id") != run.get("id"):
+            self._reset_backoff()
+        self.run = run
+        self.run_not_found = False
+
+    def _reset_backoff(self):
+        self._poll_interval = POLL_MIN_SECONDS
+        self._next_poll_at = 0.0
+
+    def poll(self):
+        """
+        Atualiza o status da execução acompanhada respeitando o backoff.
+        Retorna a execução (dict) ou None se nada estiver sendo acompanhado.
+        """
+        with self._lock:
+            if time.monotonic() < self._next_poll_at or not self.is_tracking():
+                return self.run
+
+            if self.run is None and time.monotonic() >= self._discovery_deadline:
+                # Disparo aceito, mas a execução nunca apareceu (substituída, ou fora da listagem)
+                log.warning(
+                    f"[DISPATCH] AVISO: execução disparada não encontrada após "
+                    f"{DISCOVERY_TIMEOUT_SECONDS}s; acompanhamento encerrado"
+                )
+                self._dispatched_since = None
+                self.run_not_found = True
+                return None
+
+            changed = False
+            try:
+                if self.run is None:
+                    # Logo após o disparo a execução ainda pode não aparecer na listagem
+                    run = self._find_dispatched_run()
+                    if run:
+                        self._track(run)
+                        changed = True
+                else:
+                    run, changed = self._get(f"/repos/{self.repository}/actions/runs/{self.run['id']}")
+                    changed = changed and run.get("status") != self.run.get("status")
+                    self.run = run
+            except requests.RequestException as exc:
+                log.warning(f"[DISPATCH] Erro ao consultar execução: {exc}")
+
+            # Sem mudança, espera cada vez mais entre consultas
+            if changed:
+                self._poll_interval = POLL_MIN_SECONDS
+            else:
+                self._poll_interval = min(self._poll_interval * 2, POLL_MAX_SECONDS)
+            self._next_poll_at = time.monotonic() + self._poll_interval
+
+            if self.run and self.run.get("status") == "completed":
+                self._dispatched_since = None
+            return self.run
+
+    def is_tracking(self):
+        return self._dispatched_since is not None or (
+            self.run is not None and self.run.get("status") != "completed"
+        )
+
+
+# ==================== INSTÂNCIA COMPARTILHADA ====================
+_DISPATCHERS = {}
+_DISPATCHERS_LOCK = threading.Lock()
+
+
+def get_dispatcher(token):
+    """Uma instância por token no processo: cooldown e acompanhamento valem para todas as sessões"""
+    with _DISPATCHERS_LOCK:
+        if token not in _DISPATCHERS:
+            _DISPATCHERS[token] = WorkflowDispatcher(token)
+        return _DISPATCHERS[token]
+
+
+def describe_run(run):
+    """Texto curto do status para a barra lateral"""
+    status = STATUS_LABELS.get(run.get("status"), run.get("status"))
+    text = f"Execução #{run.get('run_number')}: {status}"
+    if run.get("status") == "completed":
+        text += f" ({run.get('conclusion')})"
+    started = _parse_time(run.get("run_started_at") or run.get("created_at"))
+    if started:
+        seconds = int((datetime.now(timezone.utc) - started).total_seconds())
+        text += f" · {seconds // 60}min {seconds % 60}s"
+    return text
@@ -0,0 +1,175 @@
+"""
+Índice do Histórico - Navegação paginada pelas clipagens anteriores
+O índice guarda, por dia, um resumo pré-calculado e os offsets de cada linha do
+histórico NDJSON: abrir uma data lê apenas a página pedida, sem carregar o arquivo todo
+"""
+
+import json
+import os
+
+import data_loader
+from io_utils import dumps_json, loads_json, write_atomic
+import logs
+from noticias import RELEVANCIA_ORDER, get_relevancia, is_licitacao, relevancia_key
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("history_index")
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "historico_clipagem.ndjson")
+INDEX_VERSION = 1
+PAGE_SIZE = 20
+
+
+def index_path_for(history_path):
+    """Caminho do índice ao lado do histórico (historico_clipagem_index.json)"""
+    return os.path.splitext(history_path)[0] + "_index.json"
+
+
+def _empty_index():
+    return {"version": INDEX_VERSION, "source_size": 0, "days": {}}
+
+
+# ==================== CONSTRUÇÃO INCREMENTAL ====================
+def _read_index_file(index_path):
+    try:
+        with open(index_path, "r", encoding="utf-8") as handle:
+            index = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return _empty_index()
+    if index.get("version") != INDEX_VERSION:
+        return _empty_index()
+    return index
+
+
+def _add_record(days, record, offset):
+    day = record.get("data")
+    if not day:
+        return
+
+    summary = days.get(day)
+    generated_at = record.get("gerado_em", "")
+
+    # Uma nova execução do mesmo dia substitui a anterior; no mesmo segundo, vale a ordem
+    # do arquivo (o bloco de outra edição veio depois)
+    newer = summary is None or generated_at > summary["gerado_em"] or (
+        generated_at == summary["gerado_em"] and record.get("edicao_hash", "") != summary["edicao_hash"]
+    )
+    if newer:
+        summary = {
+            "data_clipping": record.get("data_clipping", ""),
+            "edicao_hash": record.get("edicao_hash", ""),
+            "gerado_em": generated_at,
+            "total": 0,
+            "licitacoes": 0,
+            "por_relevancia": {key: 0 for key in RELEVANCIA_ORDER},
+            "offsets": [],
+        }
+        days[day] = summary
+    elif generated_at < summary["gerado_em"]:
+        return
+
+    noticia = record.get("noticia", {})
+    summary["total"] += 1
+    summary["licitacoes"] += int(is_licitacao(noticia))
+    summary["por_relevancia"][relevancia_key(get_relevancia(noticia))] += 1
+    summary["offsets"].append(offset)
+
+
+def update_index(history_path=HISTORY_PATH, index_path=None):
+    """Indexa apenas os bytes novos do histórico e grava o índice atualizado"""
+    index_path = index_path or index_path_for(history_path)
+    index = _read_index_file(index_path)
+
+    try:
+        history_size = os.path.getsize(history_path)
+    except OSError:
+        return _empty_index()
+
+    # Histórico reescrito/truncado: reconstrói do zero
+    if history_size < index["source_size"]:
+        log.info("[HISTORY] Histórico menor que o indexado, reconstruindo índice...")
+        index = _empty_index()
+
+    offset = index["source_size"]
+    new_lines = 0
+    with open(history_path, "rb") as handle:
+        handle.seek(offset)
+        for line in handle:
+            if not line.endswith(b"\n"):
+                # Linha incompleta (escrita em andamento): fica para a próxima atualização
+                break
+            try:
+                _add_record(index["days"], loads_json(line), offset)
+                new_lines += 1
+            except ValueError:
+                pass
+            offset += len(line)
+
+    index["source_size"] = offset
+    try:
+        write_atomic(index_path, dumps_json(index))
+    except OSError as e:
+        # Dashboard em disco somente-leitura: usa o índice em memória
+        log.warning(f"[HISTORY] AVISO: não foi possível gravar o índice: {e}")
+
+    if new_lines:
+        log.info(f"[HISTORY] Índice atualizado: +{new_lines} registros, {len(index['days'])} dia(s)")
+    return index
+
+
+# ==================== CONSULTA ====================
+def load_index(history_path=HISTORY_PATH, index_path=None):
+    """
+    Retorna o índice, atualizando-o só quando o histórico cresceu.
+    Leitura normal = um os.stat + parse em cache por versão do arquivo de índice.
+    """
+    index_path = index_path or index_path_for(history_path)
+    history_version = data_loader.file_version(history_path)
+    if history_version is None:
+        return _empty_index()
+
+    try:
+        index = data_loader.load_json(index_path)
+    except (OSError, ValueError):
+        index = None
+
+    if not index or index.get("version") != INDEX_VERSION or index.get("source_size") != history_version[2]:
+        index = update_index(history_path, index_path)
+    return index
+
+
+def available_days(index):
+    """Datas disponíveis (AAAA-MM-DD), da mais recente para a mais antiga"""
+    return sorted(index.get("days", {}), reverse=True)
+
+
+def day_summary(index, day):
+    """Resumo pré-calculado de um dia, sem os offsets"""
+    summary = index.get("days", {}).get(day)
+    if summary is None:
+        return None
+    return {key: value for key, value in summary.items() if key != "offsets"}
+
+
+def page_count(index, day, page_size=PAGE_SIZE):
+    summary = index.get("days", {}).get(day)
+    if not summary:
+        return 0
+    return max(1, -(-summary["total"] // page_size))
+
+
+def read_page(index, day, page=1, page_size=PAGE_SIZE, history_path=HISTORY_PATH):
+    """Lê somente as notícias da página pedida, posicionando direto nos offsets"""
+    summary = index.get("days", {}).get(day)
+    if not summary:
+        return []
+
+    start = (max(page, 1) - 1) * page_size
+    offsets = summary["offsets"][start:start + page_size]
+    noticias = []
+    with open(history_path, "rb") as handle:
+        for offset in offsets:
+            handle.seek(offset)
+            record = loads_json(handle.readline())
+            noticias.append(record.get("noticia", {}))
+    return noticias
@@ -0,0 +1,459 @@
+"""
+Scraper HTTP - Login, filtro e download da edição sem navegador
+Reproduz, com requisições HTTP em um pool de conexões, a sequência que a SPA do portal
+faz contra a API (login, listagem de edições, PDF). A sequência fica em um spec JSON
+versionado (specs/<fonte>.json), gravado uma vez a partir de uma sessão real do Chrome
+(--record). Quando o portal muda e o spec deixa de corresponder, SpecMismatch sinaliza
+para o daily_scraper voltar ao fluxo Selenium
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config  # .env carregado uma única vez, antes dos módulos que leem o ambiente
+from io_utils import dumps_json, write_atomic
+import logs
+from sources import BASE_DIR, SOURCES_FILE, default_source, get_source
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("http_scraper")
+SPEC_VERSION = 1
+SPECS_FOLDER = os.path.join(BASE_DIR, "specs")
+REQUEST_TIMEOUT = int(os.getenv("CLIPAGEM_HTTP_TIMEOUT", "30"))
+POOL_SIZE = 4
+RETRY_STATUSES = (502, 503, 504)
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+# Gravação: tipos de requisição da SPA que entram no spec e valores que valem ligar
+# a respostas anteriores (tokens, ids de edição)
+RECORDED_TYPES = ("XHR", "Fetch")
+PDF_MIME_TYPES = ("application/pdf", "application/octet-stream")
+LINKABLE_VALUE_RE = re.compile(r"^[\w\-.]{6,}$")
+KEPT_HEADERS = ("authorization", "content-type", "accept", "x-requested-with")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+# Parâmetros de URL com credenciais de sessão (nunca gravados no spec versionado)
+SENSITIVE_PARAM_RE = re.compile(r"token|auth|key|session|sig", re.IGNORECASE)
+# Token que não aparece em nenhuma resposta anterior: o spec falha até ganhar uma regra de extract
+UNLINKED_TOKEN = "token_nao_ligado"
+
+
+class SpecMismatch(Exception):
+    """O portal não respondeu como o spec gravado descreve (status, campos, tipo de conteúdo)"""
+
+
+# ==================== SPEC ====================
+def spec_path(source):
+    """
+    Caminho do spec da fonte: campo http_spec do registro (relativo à raiz do projeto)
+    ou specs/<fonte>.json, se existir; None quando a fonte não tem spec gravado
+    """
+    if source.http_spec:
+        return source.http_spec if os.path.isabs(source.http_spec) else os.path.join(BASE_DIR, source.http_spec)
+    default = os.path.join(SPECS_FOLDER, f"{source.name}.json")
+    return default if os.path.exists(default) else None
+
+
+def load_spec(path):
+    if not path or not os.path.exists(path):
+        raise SpecMismatch(f"spec não encontrado: {path or 'fonte sem http_spec'}")
+    with open(path, "r", encoding="utf-8") as handle:
+        spec = json.load(handle)
+    if spec.get("version") != SPEC_VERSION:
+        raise SpecMismatch(f"spec {path} na versão {spec.get('version')}, esperada {SPEC_VERSION}")
+    if not spec.get("steps") or not spec["steps"][-1].get("download"):
+        raise SpecMismatch(f"spec {path} sem etapa final de download")
+    return spec
+
+
+def spec_variables(source, now=None):
+    """Valores disponíveis para os modelos "{...}" do spec (credenciais vêm do ambiente)"""
+    reference = source.access_url or source.login_url
+    parts = urlsplit(reference)
+    return {
+        "user": source.user,
+        "password": source.password,
+        "login_url": source.login_url,
+        "access_url": source.access_url,
+        "origin": f"{parts.scheme}://{parts.netloc}" if parts.netloc else "",
+        "date": now or datetime.now(),
+        "apply_publication_filter": source.apply_publication_filter,
+    }
+
+
+def _render(template, variables):
+    """Preenche "{var}" em strings, dicts e listas; "{var}" sozinho preserva o tipo do valor"""
+    if isinstance(template, dict):
+        return {key: _render(value, variables) for key, value in template.items()}
+    if isinstance(template, list):
+        return [_render(value, variables) for value in template]
+    if not isinstance(template, str):
+        return template
+    whole = re.fullmatch(r"\{(\w+)\}", template)
+    try:
+        if whole:
+            return variables[whole.group(1)]
+        return template.format(**variables)
+    except (KeyError, IndexError) as e:
+        raise SpecMismatch(f"variável ausente no spec: {e}") from e
+    except ValueError as e:
+        # Chaves literais sem escape ("{" / "}") em URL ou corpo gravado
+        raise SpecMismatch(f"modelo inválido no spec ({template!r}): {e}") from e
+
+
+def _lookup(data, path):
+    """Caminho pontuado em JSON ("data.0.arquivo.url"); None se não existir"""
+    for key in path.split(".") if path else ():
+        if isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        elif isinstance(data, dict) and key in data:
+            data = data[key]
+        else:
+            return None
+    return data
+
+
+def _matches(item, conditions):
+    return all(_lookup(item, key) == value for key, value in conditions.items())
+
+
+def _extract(rule, response, payload):
+    """
+    Regra de extração: "caminho" no JSON, {"header": "Location"} ou
+    {"path": "data", "where": {...}, "exclude": {...}, "get": "pdf_url"} para escolher
+    o primeiro item de uma lista (ex.: exclude {"publicacaoLegal": true} = filtro "Exceto")
+    """
+    if isinstance(rule, str):
+        return _lookup(payload, rule)
+    if "header" in rule:
+        return response.headers.get(rule["header"])
+    value = _lookup(payload, rule.get("path", ""))
+    if isinstance(value, list):
+        candidates = [
+            item for item in value
+            if _matches(item, rule.get("where", {}))
+            and not (rule.get("exclude") and _matches(item, rule["exclude"]))
+        ]
+        value = candidates[0] if candidates else None
+    return _lookup(value, rule["get"]) if value is not None and rule.get("get") else value
+
+
+# ==================== EXECUÇÃO ====================
+def build_session():
+    """requests.Session com pool de conexões e novas tentativas em 502/503/504"""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=RETRY_STATUSES, allowed_methods=None)
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _check(step, response):
+    name = step.get("name", step["url"])
+    expect = step.get("expect", {})
+    if response.status_code not in expect.get("status", [200]):
+        raise SpecMismatch(f"{name}: HTTP {response.status_code}")
+    content_type = response.headers.get("Content-Type", "")
+    if expect.get("content_type") and not content_type.startswith(expect["content_type"]):
+        raise SpecMismatch(f"{name}: Content-Type {content_type!r}, esperado {expect['content_type']!r}")
+
+
+def run_step(session, step, variables, download_path=None):
+    """Executa uma etapa do spec, confere a resposta e acrescenta as variáveis extraídas"""
+    name = step.get("name", step["url"])
+    request = {
+        "method": step.get("method", "GET"),
+        "url": _render(step["url"], variables),
+        "headers": _render(step.get("headers", {}), variables),
+        "params": _render(step.get("params"), variables),
+        "timeout": REQUEST_TIMEOUT,
+        "stream": bool(download_path),
+    }
+    if "json" in step:
+        request["json"] = _render(step["json"], variables)
+    elif "data" in step:
+        request["data"] = _render(step["data"], variables)
+
+    start = time.perf_counter()
+    response = session.request(**request)
+    _check(step, response)
+
+    if download_path:
+        size = _stream_to_file(response, download_path, name)
+        log.info(f"[HTTP] {name}: {size} bytes em {time.perf_counter() - start:.2f}s")
+        return response
+
+    payload = None
+    if step.get("extract") or step.get("expect", {}).get("json_keys"):
+        try:
+            payload = response.json()
+        except ValueError as e:
+            raise SpecMismatch(f"{name}: resposta não é JSON") from e
+    for path in step.get("expect", {}).get("json_keys", []):
+        if _lookup(payload, path) is None:
+            raise SpecMismatch(f"{name}: campo '{path}' ausente na resposta")
+    for variable, rule in step.get("extract", {}).items():
+        value = _extract(rule, response, payload)
+        if value in (None, ""):
+            raise SpecMismatch(f"{name}: não foi possível extrair '{variable}'")
+        variables[variable] = value
+    log.info(f"[HTTP] {name}: HTTP {response.status_code} em {time.perf_counter() - start:.2f}s")
+    return response
+
+
+def _stream_to_file(response, path, name):
+    """Grava o PDF em partes; o arquivo só fica no lugar se for de fato um PDF"""
+    tmp_path = path + ".part"
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                if size == 0 and not chunk.lstrip().startswith(b"%PDF"):
+                    raise SpecMismatch(f"{name}: conteúdo baixado não é PDF")
+                f.write(chunk)
+                size += len(chunk)
+        if size == 0:
+            raise SpecMismatch(f"{name}: PDF vazio")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return size
+
+
+def download_edition(source, download_path, spec=None, session=None):
+    """Executa o spec da fonte e grava o PDF da edição em download_path"""
+    spec = spec or load_spec(spec_path(source))
+    variables = spec_variables(source)
+    session = session or build_session()
+    session.headers.update(spec.get("headers", {}))
+
+    start = time.perf_counter()
+    try:
+        for step in spec["steps"]:
+            if step.get("only_if") and not variables.get(step["only_if"]):
+                continue
+            run_step(session, step, variables, download_path if step.get("download") else None)
+    except requests.RequestException as e:
+        raise SpecMismatch(f"{type(e).__name__}: {e}") from e
+    finally:
+        session.close()
+    seconds = round(time.perf_counter() - start, 3)
+    log.info(
+        f"[HTTP] Edição baixada sem navegador em {seconds:.2f}s",
+        extra={"fields": {"event": "http_download", "source": source.name, "seconds": seconds}},
+    )
+    return download_path
+
+
+# ==================== GRAVAÇÃO DO SPEC ====================
+def _performance_events(driver):
+    """Pares (requisição, resposta) da SPA registrados no log de desempenho do Chrome"""
+    requests_by_id, order = {}, []
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        params = message.get("params", {})
+        request_id = params.get("requestId")
+        if message["method"] == "Network.requestWillBeSent":
+            if request_id not in requests_by_id:
+                order.append(request_id)
+            requests_by_id[request_id] = {"request": params["request"], "type": params.get("type"), "response": None}
+        elif message["method"] == "Network.responseReceived" and request_id in requests_by_id:
+            requests_by_id[request_id]["response"] = params["response"]
+            requests_by_id[request_id]["type"] = params.get("type") or requests_by_id[request_id]["type"]
+    return [(request_id, requests_by_id[request_id]) for request_id in order]
+
+
+def _response_json(driver, request_id):
+    try:
+        body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        return json.loads(body["body"])
+    except Exception:
+        return None
+
+
+def _find_value(data, target, path=""):
+    """Caminho pontuado da primeira ocorrência de target em um JSON"""
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return path if str(data) == target else None
+    for key, value in items:
+        found = _find_value(value, target, f"{path}.{key}" if path else str(key))
+        if found is not None:
+            return found
+    return None
+
+
+def _templated(value, source, origin):
+    """
+    Troca origem, data e credenciais gravadas pelos modelos do spec; chaves literais
+    viram "{{" / "}}" para não serem lidas como modelo. Em JSON, vale para cada string.
+    """
+    if isinstance(value, dict):
+        return {key: _templated(item, source, origin) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_templated(item, source, origin) for item in value]
+    if not isinstance(value, str):
+        return value
+    text = value.replace("{", "{{").replace("}", "}}")
+    text = text.replace(origin, "{origin}")
+    # Data da gravação nos formatos usados em filtros de edição
+    today = datetime.now()
+    for fmt in DATE_FORMATS:
+        text = text.replace(today.strftime(fmt), "{date:%s}" % fmt)
+    for secret, name in ((source.password, "password"), (source.user, "user")):
+        if secret:
+            text = text.replace(quote(secret, safe=""), "{%s}" % name).replace(secret, "{%s}" % name)
+    return text
+
+
+def _link_value(value, bodies):
+    """Liga um valor da requisição à resposta anterior que o contém; retorna a variável ou None"""
+    for previous, payload in reversed(bodies):
+        path = _find_value(payload, value) if payload is not None else None
+        if path is None:
+            continue
+        extract = previous.setdefault("extract", {})
+        variable = next((name for name, rule in extract.items() if rule == path), None)
+        if variable is None:
+            variable = re.sub(r"\W", "_", f"v{len(extract) + 1}_{previous['name'].split('/')[-1] or 'valor'}")
+            extract[variable] = path
+        return variable
+    return None
+
+
+def build_spec(source, events, response_json):
+    """
+    Monta o spec a partir das requisições gravadas: XHR/Fetch da SPA até o PDF, com
+    tokens e ids ligados às respostas anteriores por regras de extração
+    """
+    origin = spec_variables(source)["origin"]
+    steps, bodies = [], []
+    for request_id, event in events:
+        response = event["response"] or {}
+        mime = response.get("mimeType", "")
+        is_pdf = mime in PDF_MIME_TYPES
+        if event["type"] not in RECORDED_TYPES and not is_pdf:
+            continue
+
+        request = event["request"]
+        headers = {
+            key: _templated(value, source, origin)
+            for key, value in request.get("headers", {}).items() if key.lower() in KEPT_HEADERS
+        }
+        step = {
+            "name": f"{request['method'].lower()} {urlsplit(request['url']).path}",
+            "method": request["method"],
+            "url": _templated(request["url"], source, origin),
+            "headers": headers,
+            "expect": {"status": [response.get("status", 200)]},
+        }
+        post_data = request.get("postData")
+        if post_data:
+            try:
+                step["json"] = _templated(json.loads(post_data), source, origin)
+            except ValueError:
+                step["data"] = _templated(post_data, source, origin)
+
+        # Valores dinâmicos (token, ids na URL) que apareceram em uma resposta anterior;
+        # tokens sem origem conhecida nunca vão para o spec
+        parts = urlsplit(request["url"])
+        secrets = [value.split(" ", 1)[-1] for key, value in headers.items() if key.lower() == "authorization"]
+        secrets += [value for key, value in parse_qsl(parts.query) if SENSITIVE_PARAM_RE.search(key) and value]
+        ids = [part for part in parts.path.split("/") if LINKABLE_VALUE_RE.match(part)]
+        for value in secrets + ids:
+            variable = _link_value(value, bodies)
+            if variable is None and value in secrets:
+                variable = UNLINKED_TOKEN
+                log.warning(
+                    f"[HTTP] AVISO: {step['name']}: token sem origem nas respostas gravadas, "
+                    f"substituído por {{{UNLINKED_TOKEN}}} (acrescente uma regra de extract)"
+                )
+            if variable is None:
+                continue
+            escaped = value.replace("{", "{{").replace("}", "}}")
+            step["url"] = step["url"].replace(escaped, "{%s}" % variable).replace(quote(value, safe=""), "{%s}" % variable)
+            step["headers"] = {key: item.replace(escaped, "{%s}" % variable) for key, item in step["headers"].items()}
+
+        if is_pdf:
+            step.update(name="pdf", download=True)
+            step["expect"]["content_type"] = mime
+            steps.append(step)
+            break
+        steps.append(step)
+        bodies.append((step, response_json(request_id) if "json" in mime else None))
+
+    if not steps or not steps[-1].get("download"):
+        raise SpecMismatch("nenhuma resposta em PDF na sessão gravada")
+    return {
+        "version": SPEC_VERSION,
+        "source": source.name,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        "steps": steps,
+    }
+
+
+def record_spec(source, out_path):
+    """Roda o fluxo Selenium uma vez com o log de rede ligado e grava o spec resultante"""
+    import daily_scraper
+
+    driver = daily_scraper.setup_chrome_driver(source.data_folder, capture_network=True)
+    try:
+        daily_scraper.perform_login(driver, source)
+        daily_scraper.access_and_download_pdf(driver, source)
+        daily_scraper.wait_for_download_completion(source.data_folder)
+        spec = build_spec(source, _performance_events(driver), lambda request_id: _response_json(driver, request_id))
+    finally:
+        driver.quit()
+
+    write_atomic(out_path, dumps_json(spec, pretty=True))
+    log.info(f"[HTTP] Spec com {len(spec['steps'])} etapa(s) gravado em: {out_path}")
+    log.info("[HTTP] Revise o spec (etapas desnecessárias, regras de extração) e aponte http_spec no registro de fontes")
+    return spec
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper HTTP (sem navegador) guiado por spec gravado")
+    parser.add_argument("--source", default=None, help="Nome da fonte no registro (padrão: fonte original)")
+    parser.add_argument("--sources-file", default=SOURCES_FILE, help="Registro de fontes (JSON)")
+    parser.add_argument("--record", metavar="SPEC", nargs="?", const="", help="Grava o spec a partir de uma sessão do Chrome")
+    parser.add_argument("--check", action="store_true", help="Executa o spec e baixa o PDF em um arquivo temporário")
+    args = parser.parse_args(argv)
+
+    source = get_source(args.source, args.sources_file) if args.source else default_source()
+    if args.record is not None:
+        record_spec(source, args.record or spec_path(source) or os.path.join(SPECS_FOLDER, f"{source.name}.json"))
+        return 0
+    if args.check:
+        path = os.path.join(source.data_folder, f".{source.name}_http_check.pdf")
+        try:
+            download_edition(source, path)
+        except SpecMismatch as e:
+            log.error(f"[HTTP] ✗ Spec não corresponde ao portal: {e}")
+            return 1
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+        log.info("[HTTP] ✓ Spec confere com o portal")
+        return 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Utilitários de E/S - Serialização JSON e gravação atômica de arquivos
+Compartilhado pelo analisador, executores e dashboards (sem dependências pesadas)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import orjson  # Backend JSON opcional (mais rápido)
+except ImportError:
+    orjson = None
+
+
+JSON_BACKEND = "orjson" if orjson is not None else "json (stdlib)"
+
+
+def dumps_json(obj, pretty=False):
+    """Serializa objeto em bytes JSON (UTF-8), usando orjson quando disponível"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@contextmanager
+def open_atomic(path, mode="wb", encoding=None):
+    """Entrega um arquivo temporário no mesmo diretório, renomeado atomicamente ao final sem erro"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.basename(path), dir=directory)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_atomic(path, data):
+    """Grava bytes em arquivo temporário no mesmo diretório e renomeia atomicamente"""
+    with open_atomic(path) as f:
+        f.write(data)
+
+
+def file_sha256(path):
+    """Calcula o SHA-256 de um arquivo lendo em blocos"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def loads_json(data):
+    """Faz parse de bytes/str JSON, usando orjson quando disponível"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
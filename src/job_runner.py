@@ -0,0 +1,251 @@
+"""
+Executor Local de Jobs - Scraper + analisador sob demanda, sem passar pelo GitHub Actions
+Uma única thread de trabalho processa a fila (um job por vez), pedidos idênticos ainda
+na fila são reaproveitados e cada mudança de estado é gravada em um log NDJSON
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+from io_utils import dumps_json, loads_json
+import logs
+from sources import DATA_FOLDER, SOURCES_FILE, load_sources
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("job_runner")
+LOCAL_RUNNER_ENABLED = os.getenv("CLIPAGEM_LOCAL_RUNNER", "false").lower() == "true"
+JOBS_FOLDER = os.path.join(DATA_FOLDER, "jobs")
+JOBS_LOG_PATH = os.path.join(JOBS_FOLDER, "jobs.jsonl")
+MAX_EVENTS_PER_JOB = 200
+
+PENDING_STATES = {"queued", "running"}
+FINAL_STATES = {"ok", "error", "interrupted"}
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+# ==================== JOB ====================
+class Job:
+    """Pedido de execução e seus eventos de progresso"""
+
+    def __init__(self, sources=None, skip_scrape=False, skip_analyze=False, requested_by="dashboard"):
+        self.id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.sources = sorted(sources) if sources else []
+        self.skip_scrape = skip_scrape
+        self.skip_analyze = skip_analyze
+        self.requested_by = requested_by
+        self.status = "queued"
+        self.created_at = _now()
+        self.started_at = None
+        self.finished_at = None
+        self.results = []
+        self.events = deque(maxlen=MAX_EVENTS_PER_JOB)
+
+    @property
+    def key(self):
+        """Pedidos com a mesma chave produzem o mesmo resultado"""
+        return (tuple(self.sources), self.skip_scrape, self.skip_analyze)
+
+    def emit(self, stage, message):
+        self.events.append({"ts": _now(), "stage": stage, "message": message})
+        log.info(f"[JOBS] {self.id} | {stage}: {message}")
+
+    def to_dict(self, with_events=False):
+        data = {
+            "id": self.id,
+            "sources": self.sources,
+            "skip_scrape": self.skip_scrape,
+            "skip_analyze": self.skip_analyze,
+            "requested_by": self.requested_by,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "results": self.results,
+        }
+        if with_events:
+            data["events"] = list(self.events)
+        return data
+
+
+# ==================== EXECUTOR ====================
+class JobRunner:
+    """Fila com uma única vaga de execução, compartilhada por todas as sessões"""
+
+    def __init__(self, log_path=JOBS_LOG_PATH, sources_file=SOURCES_FILE):
+        self.log_path = log_path
+        self.sources_file = sources_file
+        self._queue = deque()
+        self._jobs = {}
+        self._current = None
+        self._condition = threading.Condition()
+        self._worker = None
+        self._recover_log()
+
+    # ---------- LOG PERSISTENTE ----------
+    def _append_log(self, job):
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with open(self.log_path, "ab") as f:
+            f.write(dumps_json(job.to_dict()) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_log(self, limit=20):
+        """Último estado conhecido dos jobs mais recentes (mais novo primeiro)"""
+        latest = {}
+        try:
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = loads_json(line)
+                    except ValueError:
+                        continue
+                    latest[entry["id"]] = entry
+        except FileNotFoundError:
+            return []
+        return list(latest.values())[::-1][:limit]
+
+    def _recover_log(self):
+        """Jobs que ficaram pendentes quando o processo anterior caiu viram 'interrupted'"""
+        for entry in self.read_log(limit=None):
+            if entry.get("status") in PENDING_STATES:
+                job = Job(entry.get("sources"), entry.get("skip_scrape"), entry.get("skip_analyze"))
+                job.id = entry["id"]
+                job.created_at = entry.get("created_at")
+                job.started_at = entry.get("started_at")
+                job.status = "interrupted"
+                job.finished_at = _now()
+                self._append_log(job)
+
+    # ---------- FILA ----------
+    def submit(self, sources=None, skip_scrape=False, skip_analyze=False, requested_by="dashboard"):
+        """
+        Enfileira um job. Se já houver um idêntico aguardando na fila, devolve esse job.
+        Retorna (job, novo).
+        """
+        candidate = Job(sources, skip_scrape, skip_analyze, requested_by)
+        with self._condition:
+            for queued in self._queue:
+                if queued.key == candidate.key:
+                    queued.emit("queued", f"Pedido repetido de '{requested_by}' reaproveitado")
+                    return queued, False
+
+            self._queue.append(candidate)
+            self._jobs[candidate.id] = candidate
+            candidate.emit("queued", f"Job na fila (posição {len(self._queue)})")
+            self._append_log(candidate)
+            self._ensure_worker()
+            self._condition.notify()
+        return candidate, True
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work_loop, name="clipagem-jobs", daemon=True)
+            self._worker.start()
+
+    def _work_loop(self):
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                job = self._queue.popleft()
+                self._current = job
+            try:
+                self._run(job)
+            finally:
+                with self._condition:
+                    self._current = None
+
+    # ---------- EXECUÇÃO ----------
+    def _run(self, job):
+        job.status = "running"
+        job.started_at = _now()
+        self._append_log(job)
+
+        try:
+            sources = load_sources(self.sources_file)
+            if job.sources:
+                sources = [source for source in sources if source.name in set(job.sources)]
+            if not sources:
+                raise ValueError("Nenhuma fonte habilitada para processar")
+
+            for source in sources:
+                job.results.append(self._run_source(job, source))
+            job.status = "ok" if all(r["status"] == "ok" for r in job.results) else "error"
+        except Exception as e:
+            job.status = "error"
+            job.emit("error", f"{type(e).__name__}: {e}")
+
+        job.finished_at = _now()
+        job.emit(job.status, "Job finalizado")
+        self._append_log(job)
+
+    def _run_source(self, job, source):
+        """Executa as etapas de uma fonte emitindo um evento por etapa"""
+        import multi_runner  # selenium/gemini carregados só quando um job roda de fato
+
+        start = time.perf_counter()
+        summary = {"source": source.name, "status": "ok", "timings": {}, "error": None}
+
+        stages = []
+        if not job.skip_scrape:
+            # Sob demanda: baixa de novo mesmo com o download de hoje em dia no checkpoint
+            stages.append(("scrape", "Baixando edição", {"skip_analyze": True, "refetch": True}))
+        if not job.skip_analyze:
+            stages.append(("analyze", "Analisando com Gemini", {"skip_scrape": True}))
+
+        for stage, label, flags in stages:
+            job.emit(stage, f"{label} ({source.label})")
+            result = multi_runner.run_source(source, **flags)
+            summary["timings"][stage] = result["timings"].get(stage)
+            if result["status"] != "ok":
+                summary["status"] = "error"
+                summary["error"] = result["error"]
+                job.emit("error", f"{source.label}: {result['error']['message']}")
+                break
+            job.emit(stage, f"{label} concluído em {summary['timings'][stage]}s")
+
+        summary["timings"]["total"] = round(time.perf_counter() - start, 3)
+        return summary
+
+    # ---------- CONSULTA ----------
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def current(self):
+        return self._current
+
+    def pending(self):
+        """Job em execução seguido dos que aguardam na fila"""
+        with self._condition:
+            return ([self._current] if self._current else []) + list(self._queue)
+
+    def queue_position(self, job):
+        with self._condition:
+            if job is self._current:
+                return 0
+            for position, queued in enumerate(self._queue, start=1):
+                if queued is job:
+                    return position
+        return None
+
+
+# ==================== INSTÂNCIA COMPARTILHADA ====================
+_RUNNER = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_runner():
+    """Um executor por processo: a vaga única vale para todas as sessões do dashboard"""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = JobRunner()
+        return _RUNNER
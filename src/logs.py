@@ -0,0 +1,193 @@
+"""
+Logs Estruturados - Uma linha JSON por evento, com run id, etapa e duração
+Todos os módulos registram por get_logger(); os registros passam por uma fila e são
+gravados em uma thread própria, sem bloquear o laço que os emitiu. Níveis por módulo
+(CLIPAGEM_LOG_LEVELS) desligam o detalhamento por página em produção
+"""
+
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from io_utils import dumps_json
+
+
+# ==================== CONFIGURAÇÕES ====================
+ROOT_LOGGER = "clipagem"
+RUN_ID = os.getenv("CLIPAGEM_RUN_ID") or f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+# "json" (uma linha por evento, para os painéis de tempo) ou "text" (como no terminal)
+LOG_FORMAT = os.getenv("CLIPAGEM_LOG_FORMAT", "json").lower()
+LOG_LEVEL = os.getenv("CLIPAGEM_LOG_LEVEL", "INFO").upper()
+# Níveis por módulo: "analyzer.pages=DEBUG,daily_scraper=WARNING"
+LOG_LEVELS = os.getenv("CLIPAGEM_LOG_LEVELS", "")
+# Opcional: também grava as linhas em arquivo
+LOG_FILE = os.getenv("CLIPAGEM_LOG_FILE", "")
+
+TAG_RE = re.compile(r"\[([^\]\s]+)\] ?")
+
+_STAGE = contextvars.ContextVar("clipagem_stage", default=None)
+_LOCK = threading.Lock()
+_listener = None
+_configured = False
+
+
+# ==================== FORMATO ====================
+class JsonFormatter(logging.Formatter):
+    """ts, nível, módulo, run id, etapa, tag ([PDF], [GEMINI]...), mensagem e campos extras"""
+
+    def format(self, record):
+        message = record.getMessage()
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name.removeprefix(ROOT_LOGGER + "."),
+            "run_id": RUN_ID,
+        }
+        stage = getattr(record, "stage", None)
+        if stage:
+            entry["stage"] = stage
+        match = TAG_RE.match(message)
+        if match:
+            entry["tag"] = match.group(1)
+            message = message[match.end():]
+        entry["msg"] = message
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return dumps_json(entry).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    """Mensagem como era impressa antes ("[TAG] texto"), com o traceback quando houver"""
+
+    def format(self, record):
+        message = record.getMessage()
+        return f"{message}\n{record.exc_text}" if record.exc_text else message
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Escreve no sys.stdout atual (respeita redirecionamentos feitos depois da configuração)"""
+
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Na thread de origem só resolve a mensagem e captura a etapa atual; o JSON é
+    montado e gravado pela thread da fila
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        record.stage = _STAGE.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# ==================== CONFIGURAÇÃO ====================
+def parse_levels(spec):
+    """ "analyzer.pages=DEBUG,daily_scraper=WARNING" -> {"analyzer.pages": "DEBUG", ...} """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup(log_format=None, level=None, levels=None, log_file=None):
+    """Configura o logger raiz da clipagem uma única vez (chamado pelo primeiro get_logger)"""
+    global _listener, _configured
+    with _LOCK:
+        if _configured:
+            return False
+
+        formatter = JsonFormatter() if (log_format or LOG_FORMAT) == "json" else TextFormatter()
+        handlers = [_StdoutHandler()]
+        if log_file or LOG_FILE:
+            path = log_file or LOG_FILE
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handlers.append(logging.FileHandler(path, encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level or LOG_LEVEL)
+        root.propagate = False
+        root.addHandler(_QueueHandler(log_queue))
+        for name, module_level in (levels if levels is not None else parse_levels(LOG_LEVELS)).items():
+            logging.getLogger(f"{ROOT_LOGGER}.{name}").setLevel(module_level)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+        _configured = True
+        return True
+
+
+def shutdown():
+    """Esvazia a fila e para a thread de gravação (registrado no atexit)"""
+    global _listener
+    with _LOCK:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name):
+    """Logger do módulo (ex.: "analyzer", "analyzer.pages"), sob o logger raiz da clipagem"""
+    setup()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+# ==================== ETAPAS ====================
+def current_stage():
+    return _STAGE.get()
+
+
+@contextmanager
+def stage(name, logger=None, report=True):
+    """
+    Marca os registros emitidos dentro do bloco com a etapa e, ao final, registra a
+    duração (report=False quando o chamador já registra a sua). As tarefas do overlap
+    herdam a etapa de quem as submeteu.
+    """
+    token = _STAGE.set(name)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        if report:
+            seconds = round(time.perf_counter() - start, 3)
+            (logger or get_logger("stage")).info(
+                "[STAGE] %s: %s em %.3fs", name, status, seconds,
+                extra={"fields": {"event": "stage_end", "status": status, "duration_seconds": seconds}},
+            )
+        _STAGE.reset(token)
@@ -0,0 +1,138 @@
+"""
+Perfil de Memória - Pico do tracemalloc e RSS por etapa, com orçamento configurável
+Opcional (CLIPAGEM_MEMORY_PROFILE=true): as etapas do scraper, do analisador e do
+pipeline registram o pico de alocações Python e o RSS nas métricas da execução.
+Com orçamento (CLIPAGEM_MEMORY_BUDGET_MB), as etapas pesadas trocam para os caminhos
+em streaming / por blocos quando a memória prevista passaria do limite
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import logs
+import metrics
+
+try:
+    import resource  # indisponível no Windows
+except ImportError:
+    resource = None
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("memory_profile")
+PROFILE_ENABLED = os.getenv("CLIPAGEM_MEMORY_PROFILE", "false").lower() == "true"
+MEMORY_BUDGET_MB = float(os.getenv("CLIPAGEM_MEMORY_BUDGET_MB", "0"))  # 0 = sem limite
+# Acima desta fração do orçamento, as próximas etapas já usam os caminhos econômicos
+BUDGET_SOFT_RATIO = 0.8
+TRACEMALLOC_FRAMES = 1
+
+_LOCK = threading.Lock()
+_STACKS = threading.local()
+
+
+# ==================== LEITURAS ====================
+def peak_rss_mb():
+    """Pico de RSS do processo desde o início (MB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa em bytes; Linux em KB
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def rss_mb():
+    """RSS atual (MB): /proc no Linux; nos demais sistemas, o pico do processo"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return peak_rss_mb() or 0.0
+
+
+# ==================== ORÇAMENTO ====================
+def over_budget(expected_bytes=0, label="", budget_mb=None):
+    """
+    True quando o RSS atual já passou de 80% do orçamento ou quando RSS + memória
+    prevista para a etapa passaria dele. Sem orçamento configurado, sempre False.
+    """
+    budget = MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    if not budget:
+        return False
+    current = rss_mb()
+    expected_mb = expected_bytes / 2**20
+    if current > budget * BUDGET_SOFT_RATIO or current + expected_mb > budget:
+        log.warning(
+            f"[MEMORY] {label or 'etapa'}: RSS {current:.0f} MB + ~{expected_mb:.0f} MB previstos "
+            f"> orçamento de {budget:.0f} MB, usando caminho econômico",
+            extra={"fields": {"event": "memory_fallback", "rss_mb": round(current, 1),
+                              "expected_mb": round(expected_mb, 1), "budget_mb": budget}},
+        )
+        return True
+    return False
+
+
+# ==================== PERFIL POR ETAPA ====================
+def _stack():
+    if not hasattr(_STACKS, "frames"):
+        _STACKS.frames = []
+    return _STACKS.frames
+
+
+@contextmanager
+def stage(name):
+    """
+    Mede uma etapa (no-op sem CLIPAGEM_MEMORY_PROFILE). O dict entregue recebe os valores
+    ao final. Etapas aninhadas repassam o pico ao nível de cima; com várias fontes em
+    paralelo, o pico do tracemalloc é do processo inteiro.
+    """
+    record = {}
+    if not PROFILE_ENABLED:
+        yield record
+        return
+
+    with _LOCK:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        elif _stack():
+            # O pico que a etapa de fora já atingiu não pode se perder no reset
+            _stack()[-1]["carried_peak"] = max(_stack()[-1]["carried_peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    frame = {"carried_peak": 0}
+    _stack().append(frame)
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield record
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        with _LOCK:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["carried_peak"])
+            tracemalloc.reset_peak()
+        _stack().pop()
+        if _stack():
+            _stack()[-1]["carried_peak"] = max(_stack()[-1]["carried_peak"], peak)
+
+        rss_after = rss_mb()
+        peak_rss = peak_rss_mb()
+        record.update(
+            stage=name,
+            status=status,
+            seconds=round(time.perf_counter() - start, 3),
+            tracemalloc_peak_mb=round(peak / 2**20, 2),
+            tracemalloc_current_mb=round(current / 2**20, 2),
+            rss_before_mb=round(rss_before, 1),
+            rss_after_mb=round(rss_after, 1),
+            rss_peak_mb=round(peak_rss, 1) if peak_rss is not None else None,
+            budget_mb=MEMORY_BUDGET_MB or None,
+            over_budget=bool(MEMORY_BUDGET_MB) and rss_after > MEMORY_BUDGET_MB,
+        )
+        metrics.record_stage_memory(record)
@@ -0,0 +1,192 @@
+"""
+Métricas de Execução - Tokens, latência e custo das chamadas ao modelo
+Cada execução grava um arquivo NDJSON próprio e atualiza um consolidado diário/mensal
+usado para controlar o orçamento de uso da API
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from io_utils import dumps_json, write_atomic
+import logs
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("metrics")
+METRICS_FOLDER = os.path.join(os.path.dirname(__file__), "..", "data", "metrics")
+ROLLUP_PATH = os.path.join(METRICS_FOLDER, "rollup.json")
+RUN_ID = logs.RUN_ID  # o mesmo id nas métricas e nos logs
+
+# Preço por milhão de tokens (USD) - padrão do Gemini 2.0 Flash
+PRICE_INPUT_PER_MTOK = float(os.getenv("GEMINI_PRICE_INPUT_PER_MTOK", "0.10"))
+PRICE_OUTPUT_PER_MTOK = float(os.getenv("GEMINI_PRICE_OUTPUT_PER_MTOK", "0.40"))
+
+# Orçamento em tokens (0 = sem limite) e ação ao estourar: "warn" ou "fail"
+DAILY_TOKEN_BUDGET = int(os.getenv("GEMINI_DAILY_TOKEN_BUDGET", "0"))
+MONTHLY_TOKEN_BUDGET = int(os.getenv("GEMINI_MONTHLY_TOKEN_BUDGET", "0"))
+BUDGET_MODE = os.getenv("GEMINI_BUDGET_MODE", "warn").lower()
+BUDGET_WARN_RATIO = 0.8
+
+# Janela mantida no consolidado
+ROLLUP_KEEP_DAYS = 90
+ROLLUP_KEEP_MONTHS = 24
+
+_LOCK = threading.Lock()
+
+
+class BudgetExceededError(RuntimeError):
+    """Chamada ao modelo bloqueada por estourar o orçamento configurado"""
+
+
+# ==================== CUSTO E ESTIMATIVAS ====================
+def estimate_tokens(text):
+    """Estimativa barata de tokens (~4 caracteres por token)"""
+    return max(1, len(text) // 4)
+
+
+def estimate_cost(prompt_tokens, output_tokens):
+    """Custo estimado em USD a partir da tabela de preços configurada"""
+    return (
+        prompt_tokens * PRICE_INPUT_PER_MTOK + output_tokens * PRICE_OUTPUT_PER_MTOK
+    ) / 1_000_000
+
+
+# ==================== CONSOLIDADO ====================
+def load_rollup(path=ROLLUP_PATH):
+    """Lê o consolidado diário/mensal (vazio se não existir)"""
+    if not os.path.exists(path):
+        return {"daily": {}, "monthly": {}}
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            rollup = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {"daily": {}, "monthly": {}}
+    rollup.setdefault("daily", {})
+    rollup.setdefault("monthly", {})
+    return rollup
+
+
+def _add_to_bucket(bucket, record):
+    bucket["calls"] = bucket.get("calls", 0) + 1
+    bucket["errors"] = bucket.get("errors", 0) + (0 if record["status"] == "ok" else 1)
+    bucket["retries"] = bucket.get("retries", 0) + record["retries"]
+    bucket["prompt_tokens"] = bucket.get("prompt_tokens", 0) + record["prompt_tokens"]
+    bucket["output_tokens"] = bucket.get("output_tokens", 0) + record["output_tokens"]
+    bucket["cost_usd"] = round(bucket.get("cost_usd", 0.0) + record["cost_usd"], 6)
+    bucket["latency_seconds"] = round(bucket.get("latency_seconds", 0.0) + record["latency_seconds"], 3)
+
+
+def _update_rollup(record, path=ROLLUP_PATH):
+    rollup = load_rollup(path)
+    day, month = record["timestamp"][:10], record["timestamp"][:7]
+    _add_to_bucket(rollup["daily"].setdefault(day, {}), record)
+    _add_to_bucket(rollup["monthly"].setdefault(month, {}), record)
+
+    # Mantém apenas a janela recente
+    for key, keep in (("daily", ROLLUP_KEEP_DAYS), ("monthly", ROLLUP_KEEP_MONTHS)):
+        for old in sorted(rollup[key])[:-keep]:
+            del rollup[key][old]
+
+    rollup["updated_at"] = record["timestamp"]
+    write_atomic(path, dumps_json(rollup, pretty=True))
+
+
+# ==================== ORÇAMENTO ====================
+def check_budget(estimated_tokens):
+    """Verifica o orçamento antes da chamada; avisa ou falha conforme GEMINI_BUDGET_MODE"""
+    if not DAILY_TOKEN_BUDGET and not MONTHLY_TOKEN_BUDGET:
+        return
+
+    now = datetime.now()
+    rollup = load_rollup()
+    checks = (
+        ("diário", DAILY_TOKEN_BUDGET, rollup["daily"].get(now.strftime("%Y-%m-%d"), {})),
+        ("mensal", MONTHLY_TOKEN_BUDGET, rollup["monthly"].get(now.strftime("%Y-%m"), {})),
+    )
+
+    for label, budget, bucket in checks:
+        if not budget:
+            continue
+        used = bucket.get("prompt_tokens", 0) + bucket.get("output_tokens", 0)
+        projected = used + estimated_tokens
+
+        if projected > budget:
+            message = (
+                f"Orçamento {label} de tokens excedido: {used} usados + ~{estimated_tokens} "
+                f"estimados > {budget}"
+            )
+            if BUDGET_MODE == "fail":
+                log.error(f"[METRICS] ERRO: {message}")
+                raise BudgetExceededError(message)
+            log.warning(f"[METRICS] AVISO: {message}")
+        elif projected > budget * BUDGET_WARN_RATIO:
+            log.warning(f"[METRICS] AVISO: orçamento {label} em {projected * 100 // budget}% ({projected}/{budget} tokens)")
+
+
+# ==================== REGISTRO ====================
+def _log_fields(record):
+    """Campos do registro repetidos na linha de log (para os painéis de tempo)"""
+    fields = {key: value for key, value in record.items() if key not in ("timestamp", "run_id", "kind")}
+    return {"fields": {"event": record["kind"], **fields}}
+
+
+def _append_run_record(record):
+    os.makedirs(METRICS_FOLDER, exist_ok=True)
+    with open(os.path.join(METRICS_FOLDER, f"run_{RUN_ID}.jsonl"), "ab") as handle:
+        handle.write(dumps_json(record) + b"\n")
+
+
+def record_model_call(model, prompt_tokens, output_tokens, latency_seconds, ttft_seconds=None,
+                      retries=0, status="ok", tokens_estimated=False, error=None, **extra):
+    """Registra uma chamada ao modelo no arquivo da execução e no consolidado"""
+    record = {
+        "kind": "model_call",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "run_id": RUN_ID,
+        "model": model,
+        "status": status,
+        "prompt_tokens": int(prompt_tokens or 0),
+        "output_tokens": int(output_tokens or 0),
+        "tokens_estimated": tokens_estimated,
+        "ttft_seconds": round(ttft_seconds, 3) if ttft_seconds is not None else None,
+        "latency_seconds": round(latency_seconds, 3),
+        "retries": retries,
+        "cost_usd": round(estimate_cost(prompt_tokens or 0, output_tokens or 0), 6),
+        "error": error,
+        **extra,
+    }
+
+    with _LOCK:
+        _append_run_record(record)
+        _update_rollup(record)
+
+    log.info(
+        f"[METRICS] {model}: {record['prompt_tokens']} tokens entrada / {record['output_tokens']} saída | "
+        f"TTFT {record['ttft_seconds']}s | total {record['latency_seconds']}s | "
+        f"retries {retries} | ~US$ {record['cost_usd']:.4f}",
+        extra=_log_fields(record),
+    )
+    return record
+
+
+def record_stage_memory(stage_record):
+    """Registra o perfil de memória de uma etapa no arquivo da execução (fora do consolidado)"""
+    record = {
+        "kind": "stage_memory",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "run_id": RUN_ID,
+        **stage_record,
+    }
+    with _LOCK:
+        _append_run_record(record)
+
+    flag = " ✗ ACIMA DO ORÇAMENTO" if record.get("over_budget") else ""
+    log.info(
+        f"[MEMORY] {record['stage']}: pico Python {record['tracemalloc_peak_mb']} MB | "
+        f"RSS {record['rss_before_mb']} → {record['rss_after_mb']} MB "
+        f"(pico do processo {record['rss_peak_mb']} MB){flag}",
+        extra=_log_fields(record),
+    )
+    return record
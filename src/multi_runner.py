@@ -0,0 +1,157 @@
+"""
+Executor Multi-Fonte - Processa vários jornais/diários em paralelo
+Cada fonte do registro (sources.json) roda scraper + analisador isoladamente,
+com paralelismo limitado e manifesto de execução com tempos e status por fonte
+"""
+
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import config  # .env carregado uma única vez, antes dos módulos que leem o ambiente
+import pipeline
+from io_utils import dumps_json, write_atomic
+import logs
+from sources import DATA_FOLDER, SOURCES_FILE, load_sources
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("multi_runner")
+RUNS_FOLDER = os.path.join(DATA_FOLDER, "runs")
+MAX_WORKERS = int(os.getenv("CLIPAGEM_MAX_WORKERS", "2"))
+
+
+# ==================== EXECUÇÃO DE UMA FONTE ====================
+def run_source(source, skip_scrape=False, skip_analyze=False, refetch=False):
+    """
+    Executa o pipeline (scraper + analisador) de uma fonte, sem propagar exceções.
+    refetch baixa a edição de novo mesmo com o download do dia em dia (verificações sob
+    demanda); análise e publicação só rodam de novo se o PDF mudou.
+    """
+    result = {
+        "source": source.name,
+        "label": source.label,
+        "status": "ok",
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "timings": {},
+        "outputs": {},
+        "error": None,
+    }
+
+    stages = tuple(
+        stage
+        for stage in pipeline.STAGES
+        if not (skip_scrape and stage in pipeline.SCRAPE_STAGES)
+        and not (skip_analyze and stage in pipeline.ANALYZE_STAGES)
+    )
+    try:
+        # Etapas com checkpoint: uma nova tentativa retoma da primeira etapa pendente
+        manifest = pipeline.run_pipeline(source, stages, refetch=refetch)
+        if not skip_scrape:
+            result["outputs"]["pdf"] = source.pdf_path
+            result["timings"]["scrape"] = pipeline.stage_seconds(manifest, pipeline.SCRAPE_STAGES)
+        if not skip_analyze:
+            result["outputs"]["json"] = source.output_path
+            result["timings"]["analyze"] = pipeline.stage_seconds(manifest, pipeline.ANALYZE_STAGES)
+        result["skipped_stages"] = manifest["last_attempt"]["skipped"]
+
+    except Exception as e:
+        # Falha isolada: as demais fontes continuam
+        manifest = pipeline.load_manifest(pipeline.build_context(source)["manifest_path"]) or {}
+        ran = manifest.get("last_attempt", {}).get("ran", [])
+        stage = ran[-1] if ran else None
+        result["status"] = "error"
+        result["error"] = {
+            "stage": stage,
+            "type": type(e).__name__,
+            "message": str(e),
+            "traceback": traceback.format_exc(limit=5),
+        }
+        log.error(f"[RUNNER] ✗ Fonte '{source.name}' falhou na etapa {stage}: {e}")
+
+    result["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    result["timings"]["total"] = round(sum(result["timings"].values()), 3)
+    return result
+
+
+# ==================== EXECUÇÃO DE TODAS AS FONTES ====================
+def run_all(sources, max_workers=MAX_WORKERS, skip_scrape=False, skip_analyze=False, refetch=False):
+    """Processa as fontes em paralelo (limitado) e grava o manifesto da execução"""
+    run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+    workers = max(1, min(max_workers, len(sources)))
+    log.info(f"[RUNNER] Execução {run_id}: {len(sources)} fonte(s), {workers} em paralelo")
+
+    run_start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fonte") as executor:
+        futures = {
+            executor.submit(run_source, source, skip_scrape, skip_analyze, refetch): source
+            for source in sources
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            log.info(
+                f"[RUNNER] Fonte '{result['source']}' finalizada: "
+                f"{result['status']} em {result['timings']['total']}s"
+            )
+
+    results.sort(key=lambda item: item["source"])
+    manifest = {
+        "run_id": run_id,
+        "started_at": min((r["started_at"] for r in results), default=None),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+        "wall_clock_seconds": round(time.perf_counter() - run_start, 3),
+        "max_workers": workers,
+        "summary": {
+            "total": len(results),
+            "ok": sum(1 for r in results if r["status"] == "ok"),
+            "error": sum(1 for r in results if r["status"] == "error"),
+        },
+        "sources": results,
+    }
+
+    manifest_path = os.path.join(RUNS_FOLDER, f"{run_id}.json")
+    write_atomic(manifest_path, dumps_json(manifest, pretty=True))
+    log.info(f"[RUNNER] Manifesto salvo em: {manifest_path}")
+    return manifest
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def main(argv=None):
+    """Função principal do executor multi-fonte"""
+    parser = argparse.ArgumentParser(description="Executa a clipagem para várias fontes em paralelo")
+    parser.add_argument("--sources-file", default=SOURCES_FILE, help="Registro de fontes (JSON)")
+    parser.add_argument("--only", default="", help="Nomes das fontes separados por vírgula")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS, help="Fontes em paralelo")
+    parser.add_argument("--skip-scrape", action="store_true", help="Reaproveita PDFs já baixados")
+    parser.add_argument("--skip-analyze", action="store_true", help="Apenas baixa os PDFs")
+    parser.add_argument("--refetch", action="store_true", help="Baixa as edições de novo mesmo com o download do dia em dia")
+    args = parser.parse_args(argv)
+
+    sources = load_sources(args.sources_file)
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",") if name.strip()}
+        sources = [source for source in sources if source.name in wanted]
+
+    if not sources:
+        log.info("[RUNNER] Nenhuma fonte habilitada para processar")
+        return 1
+
+    log.info("INICIANDO EXECUTOR MULTI-FONTE")
+
+    manifest = run_all(sources, args.max_workers, args.skip_scrape, args.skip_analyze, args.refetch)
+    summary = manifest["summary"]
+
+    log.info(f"Fontes OK: {summary['ok']}/{summary['total']} | Erros: {summary['error']}")
+
+    # Só falha o job se nenhuma fonte foi processada com sucesso
+    return 0 if summary["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Helpers de Notícias - Normalização dos campos retornados pelo Gemini
+O modelo alterna entre chaves com e sem acento ("relevância"/"relevancia")
+"""
+
+import unicodedata
+
+
+RELEVANCIA_KEYS = ("relevância", "relevancia")
+RELEVANCIA_ORDER = ("alta", "media", "baixa", "outra")
+
+
+def strip_accents(text):
+    """Remove acentos para comparações simples"""
+    normalized = unicodedata.normalize("NFKD", str(text))
+    return "".join(char for char in normalized if not unicodedata.combining(char))
+
+
+def get_relevancia(noticia, default=""):
+    """Valor bruto da relevância, aceitando as duas grafias da chave"""
+    for key in RELEVANCIA_KEYS:
+        value = noticia.get(key)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def relevancia_key(value):
+    """Normaliza a relevância para 'alta', 'media', 'baixa' ou 'outra'"""
+    text = strip_accents(value).lower().strip()
+    for key in ("alta", "media", "baixa"):
+        if key in text:
+            return key
+    return "outra"
+
+
+def is_licitacao(noticia):
+    """Notícia menciona licitação no título ou no resumo"""
+    texto = f"{noticia.get('titulo', '')} {noticia.get('resumo_120_chars', '')}".lower()
+    return "licit" in texto
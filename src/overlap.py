@@ -0,0 +1,145 @@
+"""
+Sobreposição de Etapas - Trabalho independente em segundo plano + caminho crítico
+Diagnóstico, imports pesados, configuração do modelo, upload e fechamento do navegador
+rodam em threads enquanto o fluxo principal segue; cada intervalo é registrado para
+mostrar o que ficou no caminho crítico e quanto tempo a sobreposição economizou
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
+
+import logs
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("overlap")
+MAX_BACKGROUND_WORKERS = 3
+MAIN_LANE = "principal"
+
+
+class Overlap:
+    """Executor de tarefas em segundo plano com linha do tempo dos intervalos"""
+
+    def __init__(self, max_workers=MAX_BACKGROUND_WORKERS):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._futures = []
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sobreposicao")
+
+    def _record(self, name, lane, start, end, **extra):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "lane": lane,
+                "start": round(start - self.origin, 3),
+                "seconds": round(end - start, 3),
+                **extra,
+            })
+
+    @contextmanager
+    def span(self, name):
+        """Intervalo no fluxo principal (sempre faz parte do caminho crítico; pode ser aninhado)"""
+        start = time.perf_counter()
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self._record(name, MAIN_LANE, start, time.perf_counter(), depth=depth)
+
+    def submit(self, name, fn, *args, **kwargs):
+        """Executa fn em segundo plano; o intervalo é registrado quando termina"""
+
+        def timed():
+            start = time.perf_counter()
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                extra = {"error": error} if error else {}
+                self._record(name, "segundo plano", start, time.perf_counter(), **extra)
+
+        # A tarefa herda o contexto de quem a submeteu (ex.: etapa atual dos logs)
+        future = self._executor.submit(contextvars.copy_context().run, timed)
+        future.name = name
+        self._futures.append(future)
+        return future
+
+    def wait(self, future):
+        """Bloqueia até a tarefa terminar; a espera entra no caminho crítico (sem propagar erro)"""
+        if future.done():
+            return future
+        start = time.perf_counter()
+        wait_futures([future])
+        self._record(
+            f"aguardando {future.name}", MAIN_LANE, start, time.perf_counter(),
+            depth=self._depth, waited_on=future.name,
+        )
+        return future
+
+    def close(self):
+        """
+        Aguarda as tarefas restantes. Erros não são propagados aqui: quem depende do
+        resultado (ex.: upload antes da publicação) chama future.result() no ponto certo.
+        """
+        for future in self._futures:
+            self.wait(future)
+        self._executor.shutdown(wait=True)
+
+    # ==================== RELATÓRIO ====================
+    def summary(self):
+        """Tempo total, soma serial equivalente e intervalos (serializável no manifesto)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: (span["start"], span.get("depth", 0)))
+        wall = round(time.perf_counter() - self.origin, 3)
+        # Em série = intervalos de nível superior do fluxo principal + todo o segundo plano
+        work = [span for span in spans if span["lane"] != MAIN_LANE or span["depth"] == 0]
+        work = [span for span in work if "waited_on" not in span]
+        return {
+            "wall_seconds": wall,
+            "serial_seconds": round(sum(span["seconds"] for span in work), 3),
+            "critical_path": [span for span in spans if span["lane"] == MAIN_LANE],
+            "background": [span for span in spans if span["lane"] != MAIN_LANE],
+        }
+
+    def report(self):
+        summary = self.summary()
+        waited = {}
+        for span in summary["critical_path"]:
+            if "waited_on" in span:
+                waited[span["waited_on"]] = waited.get(span["waited_on"], 0.0) + span["seconds"]
+
+        lines = [f"[OVERLAP] Caminho crítico ({summary['wall_seconds']}s no total):"]
+        for span in summary["critical_path"]:
+            name = "  " * span["depth"] + span["name"]
+            lines.append(f"  +{span['start']:>7.1f}s  {name:<28} {span['seconds']:>7.1f}s")
+        if summary["background"]:
+            lines.append("Em segundo plano:")
+        for span in summary["background"]:
+            blocked = waited.get(span["name"], 0.0)
+            status = f"  ✗ {span['error']}" if span.get("error") else ""
+            lines.append(
+                f"  +{span['start']:>7.1f}s  {span['name']:<28} {span['seconds']:>7.1f}s"
+                f"  (escondido: {max(span['seconds'] - blocked, 0.0):.1f}s){status}"
+            )
+        saved = summary["serial_seconds"] - summary["wall_seconds"]
+        lines.append(
+            f"Em série: {summary['serial_seconds']:.1f}s → sobreposto: "
+            f"{summary['wall_seconds']:.1f}s (economia de {max(saved, 0.0):.1f}s)"
+        )
+        log.info("\n".join(lines), extra={"fields": {
+            "event": "overlap_report",
+            "wall_seconds": summary["wall_seconds"],
+            "serial_seconds": summary["serial_seconds"],
+            "saved_seconds": round(max(saved, 0.0), 3),
+        }})
+        return summary
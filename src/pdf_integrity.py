@@ -0,0 +1,141 @@
+"""
+Integridade de PDF - Mapeamento em memória e pré-checagem estrutural da edição
+O PDF é mapeado com mmap e conferido antes da extração (cabeçalho, %%EOF, startxref
+apontando para a tabela xref ou o stream /XRef, contagem de páginas da árvore /Pages);
+o documento é aberto pelo PyMuPDF direto do buffer mapeado, sem copiar os bytes.
+Um download truncado é recusado em milissegundos, antes de custar uma chamada ao modelo
+"""
+
+import mmap
+import os
+import re
+from contextlib import contextmanager
+
+import logs
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("pdf_integrity")
+# O cabeçalho pode vir depois de alguns bytes de lixo; o %%EOF fica no final do arquivo
+HEADER_WINDOW = 1024
+TRAILER_WINDOW = 2048
+XREF_WINDOW = 1024
+
+HEADER_RE = re.compile(rb"%PDF-(\d\.\d)")
+STARTXREF_RE = re.compile(rb"startxref\s+(\d+)\s+%%EOF")
+XREF_STREAM_RE = re.compile(rb"\d+\s+\d+\s+obj\b.{0,%d}?/Type\s*/XRef\b" % XREF_WINDOW, re.DOTALL)
+ROOT_RE = re.compile(rb"/Root\s+(\d+)\s+(\d+)\s+R")
+PAGES_REF_RE = re.compile(rb"/Pages\s+(\d+)\s+(\d+)\s+R")
+COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+
+
+class CorruptPdfError(ValueError):
+    """PDF incompleto ou danificado (download interrompido, arquivo que não é PDF)"""
+
+
+# ==================== PRÉ-CHECAGEM ====================
+def _last_object(buffer, number, generation):
+    """Corpo da última definição de "N G obj" (revisões incrementais vêm depois no arquivo)"""
+    match = None
+    for match in re.finditer(rb"(?<!\d)%d\s+%d\s+obj\b" % (number, generation), buffer):
+        pass
+    if match is None:
+        return None
+    end = buffer.find(b"endobj", match.end())
+    return buffer[match.end():end] if end != -1 else None
+
+
+def expected_page_count(buffer, trailer):
+    """
+    Páginas declaradas na árvore /Pages da última revisão (trailer -> /Root -> /Pages);
+    None quando o catálogo ou a árvore estão em object streams comprimidos (PDF 1.5+)
+    e não podem ser lidos sem descompactar
+    """
+    root = ROOT_RE.search(trailer)
+    catalog = _last_object(buffer, int(root.group(1)), int(root.group(2))) if root else None
+    pages_ref = PAGES_REF_RE.search(catalog) if catalog else None
+    pages = _last_object(buffer, int(pages_ref.group(1)), int(pages_ref.group(2))) if pages_ref else None
+    count = COUNT_RE.search(pages) if pages else None
+    return int(count.group(1)) if count else None
+
+
+def check_structure(buffer, name="PDF"):
+    """Confere cabeçalho, %%EOF e xref/trailer no buffer; retorna versão, tamanho e páginas esperadas"""
+    size = len(buffer)
+    header = HEADER_RE.search(buffer[:HEADER_WINDOW])
+    if not header:
+        raise CorruptPdfError(f"{name}: cabeçalho %PDF ausente (não é um PDF)")
+
+    tail = buffer[max(size - TRAILER_WINDOW, 0):]
+    if b"%%EOF" not in tail:
+        raise CorruptPdfError(f"{name}: marcador %%EOF ausente no final (download incompleto?)")
+    startxref = None
+    for startxref in STARTXREF_RE.finditer(tail):
+        pass
+    if startxref is None:
+        raise CorruptPdfError(f"{name}: startxref ausente antes do %%EOF")
+
+    offset = int(startxref.group(1))
+    xref = buffer[offset:offset + XREF_WINDOW].lstrip() if offset < size else b""
+    if xref.startswith(b"xref"):
+        # Tabela clássica: o dicionário do trailer vem logo depois das entradas
+        trailer_at = buffer.find(b"trailer", offset)
+        if trailer_at == -1:
+            raise CorruptPdfError(f"{name}: tabela xref sem trailer")
+        trailer = buffer[trailer_at:trailer_at + XREF_WINDOW]
+    elif XREF_STREAM_RE.match(xref):
+        # Stream /XRef: o próprio dicionário do objeto faz o papel do trailer
+        trailer = xref
+    else:
+        raise CorruptPdfError(f"{name}: startxref ({offset}) não aponta para uma tabela xref")
+
+    return {
+        "version": header.group(1).decode("ascii"),
+        "size_bytes": size,
+        "expected_pages": expected_page_count(buffer, trailer),
+    }
+
+
+# ==================== ABERTURA ====================
+@contextmanager
+def open_pdf(pdf_path):
+    """
+    Mapeia o PDF, faz a pré-checagem e entrega o documento PyMuPDF aberto do buffer
+    mapeado. Recusa documentos que o PyMuPDF precisou reparar ou com menos páginas que
+    as declaradas na árvore /Pages.
+    """
+    import fitz  # pymupdf (importado só quando há extração de fato)
+
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"Arquivo PDF não encontrado: {pdf_path}")
+    if os.path.getsize(pdf_path) == 0:
+        raise CorruptPdfError(f"{pdf_path}: arquivo vazio")
+
+    with open(pdf_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        doc = None
+        try:
+            info = check_structure(mapped, pdf_path)
+            try:
+                doc = fitz.open(stream=view, filetype="pdf")
+            except TypeError:
+                # PyMuPDF anterior ao 1.26 só aceita bytes no stream: nesse caso o mapeamento
+                # serve apenas à pré-checagem e o documento é aberto pelo caminho
+                doc = fitz.open(pdf_path, filetype="pdf")
+            if doc.is_repaired:
+                raise CorruptPdfError(f"{pdf_path}: xref inconsistente (PyMuPDF precisou reparar o arquivo)")
+            if info["expected_pages"] is not None and doc.page_count != info["expected_pages"]:
+                raise CorruptPdfError(
+                    f"{pdf_path}: {doc.page_count} página(s) legíveis, {info['expected_pages']} declaradas"
+                )
+            log.info(
+                f"[PDF] Estrutura OK: PDF {info['version']}, {info['size_bytes']} bytes, {doc.page_count} página(s)",
+                extra={"fields": {"event": "pdf_precheck", **info, "pages": doc.page_count}},
+            )
+            yield doc
+        finally:
+            # O mmap só pode fechar depois que o documento e a view soltarem o buffer
+            if doc is not None:
+                doc.close()
+                doc.stream = None
+            view.release()
@@ -0,0 +1,536 @@
+"""
+Orquestrador do Pipeline - Etapas com checkpoint e retomada
+download → extract → compact → analyze → validate → publish. Cada execução grava um
+manifesto com entradas, saídas, hashes e tempos por etapa; ao rodar de novo, as etapas
+concluídas com as mesmas entradas são puladas e a execução retoma da primeira pendente.
+No modo sobreposto (--overlap) tudo roda em um único processo e o trabalho independente
+(diagnóstico, imports pesados, configuração do Gemini, upload) sai do caminho crítico
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+import time
+import traceback
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+
+import config  # .env carregado uma única vez, antes dos módulos que leem o ambiente
+import artifact_store
+from io_utils import dumps_json, file_sha256, loads_json, open_atomic, write_atomic
+import logs
+import memory_profile
+from overlap import Overlap
+from sources import SOURCES_FILE, default_source, get_source
+
+# analyzer (PyMuPDF + Gemini) e daily_scraper (Selenium) são importados sob demanda:
+# no modo sobreposto, os imports pesados rodam enquanto o PDF é baixado
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("pipeline")
+STAGES = ("download", "extract", "compact", "analyze", "validate", "publish")
+SCRAPE_STAGES = ("download",)
+ANALYZE_STAGES = ("extract", "compact", "analyze", "validate", "publish")
+MANIFEST_SCHEMA = 1
+COMPACT_VERSION = 1
+KEEP_RUNS = int(os.getenv("CLIPAGEM_PIPELINE_KEEP_RUNS", "7"))
+OVERLAP = os.getenv("CLIPAGEM_PIPELINE_OVERLAP", "false").lower() == "true"
+
+# Linhas repetidas em mais desta fração das páginas são cabeçalho/rodapé do jornal
+REPEATED_LINE_RATIO = 0.5
+PAGE_MARKER_RE = re.compile(r"--- Página \d+ ---\n")
+
+
+def _sha256_or_none(path):
+    return file_sha256(path) if path and os.path.exists(path) else None
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+# ==================== COMPACTAÇÃO DO TEXTO ====================
+def _page_lines(body):
+    """Linhas distintas da página candidatas a cabeçalho/rodapé (curtas)"""
+    lines = (line.strip() for line in body.splitlines())
+    return {line for line in lines if 0 < len(line) < 80}
+
+
+def _repeated_lines(line_pages, page_count):
+    threshold = max(2, int(page_count * REPEATED_LINE_RATIO) + 1)
+    return {line for line, count in line_pages.items() if count >= threshold}
+
+
+def _compact_page(marker, body, repeated, key=lambda line: line):
+    body = re.sub(r"(\w)-\n(\w)", r"\1\2", body)
+    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in body.splitlines()]
+    lines = [line for line in lines if line and key(line) not in repeated]
+    return marker.strip() + "\n" + "\n".join(lines)
+
+
+def compact_text(text):
+    """
+    Reduz o texto enviado ao modelo sem perder conteúdo: junta palavras hifenizadas
+    na quebra de linha, normaliza espaços e remove cabeçalhos/rodapés repetidos.
+    Os marcadores "--- Página N ---" são preservados.
+    """
+    pages = re.split(r"(\n--- Página \d+ ---\n)", text)
+    bodies = pages[2::2]
+
+    line_pages = Counter()
+    for body in bodies:
+        line_pages.update(_page_lines(body))
+    repeated = _repeated_lines(line_pages, len(bodies))
+
+    compacted = [pages[0].strip()]
+    for marker, body in zip(pages[1::2], bodies):
+        compacted.append(_compact_page(marker, body, repeated))
+    return "\n".join(part for part in compacted if part) + "\n"
+
+
+def _iter_pages(handle):
+    """(marcador, corpo) de cada página de um texto extraído, lido linha a linha; o primeiro é o preâmbulo"""
+    marker, body = None, []
+    for line in handle:
+        if PAGE_MARKER_RE.fullmatch(line):
+            yield marker, "".join(body)
+            marker, body = line, []
+        else:
+            body.append(line)
+    yield marker, "".join(body)
+
+
+def compact_file(text_path, compact_path):
+    """
+    Mesmo resultado de compact_text, em duas passadas sobre o arquivo: uma conta as
+    linhas repetidas (por hash) e a outra grava página a página. Caminho econômico
+    do orçamento de memória; devolve (caracteres lidos, caracteres gravados).
+    """
+    line_pages = Counter()
+    page_count = 0
+    with open(text_path, "r", encoding="utf-8") as f:
+        for marker, body in _iter_pages(f):
+            if marker is not None:
+                page_count += 1
+                line_pages.update({hash(line) for line in _page_lines(body)})
+    repeated = _repeated_lines(line_pages, page_count)
+    del line_pages
+
+    read_chars = written_chars = 0
+    with open(text_path, "r", encoding="utf-8") as f, open_atomic(compact_path, "w", encoding="utf-8") as out:
+        first = True
+        for marker, body in _iter_pages(f):
+            read_chars += len(body) + len(marker or "")
+            if marker is None:
+                part = body.strip()
+            else:
+                part = _compact_page(marker, body, repeated, key=hash)
+            if part:
+                out.write(part if first else "\n" + part)
+                written_chars += len(part) + (0 if first else 1)
+                first = False
+        out.write("\n")
+    return read_chars, written_chars + 1
+
+
+# ==================== CONTEXTO DA EXECUÇÃO ====================
+def build_context(source, day=None):
+    """Caminhos da execução de uma fonte em um dia (intermediários em data/pipeline/<dia>/)"""
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    pipeline_folder = os.path.join(source.data_folder, "pipeline")
+    workdir = os.path.join(pipeline_folder, day)
+    return {
+        "source": source,
+        "day": day,
+        "pipeline_folder": pipeline_folder,
+        "manifest_path": os.path.join(pipeline_folder, f"{day}.json"),
+        "pdf_path": source.pdf_path,
+        "text_path": os.path.join(workdir, "texto.txt"),
+        "compact_path": os.path.join(workdir, "texto_compacto.txt"),
+        "response_path": os.path.join(workdir, "resposta_gemini.txt"),
+        "result_path": os.path.join(workdir, "resultado.json"),
+        "output_path": source.output_path,
+        "history_path": source.history_path,
+        "overlap": None,
+        "warm_up": None,
+        "upload": None,
+    }
+
+
+def _prompt(ctx):
+    import analyzer
+
+    return ctx["source"].prompt or analyzer.CLIPAGEM_PROMPT
+
+
+def _warm_up_model():
+    """Imports pesados (PyMuPDF, google.generativeai) e configuração do cliente"""
+    import analyzer
+
+    analyzer.configure_gemini()
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _write_text(path, text):
+    write_atomic(path, text.encode("utf-8"))
+
+
+# ==================== ETAPAS ====================
+# Cada etapa declara suas entradas (impressão digital) e devolve as saídas que produziu
+def _inputs_download(ctx):
+    return {"day": ctx["day"], "source": ctx["source"].name}
+
+
+def _run_download(ctx):
+    import daily_scraper
+
+    overlap = ctx["overlap"]
+    pdf_path = daily_scraper.main(ctx["source"], overlap=overlap)
+    if overlap is not None:
+        # A extração começa já; o upload só precisa terminar antes da publicação
+        ctx["upload"] = overlap.submit("upload do PDF", artifact_store.publish, pdf_path)
+    return [pdf_path]
+
+
+def _inputs_extract(ctx):
+    return {"pdf": _sha256_or_none(ctx["pdf_path"])}
+
+
+def _run_extract(ctx):
+    import analyzer
+
+    expected = os.path.getsize(ctx["pdf_path"]) * analyzer.EXTRACT_MEMORY_FACTOR
+    if memory_profile.over_budget(expected, "extract"):
+        analyzer.extract_pdf_text_to_file(ctx["pdf_path"], ctx["text_path"])
+    else:
+        _write_text(ctx["text_path"], analyzer.extract_pdf_text(ctx["pdf_path"]))
+    return [ctx["text_path"]]
+
+
+def _inputs_compact(ctx):
+    return {"text": _sha256_or_none(ctx["text_path"]), "version": COMPACT_VERSION}
+
+
+def _run_compact(ctx):
+    # Texto, páginas e contagem de linhas em memória: ~3x o arquivo
+    if memory_profile.over_budget(os.path.getsize(ctx["text_path"]) * 3, "compact"):
+        read_chars, written_chars = compact_file(ctx["text_path"], ctx["compact_path"])
+    else:
+        text = _read_text(ctx["text_path"])
+        compacted = compact_text(text)
+        read_chars, written_chars = len(text), len(compacted)
+        _write_text(ctx["compact_path"], compacted)
+    log.info(f"[PIPELINE] Texto compactado: {read_chars} -> {written_chars} caracteres")
+    return [ctx["compact_path"]]
+
+
+def _inputs_analyze(ctx):
+    import analyzer
+
+    prompt_sha256 = hashlib.sha256(f"{analyzer.GEMINI_MODEL}\n{_prompt(ctx)}".encode("utf-8")).hexdigest()
+    return {"text": _sha256_or_none(ctx["compact_path"]), "prompt": prompt_sha256}
+
+
+def _run_analyze(ctx):
+    import analyzer
+
+    if ctx["warm_up"] is not None:
+        ctx["warm_up"].result()  # erro de configuração aparece nesta etapa
+    else:
+        analyzer.configure_gemini()
+    expected = os.path.getsize(ctx["compact_path"]) * analyzer.ANALYZE_MEMORY_FACTOR
+    if memory_profile.over_budget(expected, "analyze"):
+        # Uma chamada por bloco de páginas; a validação lê o JSON já mesclado
+        with open(ctx["compact_path"], "r", encoding="utf-8") as f:
+            json_obj = analyzer.analyze_in_chunks(f, _prompt(ctx))
+        write_atomic(ctx["response_path"], dumps_json(json_obj, pretty=True))
+    else:
+        response = analyzer.analyze_with_gemini(_read_text(ctx["compact_path"]), _prompt(ctx))
+        _write_text(ctx["response_path"], response)
+    return [ctx["response_path"]]
+
+
+def _inputs_validate(ctx):
+    return {"response": _sha256_or_none(ctx["response_path"])}
+
+
+def _run_validate(ctx):
+    import analyzer
+
+    json_obj = analyzer.validate_json(analyzer.clean_gemini_response(_read_text(ctx["response_path"])))
+    write_atomic(ctx["result_path"], dumps_json(json_obj, pretty=True))
+    return [ctx["result_path"]]
+
+
+def _inputs_publish(ctx):
+    return {"result": _sha256_or_none(ctx["result_path"]), "pdf": _sha256_or_none(ctx["pdf_path"])}
+
+
+def _run_publish(ctx):
+    import analyzer
+    import thumbnails
+
+    if ctx["upload"] is not None:
+        ctx["overlap"].wait(ctx["upload"])
+        ctx["upload"].result()  # ponteiro do PDF antes do ponteiro do JSON
+
+    with open(ctx["result_path"], "rb") as f:
+        json_obj = loads_json(f.read())
+    analyzer.save_json_output(json_obj, ctx["output_path"], ctx["history_path"], ctx["pdf_path"])
+    if analyzer.PREWARM_THUMBNAILS:
+        try:
+            thumbnails.prewarm(ctx["pdf_path"], json_obj.get("noticias", []))
+        except Exception as e:
+            log.warning(f"[THUMBS] AVISO: falha ao pré-gerar miniaturas: {e}")
+    return [ctx["output_path"]]
+
+
+STAGE_FUNCTIONS = {
+    "download": (_inputs_download, _run_download),
+    "extract": (_inputs_extract, _run_extract),
+    "compact": (_inputs_compact, _run_compact),
+    "analyze": (_inputs_analyze, _run_analyze),
+    "validate": (_inputs_validate, _run_validate),
+    "publish": (_inputs_publish, _run_publish),
+}
+
+
+# ==================== MANIFESTO ====================
+def load_manifest(path):
+    try:
+        with open(path, "rb") as f:
+            manifest = loads_json(f.read())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("schema") == MANIFEST_SCHEMA else None
+
+
+def _save_manifest(ctx, manifest):
+    manifest["updated_at"] = _now()
+    write_atomic(ctx["manifest_path"], dumps_json(manifest, pretty=True))
+
+
+def _is_up_to_date(entry, inputs):
+    """Etapa concluída com as mesmas entradas e saídas ainda intactas"""
+    if not entry or entry.get("status") != "done" or entry.get("inputs") != inputs:
+        return False
+    return all(_sha256_or_none(path) == sha for path, sha in entry.get("outputs", {}).items())
+
+
+def _prune_old_runs(pipeline_folder, keep=KEEP_RUNS):
+    """Remove intermediários de dias antigos (os manifestos ficam)"""
+    try:
+        days = sorted(entry.path for entry in os.scandir(pipeline_folder) if entry.is_dir())
+    except FileNotFoundError:
+        return
+    for path in days[:-keep] if keep else days:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# ==================== EXECUÇÃO ====================
+def run_pipeline(source=None, stages=STAGES, force_from=None, day=None, overlap=None, refetch=False):
+    """
+    Executa as etapas pedidas de uma fonte, retomando do último checkpoint.
+    force_from reexecuta a partir da etapa indicada mesmo que esteja em dia.
+    refetch baixa a edição de novo (o checkpoint do download é por dia); as etapas
+    seguintes continuam decididas pelas entradas e só rodam se o PDF mudou.
+    overlap (padrão: CLIPAGEM_PIPELINE_OVERLAP) tira do caminho crítico o trabalho
+    independente e grava o detalhamento de tempos em last_attempt["overlap"].
+    Retorna o manifesto da execução (status "ok" ou "error").
+    """
+    source = source or default_source()
+    ctx = build_context(source, day)
+    if OVERLAP if overlap is None else overlap:
+        ctx["overlap"] = Overlap()
+    try:
+        return _run_stages(ctx, stages, force_from, refetch)
+    finally:
+        if ctx["overlap"] is not None:
+            _close_overlap(ctx)
+
+
+def _close_overlap(ctx):
+    """Aguarda o segundo plano (upload, navegador) e registra o caminho crítico no manifesto"""
+    try:
+        ctx["overlap"].close()
+    finally:
+        summary = ctx["overlap"].report()
+        manifest = load_manifest(ctx["manifest_path"])
+        if manifest and "last_attempt" in manifest:
+            manifest["last_attempt"]["overlap"] = summary
+            _save_manifest(ctx, manifest)
+
+
+def _stage_fields(source, stage, entry):
+    """Campos estruturados do fim de uma etapa (run id e horário vêm do logger)"""
+    return {"fields": {
+        "event": "stage_end",
+        "stage": f"pipeline.{stage}",
+        "source": source.name,
+        "status": "ok" if entry["status"] == "done" else entry["status"],
+        "duration_seconds": entry["seconds"],
+    }}
+
+
+def _run_stages(ctx, stages, force_from, refetch=False):
+    source = ctx["source"]
+    manifest = load_manifest(ctx["manifest_path"]) or {
+        "schema": MANIFEST_SCHEMA,
+        "source": source.name,
+        "day": ctx["day"],
+        "created_at": _now(),
+        "attempts": 0,
+        "stages": {},
+    }
+    manifest["attempts"] += 1
+    manifest["status"] = "running"
+    manifest["last_attempt"] = {"started_at": _now(), "ran": [], "skipped": []}
+
+    forced = set(STAGES[STAGES.index(force_from):]) if force_from else set()
+    if refetch:
+        forced.add("download")
+    log.info(f"[PIPELINE] Fonte '{source.name}', dia {ctx['day']}, tentativa {manifest['attempts']}")
+
+    overlap = ctx["overlap"]
+    if overlap is not None and "analyze" in stages:
+        # Imports pesados e cliente do modelo ficam prontos enquanto o PDF é baixado
+        ctx["warm_up"] = overlap.submit("imports + Gemini", _warm_up_model)
+
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+
+        inputs_fn, run_fn = STAGE_FUNCTIONS[stage]
+        if ctx["warm_up"] is not None and stage in ANALYZE_STAGES:
+            overlap.wait(ctx["warm_up"])
+        inputs = inputs_fn(ctx)
+        entry = manifest["stages"].get(stage)
+        if stage not in forced and _is_up_to_date(entry, inputs):
+            log.info(
+                f"[PIPELINE] ↷ {stage}: em dia (entradas inalteradas), pulando",
+                extra={"fields": {"event": "stage_skipped", "stage": f"pipeline.{stage}", "source": source.name}},
+            )
+            manifest["last_attempt"]["skipped"].append(stage)
+            continue
+
+        log.info(f"[PIPELINE] ▶ {stage}")
+        manifest["last_attempt"]["ran"].append(stage)
+        entry = {"status": "running", "inputs": inputs, "outputs": {}, "started_at": _now()}
+        manifest["stages"][stage] = entry
+        _save_manifest(ctx, manifest)
+
+        start = time.perf_counter()
+        memory = {}
+        try:
+            with overlap.span(stage) if overlap is not None else nullcontext(), \
+                    logs.stage(f"pipeline.{stage}", report=False), \
+                    memory_profile.stage(f"pipeline.{stage}") as memory:
+                outputs = run_fn(ctx)
+        except Exception as e:
+            entry.update(
+                status="error",
+                seconds=round(time.perf_counter() - start, 3),
+                finished_at=_now(),
+                error={"type": type(e).__name__, "message": str(e), "traceback": traceback.format_exc(limit=5)},
+            )
+            if memory:
+                entry["memory"] = memory
+            # Resposta que não virou JSON válido: a próxima tentativa chama o modelo de novo
+            if stage == "validate" and "analyze" in manifest["stages"]:
+                manifest["stages"]["analyze"]["status"] = "invalidated"
+            # Upload do PDF em segundo plano falhou: a próxima tentativa baixa e envia de novo
+            upload = ctx["upload"]
+            if upload is not None and upload.done() and upload.exception() is not None:
+                manifest["stages"]["download"]["status"] = "invalidated"
+            manifest["status"] = "error"
+            _save_manifest(ctx, manifest)
+            log.error(f"[PIPELINE] ✗ {stage} falhou: {e}", extra=_stage_fields(source, stage, entry))
+            raise
+
+        entry.update(
+            status="done",
+            outputs={path: _sha256_or_none(path) for path in outputs},
+            seconds=round(time.perf_counter() - start, 3),
+            finished_at=_now(),
+        )
+        if memory:
+            entry["memory"] = memory
+        _save_manifest(ctx, manifest)
+        log.info(f"[PIPELINE] ✓ {stage} em {entry['seconds']}s", extra=_stage_fields(source, stage, entry))
+
+    manifest["status"] = "ok"
+    _save_manifest(ctx, manifest)
+    _prune_old_runs(ctx["pipeline_folder"])
+    return manifest
+
+
+def plan_pipeline(source=None, stages=STAGES, force_from=None, day=None, refetch=False):
+    """
+    Plano da execução sem rodar nada: [(etapa, "executar" | "pular")]. Depois da primeira
+    etapa a executar, as seguintes também executam (as entradas delas vão mudar).
+    """
+    ctx = build_context(source or default_source(), day)
+    manifest = load_manifest(ctx["manifest_path"]) or {"stages": {}}
+    forced = set(STAGES[STAGES.index(force_from):]) if force_from else set()
+    if refetch:
+        forced.add("download")
+
+    plan = []
+    pending = False
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        inputs_fn, _ = STAGE_FUNCTIONS[stage]
+        pending = pending or stage in forced or not _is_up_to_date(manifest["stages"].get(stage), inputs_fn(ctx))
+        plan.append((stage, "executar" if pending else "pular"))
+    return plan
+
+
+def stage_seconds(manifest, stages):
+    """Tempo gasto na última tentativa pelas etapas indicadas (puladas não contam)"""
+    ran = set(manifest.get("last_attempt", {}).get("ran", []))
+    return round(sum(manifest["stages"][stage].get("seconds", 0.0) for stage in stages if stage in ran), 3)
+
+
+# ==================== EXECUÇÃO PRINCIPAL ====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline da clipagem com checkpoints por etapa")
+    parser.add_argument("--source", default="", help="Nome da fonte no registro (padrão: fonte original)")
+    parser.add_argument("--sources-file", default=SOURCES_FILE, help="Registro de fontes (JSON)")
+    parser.add_argument("--from", dest="force_from", choices=STAGES, help="Reexecuta a partir desta etapa")
+    parser.add_argument("--only", default="", help="Etapas separadas por vírgula (padrão: todas)")
+    parser.add_argument("--refetch", action="store_true", help="Baixa a edição de novo mesmo com o download do dia em dia")
+    parser.add_argument(
+        "--overlap",
+        action="store_true",
+        default=OVERLAP,
+        help="Sobrepõe etapas independentes e mostra o caminho crítico",
+    )
+    args = parser.parse_args(argv)
+
+    source = get_source(args.source, args.sources_file) if args.source else default_source()
+    stages = tuple(s.strip() for s in args.only.split(",") if s.strip()) or STAGES
+
+    try:
+        manifest = run_pipeline(source, stages, args.force_from, overlap=args.overlap, refetch=args.refetch)
+    except Exception:
+        return 1
+
+    for stage in STAGES:
+        entry = manifest["stages"].get(stage)
+        if entry:
+            print(f"  {stage:<9} {entry['status']:<6} {entry.get('seconds', 0):>8}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Registro de Fontes - Jornais e diários monitorados pela clipagem
+Cada fonte tem credenciais, seletores, prompt e namespace de saída próprios
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+
+import logs
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("sources")
+BASE_DIR = os.path.join(os.path.dirname(__file__), "..")
+DATA_FOLDER = os.path.join(BASE_DIR, "data")
+SOURCES_FILE = os.getenv("CLIPAGEM_SOURCES_FILE", os.path.join(BASE_DIR, "sources.json"))
+
+# Variáveis de ambiente usadas pela fonte original (Diário de Santa Maria)
+LEGACY_ENV = {
+    "login_url": "DIARIO_LOGIN_URL",
+    "access_url": "DIARIO_ACCESS_URL",
+    "user": "DIARIO_USER",
+    "password": "DIARIO_PASS",
+}
+
+
+# ==================== MODELO DE FONTE ====================
+@dataclass
+class Source:
+    """Configuração de uma fonte monitorada (jornal, diário oficial...)"""
+
+    name: str
+    label: str = ""
+    login_url: str = ""
+    access_url: str = ""
+    user: str = ""
+    password: str = ""
+    selectors: dict = field(default_factory=dict)
+    prompt: str | None = None
+    namespace: str = ""
+    pdf_filename: str = "diario_sm_atual.pdf"
+    output_filename: str = "clipagem_hoje.json"
+    apply_publication_filter: bool = True
+    enabled: bool = True
+    # Sonda de disponibilidade da edição (modo watch): url_env, pattern, token_storage_key
+    availability: dict = field(default_factory=dict)
+    # Spec HTTP gravado (modo sem navegador); vazio = specs/<name>.json, se existir
+    http_spec: str = ""
+
+    @property
+    def data_folder(self) -> str:
+        if not self.namespace:
+            return DATA_FOLDER
+        return os.path.join(DATA_FOLDER, self.namespace)
+
+    @property
+    def pdf_path(self) -> str:
+        return os.path.join(self.data_folder, self.pdf_filename)
+
+    @property
+    def output_path(self) -> str:
+        return os.path.join(self.data_folder, self.output_filename)
+
+    @property
+    def history_path(self) -> str:
+        return os.path.join(self.data_folder, "historico_clipagem.ndjson")
+
+    def missing_credentials(self) -> list[str]:
+        """Lista os campos obrigatórios de acesso que estão vazios"""
+        return [key for key in LEGACY_ENV if not getattr(self, key)]
+
+
+# ==================== CARREGAMENTO DO REGISTRO ====================
+def _resolve_env(env_map: dict) -> dict:
+    """Resolve nomes de variáveis de ambiente para seus valores"""
+    return {key: os.getenv(env_name, "") for key, env_name in env_map.items()}
+
+
+def _read_prompt_file(prompt_file: str) -> str:
+    path = prompt_file
+    if not os.path.isabs(path):
+        path = os.path.join(BASE_DIR, path)
+    with open(path, "r", encoding="utf-8") as handle:
+        return handle.read()
+
+
+def source_from_dict(entry: dict) -> Source:
+    """Constrói uma fonte a partir de uma entrada do registro JSON"""
+    if not entry.get("name"):
+        raise ValueError("Fonte sem campo 'name' no registro")
+
+    # Credenciais nunca ficam no arquivo: apenas os nomes das variáveis de ambiente
+    credentials = _resolve_env(entry.get("env", {}))
+
+    prompt = entry.get("prompt")
+    if not prompt and entry.get("prompt_file"):
+        prompt = _read_prompt_file(entry["prompt_file"])
+
+    return Source(
+        name=entry["name"],
+        label=entry.get("label", entry["name"]),
+        login_url=credentials.get("login_url", ""),
+        access_url=credentials.get("access_url", ""),
+        user=credentials.get("user", ""),
+        password=credentials.get("password", ""),
+        selectors=entry.get("selectors", {}),
+        prompt=prompt,
+        namespace=entry.get("namespace", entry["name"]),
+        pdf_filename=entry.get("pdf_filename", f"{entry['name']}_atual.pdf"),
+        output_filename=entry.get("output_filename", "clipagem_hoje.json"),
+        apply_publication_filter=entry.get("apply_publication_filter", False),
+        enabled=entry.get("enabled", True),
+        availability=entry.get("availability", {}),
+        http_spec=entry.get("http_spec", ""),
+    )
+
+
+def default_source() -> Source:
+    """Fonte padrão (Diário de SM) montada a partir das variáveis de ambiente legadas"""
+    credentials = _resolve_env(LEGACY_ENV)
+    return Source(
+        name="diario_sm",
+        label="Diário de Santa Maria",
+        availability={"url_env": "DIARIO_EDITIONS_URL"},
+        **credentials,
+    )
+
+
+def load_sources(path: str = SOURCES_FILE, include_disabled: bool = False) -> list[Source]:
+    """Carrega o registro de fontes; sem arquivo, usa apenas a fonte padrão"""
+    if not os.path.exists(path):
+        log.info(f"[SOURCES] Registro {path} não encontrado, usando fonte padrão")
+        return [default_source()]
+
+    with open(path, "r", encoding="utf-8") as handle:
+        registry = json.load(handle)
+
+    sources = [source_from_dict(entry) for entry in registry.get("sources", [])]
+    names = [source.name for source in sources]
+    duplicated = {name for name in names if names.count(name) > 1}
+    if duplicated:
+        raise ValueError(f"Fontes duplicadas no registro: {', '.join(sorted(duplicated))}")
+
+    if not include_disabled:
+        sources = [source for source in sources if source.enabled]
+
+    log.info(f"[SOURCES] {len(sources)} fonte(s) carregada(s) de {path}")
+    return sources
+
+
+def get_source(name: str, path: str = SOURCES_FILE) -> Source:
+    """Retorna a fonte pelo nome"""
+    for source in load_sources(path, include_disabled=True):
+        if source.name == name:
+            return source
+    raise KeyError(f"Fonte '{name}' não encontrada no registro")
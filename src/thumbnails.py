@@ -0,0 +1,116 @@
+"""
+Miniaturas de Páginas - Renderização sob demanda das páginas citadas
+As páginas são rasterizadas pelo PyMuPDF apenas no primeiro pedido e guardadas em um
+cache em disco com limite de tamanho (LRU), chaveado por hash do PDF, página e DPI
+"""
+
+import os
+import re
+import threading
+
+import data_loader
+from io_utils import write_atomic
+import logs
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("thumbnails")
+CACHE_FOLDER = os.getenv(
+    "CLIPAGEM_THUMB_CACHE",
+    os.path.join(os.path.dirname(__file__), "..", "data", "cache", "paginas"),
+)
+CACHE_MAX_BYTES = int(os.getenv("CLIPAGEM_THUMB_CACHE_MB", "64")) * 1024 * 1024
+THUMB_DPI = 40
+ZOOM_DPI = 110
+
+_RENDER_LOCKS = {}
+_RENDER_LOCKS_GUARD = threading.Lock()
+
+
+# ==================== PÁGINAS CITADAS ====================
+def cited_pages(noticias):
+    """Números de página (únicos e ordenados) citados nas notícias"""
+    pages = set()
+    for noticia in noticias:
+        for number in re.findall(r"\d+", str(noticia.get("pagina", ""))):
+            if int(number) > 0:
+                pages.add(int(number))
+    return sorted(pages)
+
+
+# ==================== CACHE LRU EM DISCO ====================
+def _cache_path(pdf_hash, page_number, dpi):
+    return os.path.join(CACHE_FOLDER, f"{pdf_hash[:16]}_p{page_number}_d{dpi}.png")
+
+
+def _key_lock(key):
+    with _RENDER_LOCKS_GUARD:
+        return _RENDER_LOCKS.setdefault(key, threading.Lock())
+
+
+def enforce_cache_limit(max_bytes=CACHE_MAX_BYTES):
+    """Remove as imagens usadas há mais tempo até caber no limite"""
+    try:
+        entries = [entry for entry in os.scandir(CACHE_FOLDER) if entry.name.endswith(".png")]
+    except FileNotFoundError:
+        return 0
+
+    stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+    total = sum(size for _, size, _ in stats)
+    removed = 0
+    for _, size, path in sorted(stats):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+# ==================== RENDERIZAÇÃO ====================
+def _render_png(pdf_path, page_number, dpi):
+    import fitz  # pymupdf (importado só quando alguma página precisa ser desenhada)
+
+    with fitz.open(pdf_path) as doc:
+        if not 1 <= page_number <= doc.page_count:
+            return None
+        pixmap = doc[page_number - 1].get_pixmap(dpi=dpi)
+        return pixmap.tobytes("png")
+
+
+def page_image(pdf_path, page_number, dpi=THUMB_DPI):
+    """
+    Caminho do PNG da página (numeração a partir de 1) no DPI pedido.
+    Acertos no cache só atualizam o mtime (ordem LRU); falhas renderizam uma única vez.
+    """
+    pdf_hash = data_loader.file_digest(pdf_path)
+    if pdf_hash is None:
+        return None
+
+    path = _cache_path(pdf_hash, page_number, dpi)
+    with _key_lock(path):
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return path
+
+        png = _render_png(pdf_path, page_number, dpi)
+        if png is None:
+            return None
+        write_atomic(path, png)
+
+    enforce_cache_limit()
+    return path
+
+
+def prewarm(pdf_path, noticias, dpi=THUMB_DPI):
+    """Gera antecipadamente as miniaturas das páginas citadas (após a análise)"""
+    pages = cited_pages(noticias)
+    rendered = [page for page in pages if page_image(pdf_path, page, dpi)]
+    log.info(f"[THUMBS] {len(rendered)} miniatura(s) pré-geradas em {CACHE_FOLDER}")
+    return rendered
@@ -0,0 +1,156 @@
+"""
+Visões Materializadas - Dados derivados calculados uma vez, na análise
+Licitações, agrupamentos por relevância e por página, contagens, badges e texto de
+compartilhamento ficam em um arquivo ao lado do JSON bruto, versionado pelo hash dele
+"""
+
+import hashlib
+import html
+import os
+from datetime import datetime
+from functools import lru_cache
+
+import data_loader
+from io_utils import dumps_json, write_atomic
+import logs
+from noticias import RELEVANCIA_ORDER, get_relevancia, is_licitacao, relevancia_key
+
+
+# ==================== CONFIGURAÇÕES ====================
+log = logs.get_logger("views")
+# 2: badge de relevância desconhecida com o texto do modelo escapado
+VIEWS_SCHEMA = 2
+
+BADGES = {
+    "alta": '<span class="badge badge-alta">🔴 Alta</span>',
+    "media": '<span class="badge badge-media">🟡 Média</span>',
+    "baixa": '<span class="badge badge-baixa">🔵 Baixa</span>',
+}
+
+
+def views_path_for(json_path):
+    """clipagem_hoje.json -> clipagem_hoje.views.json"""
+    return os.path.splitext(str(json_path))[0] + ".views.json"
+
+
+# ==================== DERIVAÇÕES ====================
+def pick_summary(payload):
+    """Primeiro resumo geral disponível no JSON"""
+    for key in ("resumo_gemini", "resumo", "observacao"):
+        value = payload.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return ""
+
+
+def find_licitacoes(noticias):
+    """Notícias que mencionam licitações, no formato da tabela do dashboard"""
+    results = []
+    for noticia in noticias:
+        if is_licitacao(noticia):
+            results.append(
+                {
+                    "pagina": noticia.get("pagina", "-"),
+                    "titulo": str(noticia.get("titulo", "")),
+                    "resumo": str(noticia.get("resumo_120_chars", "")),
+                    "relevancia": get_relevancia(noticia),
+                }
+            )
+    return results
+
+
+def get_relevancia_badge(relevancia):
+    """Retorna badge HTML baseado na relevância"""
+    badge = BADGES.get(relevancia_key(relevancia))
+    if badge is None:
+        # Relevância fora da escala vem do modelo: texto livre, escapado como os demais campos
+        badge = f'<span class="badge badge-media">ℹ️ {html.escape(str(relevancia))}</span>'
+    return badge
+
+
+def format_noticia_whatsapp(noticia):
+    """Bloco de uma notícia no texto de compartilhamento"""
+    pagina = noticia.get("pagina", "?")
+    titulo = noticia.get("titulo", "Sem título")
+    resumo = noticia.get("resumo_120_chars", "Sem resumo")
+    relevancia = get_relevancia(noticia, "N/A")
+    return f"📄 Pág. {pagina} | {titulo}\n└ {resumo}\n└ Relevância: {relevancia}\n\n"
+
+
+def whatsapp_header(data_clipping):
+    return f"📰 CLIPAGEM DIÁRIO DE SM - {data_clipping}\n\n"
+
+
+def format_for_whatsapp(noticias, data_clipping):
+    """Formata notícias para compartilhar no WhatsApp"""
+    return whatsapp_header(data_clipping) + "".join(format_noticia_whatsapp(noticia) for noticia in noticias)
+
+
+def build_views(json_obj, data_sha256):
+    """Calcula todas as visões derivadas de um resultado de clipagem"""
+    noticias = json_obj.get("noticias", [])
+    if not isinstance(noticias, list):
+        noticias = []
+    data_clipping = json_obj.get("data_clipping", "Data indisponível")
+
+    por_relevancia = {key: [] for key in RELEVANCIA_ORDER}
+    por_pagina = {}
+    badges = []
+    for idx, noticia in enumerate(noticias):
+        relevancia = get_relevancia(noticia, "N/A")
+        por_relevancia[relevancia_key(relevancia)].append(idx)
+        por_pagina.setdefault(str(noticia.get("pagina", "?")), []).append(idx)
+        badges.append(get_relevancia_badge(relevancia))
+
+    licitacoes = find_licitacoes(noticias)
+    return {
+        "schema": VIEWS_SCHEMA,
+        "data_sha256": data_sha256,
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "resumo": pick_summary(json_obj),
+        "licitacoes": licitacoes,
+        "por_relevancia": por_relevancia,
+        "por_pagina": por_pagina,
+        "contagens": {
+            "total": len(noticias),
+            "licitacoes": len(licitacoes),
+            "paginas": len(por_pagina),
+            **{key: len(indices) for key, indices in por_relevancia.items()},
+        },
+        "badges": badges,
+        "whatsapp_text": format_for_whatsapp(noticias, data_clipping),
+    }
+
+
+# ==================== GRAVAÇÃO E LEITURA ====================
+def save_views(json_obj, json_bytes, json_path):
+    """Grava as visões ao lado do JSON bruto, amarradas ao hash do conteúdo gravado"""
+    views = build_views(json_obj, hashlib.sha256(json_bytes).hexdigest())
+    path = views_path_for(json_path)
+    write_atomic(path, dumps_json(views))
+    log.info(f"[VIEWS] Visões materializadas salvas em: {path}")
+    return path
+
+
+def load_views(json_path):
+    """
+    Visões da versão atual do JSON. Se o arquivo de visões estiver ausente ou for
+    de outra versão dos dados, recalcula uma vez (em memória) para esta versão.
+    """
+    data_sha256 = data_loader.file_digest(json_path)
+    if data_sha256 is None:
+        return None
+
+    try:
+        views = data_loader.load_json(views_path_for(json_path))
+    except (OSError, ValueError):
+        views = None
+
+    if views and views.get("schema") == VIEWS_SCHEMA and views.get("data_sha256") == data_sha256:
+        return views
+    return _build_views_cached(str(json_path), data_sha256)
+
+
+@lru_cache(maxsize=4)
+def _build_views_cached(json_path, data_sha256):
+    return build_views(data_loader.load_json(json_path), data_sha256)
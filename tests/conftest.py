@@ -0,0 +1,15 @@
+"""
+Configuração dos testes - Módulos de src/ importáveis como na execução (python src/x.py)
+Os testes que dependem de pacotes ausentes no ambiente são pulados (pytest.importorskip)
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "src"))
+sys.path.insert(0, TESTS_DIR)
+
+# Logs em texto e só avisos: a saída do pytest fica legível
+os.environ.setdefault("CLIPAGEM_LOG_FORMAT", "text")
+os.environ.setdefault("CLIPAGEM_LOG_LEVEL", "WARNING")
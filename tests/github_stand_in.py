@@ -0,0 +1,129 @@
+"""
+Stand-in da API de Actions do GitHub - Servidor HTTP local para os testes do disparo
+Implementa a listagem de execuções do workflow, a consulta de uma execução (ambas com
+ETag / 304) e o endpoint de dispatch, com o ciclo queued → in_progress → completed
+controlado pelo teste
+"""
+
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class GitHubStandIn:
+    """Estado das execuções e contadores de requisições, servido em 127.0.0.1"""
+
+    def __init__(self, repository="dono/clipagem", workflow="daily_run.yml"):
+        self.repository = repository
+        self.workflow = workflow
+        # Dispatch aceito (204) sem criar execução, como um disparo substituído
+        self.create_runs_on_dispatch = True
+        # Diferença do relógio do "GitHub" para o local, aplicada ao created_at
+        self.clock_offset_seconds = 0
+        self.runs = []
+        self.dispatches = 0
+        self.not_modified = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---------- CONTROLE PELO TESTE ----------
+    def add_run(self, status="queued", event="workflow_dispatch"):
+        with self._lock:
+            run = {
+                "id": 1000 + len(self.runs),
+                "run_number": len(self.runs) + 1,
+                "status": status,
+                "conclusion": None,
+                "event": event,
+                "created_at": (
+                    datetime.now(timezone.utc) + timedelta(seconds=self.clock_offset_seconds)
+                ).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+            # A API lista as execuções mais recentes primeiro
+            self.runs.insert(0, run)
+            return run
+
+    def advance(self, run_id, status, conclusion=None):
+        with self._lock:
+            for run in self.runs:
+                if run["id"] == run_id:
+                    run.update(status=status, conclusion=conclusion)
+
+    # ---------- SERVIDOR ----------
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, body):
+                data = json.dumps(body).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(data).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    stand_in.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                stand_in.requests.append(("GET", parts.path))
+                workflow_runs = f"/repos/{stand_in.repository}/actions/workflows/{stand_in.workflow}/runs"
+                run_prefix = f"/repos/{stand_in.repository}/actions/runs/"
+                with stand_in._lock:
+                    if parts.path == workflow_runs:
+                        query = parse_qs(parts.query)
+                        runs = [
+                            dict(run) for run in stand_in.runs
+                            if "event" not in query or run["event"] == query["event"][0]
+                        ]
+                        per_page = int(query.get("per_page", ["30"])[0])
+                        return self._send_json({"total_count": len(runs), "workflow_runs": runs[:per_page]})
+                    if parts.path.startswith(run_prefix):
+                        run_id = int(parts.path[len(run_prefix):])
+                        for run in stand_in.runs:
+                            if run["id"] == run_id:
+                                return self._send_json(dict(run))
+                self.send_response(404)
+                self.end_headers()
+
+            def do_POST(self):
+                parts = urlsplit(self.path)
+                stand_in.requests.append(("POST", parts.path))
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if parts.path == f"/repos/{stand_in.repository}/actions/workflows/{stand_in.workflow}/dispatches":
+                    stand_in.dispatches += 1
+                    if stand_in.create_runs_on_dispatch:
+                        stand_in.add_run("queued")
+                    self.send_response(204)
+                    self.end_headers()
+                    return
+                self.send_response(404)
+                self.end_headers()
+
+        return Handler
@@ -0,0 +1,110 @@
+"""
+Stand-in do portal do Diário - API da SPA servida em 127.0.0.1 para os testes do scraper HTTP
+Login com token novo a cada sessão, busca de edições por data (com o filtro "Exceto" em
+chaves literais) e PDF protegido pelo token e por uma assinatura da listagem. As respostas
+podem ser alteradas pelo teste para simular mudanças do portal
+"""
+
+import json
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+PDF_BYTES = b"%PDF-1.4\n% edicao do dia\n%%EOF\n"
+FILTER_EXCEPT = "{legal:exceto}"
+
+
+class PortalStandIn:
+    """Estado do portal (tokens emitidos, edições) e as requisições recebidas"""
+
+    def __init__(self, user="editor@prefeitura", password="s3nh@-forte"):
+        self.user = user
+        self.password = password
+        self.tokens = set()
+        self.editions = [
+            {"id": "ed-legal-0001", "publicacaoLegal": True, "sig": secrets.token_hex(8)},
+            {"id": "ed-diaria-0002", "publicacaoLegal": False, "sig": secrets.token_hex(8)},
+        ]
+        # Mudanças do portal controladas pelo teste
+        self.listing_key = "data"
+        self.pdf_content_type = "application/pdf"
+        self.searches = []
+        self.downloads = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ---------- SERVIDOR ----------
+    def _handler(self):
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", content_type="application/json"):
+                if isinstance(body, (dict, list)):
+                    body = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self):
+                scheme, _, token = self.headers.get("Authorization", "").partition(" ")
+                return scheme == "Bearer" and token in portal.tokens
+
+            def _json_body(self):
+                data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    return json.loads(data or b"{}")
+                except ValueError:
+                    return {}
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                body = self._json_body()
+                if path == "/api/login":
+                    if body.get("usuario") != portal.user or body.get("senha") != portal.password:
+                        return self._send(401, {"erro": "credenciais inválidas"})
+                    token = secrets.token_hex(16)
+                    portal.tokens.add(token)
+                    return self._send(200, {"data": {"token": token}})
+                if path == "/api/edicoes/busca":
+                    if not self._authorized():
+                        return self._send(401, {"erro": "não autenticado"})
+                    portal.searches.append(body)
+                    if body.get("filtro") != FILTER_EXCEPT:
+                        return self._send(400, {"erro": "filtro inválido"})
+                    return self._send(200, {portal.listing_key: [dict(edition) for edition in portal.editions]})
+                self._send(404, {})
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                segments = parts.path.strip("/").split("/")
+                if segments[:2] == ["api", "edicoes"] and len(segments) == 4 and segments[3] == "pdf":
+                    if not self._authorized():
+                        return self._send(401, {"erro": "não autenticado"})
+                    edition = next((item for item in portal.editions if item["id"] == segments[2]), None)
+                    if edition is None or parse_qs(parts.query).get("sig") != [edition["sig"]]:
+                        return self._send(403, {"erro": "assinatura inválida"})
+                    portal.downloads.append(edition["id"])
+                    if portal.pdf_content_type != "application/pdf":
+                        return self._send(200, b"<html>sessao expirada</html>", portal.pdf_content_type)
+                    return self._send(200, PDF_BYTES, "application/pdf")
+                self._send(404, {})
+
+        return Handler
@@ -0,0 +1,39 @@
+"""
+Stand-in do S3 - Cliente em memória com a mesma interface usada pelo S3Store
+(head_object, upload_file, download_file); chaves ausentes levantam um erro com o
+mesmo formato de resposta do botocore (Error.Code = "404")
+"""
+
+
+class NotFoundError(Exception):
+    """Equivalente ao ClientError do botocore para um objeto inexistente"""
+
+    def __init__(self, key):
+        super().__init__(f"Not Found: {key}")
+        self.response = {"Error": {"Code": "404", "Message": "Not Found"}}
+
+
+class InMemoryS3Client:
+    """Objetos por (bucket, chave) e contadores de chamadas, para conferência nos testes"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = 0
+        self.downloads = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFoundError(Key)
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def upload_file(self, Filename, Bucket, Key):
+        with open(Filename, "rb") as f:
+            self.objects[(Bucket, Key)] = f.read()
+        self.uploads += 1
+
+    def download_file(self, Bucket, Key, Filename):
+        if (Bucket, Key) not in self.objects:
+            raise NotFoundError(Key)
+        with open(Filename, "wb") as f:
+            f.write(self.objects[(Bucket, Key)])
+        self.downloads += 1
@@ -0,0 +1,36 @@
+"""Classificação dos erros do Gemini que justificam nova tentativa"""
+
+import types
+
+import pytest
+
+import analyzer
+
+
+def test_error_messages_with_status_like_digits_are_not_retried():
+    assert not analyzer.is_retryable_error(ValueError("Documento com 500 páginas"))
+    assert not analyzer.is_retryable_error(RuntimeError("JSON inválido na linha 429"))
+
+
+def test_status_attribute_decides():
+    assert analyzer.is_retryable_error(types.SimpleNamespace(code=429))
+    assert analyzer.is_retryable_error(types.SimpleNamespace(response=types.SimpleNamespace(status_code=503)))
+    assert not analyzer.is_retryable_error(types.SimpleNamespace(code=400))
+    assert not analyzer.is_retryable_error(types.SimpleNamespace(code=lambda: 14))
+
+
+def test_timeouts_are_retried():
+    assert analyzer.is_retryable_error(TimeoutError("read timed out"))
+
+
+def test_google_api_core_exceptions():
+    exceptions = pytest.importorskip("google.api_core.exceptions")
+    for error in (
+        exceptions.ResourceExhausted("cota"),
+        exceptions.ServiceUnavailable("indisponível"),
+        exceptions.InternalServerError("erro"),
+        exceptions.DeadlineExceeded("prazo"),
+    ):
+        assert analyzer.is_retryable_error(error)
+    assert not analyzer.is_retryable_error(exceptions.InvalidArgument("prompt inválido"))
+    assert not analyzer.is_retryable_error(exceptions.PermissionDenied("chave inválida"))
@@ -0,0 +1,147 @@
+"""Backends de artefatos contra o stand-in do S3: publicação, ponteiro no manifesto e download"""
+
+import os
+import shutil
+
+import pytest
+
+import artifact_store
+from io_utils import file_sha256, loads_json
+from s3_stand_in import InMemoryS3Client
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    folder = tmp_path / "data"
+    folder.mkdir()
+    monkeypatch.setattr(artifact_store, "DATA_FOLDER", str(folder))
+    return folder
+
+
+@pytest.fixture
+def manifest_path(data_dir):
+    return str(data_dir / "artifacts.json")
+
+
+@pytest.fixture
+def client():
+    return InMemoryS3Client()
+
+
+@pytest.fixture
+def store(client):
+    return artifact_store.S3Store(bucket="clipagem-teste", prefix="clipagem/", client=client)
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_publish_uploads_by_content_and_writes_pointer(data_dir, manifest_path, client, store):
+    pdf = _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 edicao de hoje")
+    sha256 = file_sha256(pdf)
+
+    entry = artifact_store.publish(pdf, store=store, manifest_path=manifest_path)
+
+    key = f"diario_sm_atual/{sha256}.pdf"
+    assert entry["key"] == key and entry["sha256"] == sha256 and entry["backend"] == "s3"
+    assert entry["size"] == os.path.getsize(pdf)
+    assert client.objects[("clipagem-teste", "clipagem/" + key)] == b"%PDF-1.4 edicao de hoje"
+    assert store.exists(key)
+    assert not store.exists("diario_sm_atual/outro.pdf")
+
+    with open(manifest_path, "rb") as f:
+        manifest = loads_json(f.read())
+    assert manifest["schema"] == artifact_store.MANIFEST_SCHEMA
+    assert manifest["artifacts"] == {"diario_sm_atual.pdf": entry}
+
+
+def test_publish_same_content_is_not_uploaded_again(data_dir, manifest_path, client, store):
+    pdf = _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 mesma edicao")
+
+    artifact_store.publish(pdf, store=store, manifest_path=manifest_path)
+    artifact_store.publish(pdf, store=store, manifest_path=manifest_path)
+
+    assert client.uploads == 1
+
+
+def test_manifest_keeps_entries_of_other_sources(data_dir, manifest_path, store):
+    pdf = _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 fonte principal")
+    other = _write(data_dir / "outro" / "clipagem_hoje.json", b'{"materias": []}')
+
+    artifact_store.publish(pdf, store=store, manifest_path=manifest_path)
+    artifact_store.publish(other, store=store, manifest_path=manifest_path)
+
+    names = set(artifact_store.load_manifest(manifest_path)["artifacts"])
+    assert names == {"diario_sm_atual.pdf", "outro/clipagem_hoje.json"}
+
+
+def test_ensure_local_downloads_when_pointer_differs(data_dir, manifest_path, client, store):
+    pdf = _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 versao publicada")
+    entry = artifact_store.publish(pdf, store=store, manifest_path=manifest_path)
+
+    # Cópia local desatualizada (outro tamanho: nova versão para o cache do hash)
+    _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 versao antiga do checkout")
+    artifact_store.ensure_local(pdf, store=store, manifest_path=manifest_path)
+
+    assert client.downloads == 1
+    assert file_sha256(pdf) == entry["sha256"]
+    assert [name for name in os.listdir(data_dir) if name.startswith(".tmp-")] == []
+
+    # Já atualizada: nenhum download novo
+    artifact_store.ensure_local(pdf, store=store, manifest_path=manifest_path)
+    assert client.downloads == 1
+
+
+def test_ensure_local_downloads_missing_file(data_dir, manifest_path, client, store):
+    json_path = _write(data_dir / "outro" / "clipagem_hoje.json", b'{"materias": [1]}')
+    entry = artifact_store.publish(json_path, store=store, manifest_path=manifest_path)
+    shutil.rmtree(data_dir / "outro")
+
+    artifact_store.ensure_local(json_path, store=store, manifest_path=manifest_path)
+
+    assert file_sha256(json_path) == entry["sha256"]
+
+
+def test_ensure_local_keeps_local_copy_when_download_fails(data_dir, manifest_path, client, store):
+    pdf = _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 versao publicada")
+    artifact_store.publish(pdf, store=store, manifest_path=manifest_path)
+    client.objects.clear()
+    _write(data_dir / "diario_sm_atual.pdf", b"%PDF-1.4 copia local existente")
+
+    artifact_store.ensure_local(pdf, store=store, manifest_path=manifest_path)
+
+    with open(pdf, "rb") as f:
+        assert f.read() == b"%PDF-1.4 copia local existente"
+    assert [name for name in os.listdir(data_dir) if name.startswith(".tmp-")] == []
+
+
+def test_local_store_round_trip(tmp_path):
+    local = artifact_store.LocalDirectoryStore(root=str(tmp_path / "store"))
+    source = _write(tmp_path / "origem.pdf", b"%PDF-1.4 conteudo")
+
+    local.put(source, "diario/abc.pdf")
+    assert local.exists("diario/abc.pdf")
+
+    target = str(tmp_path / "copia.pdf")
+    local.get("diario/abc.pdf", target)
+    with open(target, "rb") as f:
+        assert f.read() == b"%PDF-1.4 conteudo"
+
+
+def test_local_store_put_removes_temp_file_when_copy_fails(tmp_path, monkeypatch):
+    local = artifact_store.LocalDirectoryStore(root=str(tmp_path / "store"))
+    source = _write(tmp_path / "origem.pdf", b"%PDF-1.4 conteudo")
+
+    def failing_copy(src, dst):
+        with open(dst, "wb") as f:
+            f.write(b"%PDF-1.4 cont")
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(artifact_store.shutil, "copyfile", failing_copy)
+    with pytest.raises(OSError):
+        local.put(source, "diario/abc.pdf")
+
+    assert os.listdir(tmp_path / "store" / "diario") == []
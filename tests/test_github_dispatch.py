@@ -0,0 +1,164 @@
+"""Disparo do workflow contra o stand-in local da API: cooldown, coalescência e polling com ETag"""
+
+import types
+
+import pytest
+
+pytest.importorskip("requests")
+
+import github_dispatch  # noqa: E402
+from github_stand_in import GitHubStandIn  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(github_dispatch, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+@pytest.fixture
+def api():
+    with GitHubStandIn() as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def dispatcher(api):
+    return github_dispatch.WorkflowDispatcher(
+        "token-de-teste", api_url=api.url, repository=api.repository, workflow=api.workflow, cooldown=120,
+    )
+
+
+def test_dispatch_then_cooldown_blocks_second_request(api, dispatcher, clock):
+    ok, _ = dispatcher.dispatch()
+    assert ok and api.dispatches == 1
+
+    clock.advance(30)
+    ok, message = dispatcher.dispatch()
+    assert ok and "poucos instantes" in message
+    assert api.dispatches == 1
+    assert api.requests.count(("POST", f"/repos/{api.repository}/actions/workflows/{api.workflow}/dispatches")) == 1
+
+
+def test_after_cooldown_active_run_is_coalesced(api, dispatcher, clock):
+    dispatcher.dispatch()
+    clock.advance(121)
+
+    ok, message = dispatcher.dispatch()
+    assert ok and "Já existe uma execução na fila" in message
+    assert api.dispatches == 1
+    assert dispatcher.run["id"] == api.runs[0]["id"]
+
+
+def test_existing_active_run_is_tracked_without_dispatching(api, dispatcher, clock):
+    run = api.add_run("in_progress", event="schedule")
+
+    ok, message = dispatcher.dispatch()
+    assert ok and "em andamento" in message
+    assert api.dispatches == 0
+    assert dispatcher.run["id"] == run["id"]
+
+
+def test_completed_runs_do_not_block_a_new_dispatch(api, dispatcher, clock):
+    old = api.add_run("in_progress", event="schedule")
+    api.advance(old["id"], "completed", "success")
+
+    ok, _ = dispatcher.dispatch()
+    assert ok and api.dispatches == 1
+
+
+def test_poll_uses_etag_and_backs_off_until_completed(api, dispatcher, clock):
+    dispatcher.dispatch()
+    run_id = api.runs[0]["id"]
+
+    # Primeira consulta encontra a execução criada pelo disparo
+    run = dispatcher.poll()
+    assert run["id"] == run_id and run["status"] == "queued"
+    assert dispatcher._poll_interval == github_dispatch.POLL_MIN_SECONDS
+
+    # Antes do próximo horário de consulta, nenhuma requisição é feita
+    before = len(api.requests)
+    clock.advance(1)
+    assert dispatcher.poll()["status"] == "queued"
+    assert len(api.requests) == before
+
+    # Sem mudança: 200 na primeira leitura da execução, depois 304, e o intervalo dobra
+    clock.advance(dispatcher._poll_interval)
+    dispatcher.poll()
+    assert dispatcher._poll_interval == github_dispatch.POLL_MIN_SECONDS * 2
+    clock.advance(dispatcher._poll_interval)
+    dispatcher.poll()
+    assert api.not_modified == 1
+    assert dispatcher._poll_interval == github_dispatch.POLL_MIN_SECONDS * 4
+
+    # Mudança de status volta ao intervalo mínimo
+    api.advance(run_id, "in_progress")
+    clock.advance(dispatcher._poll_interval)
+    assert dispatcher.poll()["status"] == "in_progress"
+    assert dispatcher._poll_interval == github_dispatch.POLL_MIN_SECONDS
+
+    api.advance(run_id, "completed", "success")
+    clock.advance(dispatcher._poll_interval)
+    run = dispatcher.poll()
+    assert run["status"] == "completed" and run["conclusion"] == "success"
+    assert not dispatcher.is_tracking()
+
+    # Execução concluída: polls seguintes não consultam a API
+    before = len(api.requests)
+    clock.advance(github_dispatch.POLL_MAX_SECONDS)
+    dispatcher.poll()
+    assert len(api.requests) == before
+
+
+def test_backoff_is_capped(api, dispatcher, clock):
+    dispatcher.dispatch()
+    dispatcher.poll()
+    for _ in range(10):
+        clock.advance(dispatcher._poll_interval)
+        dispatcher.poll()
+    assert dispatcher._poll_interval == github_dispatch.POLL_MAX_SECONDS
+
+
+def test_run_that_never_appears_stops_tracking_after_deadline(api, dispatcher, clock):
+    api.create_runs_on_dispatch = False
+    dispatcher.dispatch()
+
+    assert dispatcher.poll() is None and dispatcher.is_tracking()
+    clock.advance(github_dispatch.DISCOVERY_TIMEOUT_SECONDS)
+    assert dispatcher.poll() is None
+    assert not dispatcher.is_tracking() and dispatcher.run_not_found
+
+    # Sem acompanhamento, nenhuma consulta nova
+    before = len(api.requests)
+    clock.advance(github_dispatch.POLL_MAX_SECONDS)
+    dispatcher.poll()
+    assert len(api.requests) == before
+
+
+def test_dispatched_run_found_when_local_clock_is_ahead(api, dispatcher, clock):
+    api.clock_offset_seconds = -60
+    dispatcher.dispatch()
+
+    run = dispatcher.poll()
+    assert run is not None and run["id"] == api.runs[0]["id"]
+
+
+def test_runs_listed_before_the_dispatch_are_not_taken_as_dispatched(api, dispatcher, clock):
+    old = api.add_run("in_progress")
+    api.advance(old["id"], "completed", "success")
+    api.create_runs_on_dispatch = False
+    dispatcher.dispatch()
+
+    assert dispatcher.poll() is None and dispatcher.is_tracking()
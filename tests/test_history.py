@@ -0,0 +1,35 @@
+"""Histórico NDJSON: um bloco por edição e dia, mesmo com reexecuções"""
+
+import analyzer
+import history_index
+
+CLIPAGEM = {"data_clipping": "19/10/2026", "noticias": [{"titulo": "Licitação"}, {"titulo": "Decreto"}]}
+
+
+def _lines(path):
+    with open(path, "rb") as handle:
+        return handle.read().splitlines()
+
+
+def test_rerun_of_the_same_edition_does_not_duplicate_the_block(tmp_path):
+    history = str(tmp_path / "historico_clipagem.ndjson")
+
+    assert analyzer.append_history(CLIPAGEM, "hash-a", history) == 2
+    assert analyzer.append_history(CLIPAGEM, "hash-a", history) == 0
+    assert len(_lines(history)) == 2
+
+
+def test_new_edition_on_the_same_day_is_appended_and_wins(tmp_path):
+    history = str(tmp_path / "historico_clipagem.ndjson")
+    analyzer.append_history(CLIPAGEM, "hash-a", history)
+
+    revised = {**CLIPAGEM, "noticias": CLIPAGEM["noticias"][:1]}
+    assert analyzer.append_history(revised, "hash-b", history) == 1
+    assert len(_lines(history)) == 3
+
+    index = history_index.update_index(history)
+    summary = history_index.day_summary(index, history_index.available_days(index)[0])
+    assert summary["edicao_hash"] == "hash-b" and summary["total"] == 1
+
+    # Voltar à edição anterior também é uma mudança: o último bloco do dia é "hash-b"
+    assert analyzer.append_history(CLIPAGEM, "hash-a", history) == 2
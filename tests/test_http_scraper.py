@@ -0,0 +1,183 @@
+"""Spec HTTP gravado a partir de uma sessão e reproduzido contra o stand-in do portal"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import http_scraper  # noqa: E402
+from http_scraper import SpecMismatch  # noqa: E402
+from portal_stand_in import FILTER_EXCEPT, PDF_BYTES, PortalStandIn  # noqa: E402
+from sources import Source  # noqa: E402
+
+
+@pytest.fixture
+def portal():
+    with PortalStandIn() as stand_in:
+        yield stand_in
+
+
+@pytest.fixture
+def source(portal):
+    return Source(
+        name="diario_teste",
+        login_url=f"{portal.url}/login",
+        access_url=f"{portal.url}/app",
+        user=portal.user,
+        password=portal.password,
+    )
+
+
+def record_session(portal, source):
+    """
+    Faz o fluxo da SPA contra o stand-in e devolve os eventos no formato do log de
+    desempenho do Chrome (já pareados) e a função que lê os corpos JSON das respostas
+    """
+    events, bodies = [], {}
+
+    def call(method, url, event_type="XHR", headers=None, body=None):
+        response = requests.request(method, url, headers=headers, data=body)
+        request_id = str(len(events))
+        mime = response.headers.get("Content-Type", "").split(";")[0]
+        request = {"method": method, "url": url, "headers": headers or {}}
+        if body:
+            request["postData"] = body
+        events.append((request_id, {
+            "request": request,
+            "type": event_type,
+            "response": {"status": response.status_code, "mimeType": mime},
+        }))
+        if "json" in mime:
+            bodies[request_id] = response.json()
+        return response
+
+    call("GET", f"{portal.url}/app/main.js", event_type="Script")
+    login = call(
+        "POST", f"{portal.url}/api/login", headers={"Content-Type": "application/json"},
+        body=json.dumps({"usuario": source.user, "senha": source.password}),
+    )
+    auth = {"Authorization": f"Bearer {login.json()['data']['token']}", "Accept": "application/json"}
+    listing = call(
+        "POST", f"{portal.url}/api/edicoes/busca", headers={**auth, "Content-Type": "application/json"},
+        body=json.dumps({"data": datetime.now().strftime("%Y-%m-%d"), "filtro": FILTER_EXCEPT}),
+    )
+    edition = listing.json()["data"][1]
+    call(
+        "GET", f"{portal.url}/api/edicoes/{edition['id']}/pdf?sig={edition['sig']}",
+        event_type="Document", headers=auth,
+    )
+    return events, bodies.get
+
+
+@pytest.fixture
+def recorded(portal, source):
+    return record_session(portal, source)
+
+
+def replay(source, spec, tmp_path):
+    path = str(tmp_path / "edicao.pdf")
+    http_scraper.download_edition(source, path, spec=spec)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_recorded_spec_replays_with_a_new_session(portal, source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+
+    assert [step["method"] for step in spec["steps"]] == ["POST", "POST", "GET"]
+    assert spec["steps"][-1]["download"]
+    assert replay(source, spec, tmp_path) == PDF_BYTES
+    # Token novo no login da reprodução, edição e assinatura tiradas da listagem
+    assert len(portal.tokens) == 2
+    assert portal.downloads == ["ed-diaria-0002", "ed-diaria-0002"]
+
+
+def test_spec_keeps_no_recorded_credentials_or_session_values(portal, source, recorded):
+    spec = http_scraper.build_spec(source, *recorded)
+    text = json.dumps(spec)
+
+    for value in [portal.password, portal.user, *portal.tokens] + [item["sig"] for item in portal.editions]:
+        assert value not in text
+    login = spec["steps"][0]
+    assert login["json"] == {"usuario": "{user}", "senha": "{password}"}
+    assert list(login["extract"].values()) == ["data.token"]
+    assert spec["steps"][2]["headers"]["Authorization"].startswith("Bearer {")
+
+
+def test_literal_braces_survive_record_and_replay(portal, source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+    search = spec["steps"][1]
+
+    assert search["json"]["filtro"] == "{{legal:exceto}}"
+    assert search["json"]["data"] == "{date:%Y-%m-%d}"
+    replay(source, spec, tmp_path)
+    assert portal.searches[-1] == {"data": datetime.now().strftime("%Y-%m-%d"), "filtro": FILTER_EXCEPT}
+
+
+def test_unlinked_token_is_not_recorded_and_replay_fails(portal, source, recorded, tmp_path):
+    events, bodies = recorded
+    # Corpo do login indisponível na gravação: o token não tem origem conhecida
+    login_id = events[1][0]
+    spec = http_scraper.build_spec(source, events, lambda request_id: None if request_id == login_id else bodies(request_id))
+
+    text = json.dumps(spec)
+    assert "{%s}" % http_scraper.UNLINKED_TOKEN in text
+    for token in portal.tokens:
+        assert token not in text
+    with pytest.raises(SpecMismatch, match=http_scraper.UNLINKED_TOKEN):
+        replay(source, spec, tmp_path)
+
+
+def test_list_item_rule_follows_the_edition_when_the_listing_is_reordered(portal, source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+    search = spec["steps"][1]
+    # Revisão manual do spec: a edição é escolhida pelo filtro "Exceto", não pela posição
+    for variable, rule in search["extract"].items():
+        search["extract"][variable] = {
+            "path": "data", "exclude": {"publicacaoLegal": True}, "get": rule.rsplit(".", 1)[-1],
+        }
+    portal.editions.reverse()
+
+    assert replay(source, spec, tmp_path) == PDF_BYTES
+    assert portal.downloads[-1] == "ed-diaria-0002"
+
+
+def test_changed_listing_raises_spec_mismatch(portal, source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+    portal.listing_key = "resultados"
+
+    with pytest.raises(SpecMismatch, match="não foi possível extrair"):
+        replay(source, spec, tmp_path)
+
+
+def test_download_that_is_not_a_pdf_raises_spec_mismatch(portal, source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+    portal.pdf_content_type = "text/html"
+
+    with pytest.raises(SpecMismatch, match="Content-Type"):
+        replay(source, spec, tmp_path)
+    assert not (tmp_path / "edicao.pdf").exists()
+
+
+def test_rejected_login_raises_spec_mismatch(portal, source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+    portal.password = "senha-trocada"
+
+    with pytest.raises(SpecMismatch, match="HTTP 401"):
+        replay(source, spec, tmp_path)
+
+
+def test_unescaped_brace_in_spec_raises_spec_mismatch(source, recorded, tmp_path):
+    spec = http_scraper.build_spec(source, *recorded)
+    spec["steps"][1]["json"]["filtro"] = FILTER_EXCEPT
+
+    with pytest.raises(SpecMismatch):
+        replay(source, spec, tmp_path)
+
+
+def test_session_without_pdf_is_rejected(source, recorded):
+    events, bodies = recorded
+    with pytest.raises(SpecMismatch, match="nenhuma resposta em PDF"):
+        http_scraper.build_spec(source, events[:-1], bodies)
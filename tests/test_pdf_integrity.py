@@ -0,0 +1,152 @@
+"""Pré-checagem estrutural do PDF (bytes montados no teste; só a abertura usa o PyMuPDF)"""
+
+import pytest
+
+import pdf_integrity
+from pdf_integrity import CorruptPdfError, check_structure
+
+
+PAGE = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 200 200] >>"
+
+
+def _objects(count=2, declared=None):
+    kids = b" ".join(b"%d 0 R" % (3 + i) for i in range(count))
+    return [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, count if declared is None else declared),
+    ] + [PAGE] * count
+
+
+def _body(objects, first=1, start=0):
+    """Objetos numerados a partir de `first`; retorna os bytes e os offsets (a partir de `start`)"""
+    out, offsets = b"", []
+    for number, body in enumerate(objects, first):
+        offsets.append(start + len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    return out, offsets
+
+
+def _xref_section(first, offsets):
+    rows = b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    if first == 1:
+        return b"xref\n0 %d\n0000000000 65535 f \n%s" % (len(offsets) + 1, rows)
+    return b"xref\n%d %d\n%s" % (first, len(offsets), rows)
+
+
+def build_pdf(objects, version=b"1.4"):
+    """PDF com tabela xref clássica e offsets corretos"""
+    head = b"%%PDF-%s\n" % version
+    body, offsets = _body(objects, start=len(head))
+    xref_at = len(head) + len(body)
+    trailer = b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return head + body + _xref_section(1, offsets) + trailer
+
+
+def append_revision(pdf, number, body, size):
+    """Atualização incremental redefinindo o objeto `number` (com /Prev para a revisão anterior)"""
+    previous = int(pdf.rsplit(b"startxref", 1)[1].split()[0])
+    update, offsets = _body([body], first=number, start=len(pdf))
+    xref_at = len(pdf) + len(update)
+    trailer = b"trailer\n<< /Size %d /Root 1 0 R /Prev %d >>\nstartxref\n%d\n%%%%EOF\n" % (size, previous, xref_at)
+    return pdf + update + _xref_section(number, offsets) + trailer
+
+
+def build_xref_stream_pdf(objects):
+    """PDF 1.5 com stream /XRef no lugar da tabela (o conteúdo do stream não é lido na checagem)"""
+    head = b"%PDF-1.5\n"
+    body, _ = _body(objects, start=len(head))
+    xref_at = len(head) + len(body)
+    number = len(objects) + 1
+    xref = b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 2 1] /Root 1 0 R /Length 0 >>\nstream\n\nendstream\nendobj\n" % (
+        number, number + 1,
+    )
+    return head + body + xref + b"startxref\n%d\n%%%%EOF\n" % xref_at
+
+
+def test_valid_pdf():
+    info = check_structure(build_pdf(_objects(2)))
+    assert info["version"] == "1.4"
+    assert info["expected_pages"] == 2
+    assert info["size_bytes"] == len(build_pdf(_objects(2)))
+
+
+def test_not_a_pdf():
+    with pytest.raises(CorruptPdfError, match="cabeçalho"):
+        check_structure(b"<html>erro 502</html>")
+
+
+def test_truncated_download():
+    pdf = build_pdf(_objects(3))
+    with pytest.raises(CorruptPdfError, match="%%EOF"):
+        check_structure(pdf[: len(pdf) // 2])
+
+
+def test_missing_eof_marker():
+    pdf = build_pdf(_objects(2)).rstrip().rsplit(b"\n", 1)[0] + b"\n"
+    with pytest.raises(CorruptPdfError, match="%%EOF"):
+        check_structure(pdf)
+
+
+def test_missing_startxref():
+    pdf = build_pdf(_objects(2)).replace(b"startxref", b"startxrf")
+    with pytest.raises(CorruptPdfError, match="startxref ausente"):
+        check_structure(pdf)
+
+
+@pytest.mark.parametrize("offset", [b"9", b"999999"])
+def test_startxref_not_pointing_at_xref(offset):
+    pdf = build_pdf(_objects(2))
+    head, tail = pdf.rsplit(b"startxref\n", 1)
+    pdf = head + b"startxref\n" + offset + b"\n%%EOF\n"
+    with pytest.raises(CorruptPdfError, match="não aponta"):
+        check_structure(pdf)
+
+
+def test_xref_table_without_trailer():
+    pdf = build_pdf(_objects(2)).replace(b"trailer", b"tra1ler")
+    with pytest.raises(CorruptPdfError, match="sem trailer"):
+        check_structure(pdf)
+
+
+def test_xref_stream_pdf():
+    info = check_structure(build_xref_stream_pdf(_objects(2)))
+    assert info["version"] == "1.5"
+    assert info["expected_pages"] == 2
+
+
+def test_xref_stream_with_compressed_catalog_has_no_expected_count():
+    # Catálogo dentro de um object stream: a árvore /Pages não é legível sem descompactar
+    objects = [b"<< /Type /ObjStm /N 2 /First 10 /Length 0 >>\nstream\n\nendstream"]
+    assert check_structure(build_xref_stream_pdf(objects))["expected_pages"] is None
+
+
+def test_declared_count_is_read_from_pages_tree():
+    # /Count diferente do número de /Kids: a checagem informa o declarado, o PyMuPDF confere
+    assert check_structure(build_pdf(_objects(2, declared=5)))["expected_pages"] == 5
+
+
+def test_incremental_revision_count_wins_over_older_one():
+    pdf = build_pdf(_objects(4))
+    # Revisão que remove três páginas: vale a árvore /Pages mais recente, não o maior /Count
+    pdf = append_revision(pdf, 2, b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>", size=7)
+    assert check_structure(pdf)["expected_pages"] == 1
+
+
+def test_open_pdf_rejects_fewer_readable_pages_than_declared(tmp_path, monkeypatch):
+    pytest.importorskip("fitz")
+    path = tmp_path / "edicao.pdf"
+    path.write_bytes(build_pdf(_objects(2)))
+    # O PyMuPDF confia no /Count da árvore: a divergência é simulada na pré-checagem
+    checked = pdf_integrity.check_structure
+    monkeypatch.setattr(pdf_integrity, "check_structure", lambda *a: {**checked(*a), "expected_pages": 5})
+    with pytest.raises(CorruptPdfError, match="5 declaradas"):
+        with pdf_integrity.open_pdf(str(path)):
+            pass
+
+
+def test_open_pdf_valid(tmp_path):
+    pytest.importorskip("fitz")
+    path = tmp_path / "edicao.pdf"
+    path.write_bytes(build_pdf(_objects(2)))
+    with pdf_integrity.open_pdf(str(path)) as doc:
+        assert doc.page_count == 2
@@ -0,0 +1,13 @@
+"""Badges de relevância das visões materializadas"""
+
+import views
+
+
+def test_known_relevance_uses_the_fixed_badge():
+    assert views.get_relevancia_badge("Alta") == views.BADGES["alta"]
+
+
+def test_unknown_relevance_from_the_model_is_escaped():
+    badge = views.get_relevancia_badge('<img src=x onerror="alert(1)">')
+    assert "<img" not in badge
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in badge